@@ -12,6 +12,10 @@
         - WORKING_SPACE_TEMP: Path to the temporary folder.
         - WORKING_SPACE_TEMP_MAIN_SUBS: Path to the folder with main subtitles.
         - WORKING_SPACE_TEMP_ALT_SUBS: Path to the folder with alternative subtitles.
+        - WORKING_SPACE_CACHE: Path to the persistent cache folder (survives temp cleanup).
+        - TTS_CACHE_FOLDER: Path to the content-addressed TTS clip cache.
+        - SYNTHESIS_JOURNAL_FOLDER: Path to the per-subtitle-file resumable synthesis journals.
+        - PHONEME_CACHE_PATH: Path to the STylish-TTS-Pl phoneme cache (JSON).
         - MKVTOOLNIX_FOLDER: Path to the mkvtoolnix folder.
         - MKV_EXTRACT_PATH: Path to the mkvextract.exe file.
         - MKV_MERGE_PATH: Path to the mkvmerge.exe file.
@@ -21,6 +25,10 @@
         - FFMPEG_FOLDER: Path to the ffmpeg folder.
         - BALABOLKA_PATH: Path to the balcon.exe file.
         - FFMPEG_PATH: Path to the ffmpeg.exe file.
+        - STYLISH_TTS_EXPORT_PATH: Path to the single-file (safetensors) STylish-TTS-Pl export.
+        - STYLISH_TTS_ONNX_PATH: Path to the ONNX graph of STylish-TTS-Pl.
+        - STYLISH_TTS_TORCHSCRIPT_PATH: Path to the TorchScript graph of STylish-TTS-Pl.
+        - STYLISH_TTS_INT8_PATH: Path to the cached dynamic INT8 weights of STylish-TTS-Pl.
         - console: Instance of the Console class from the rich library, defined with various styles.
 """
 
@@ -37,6 +45,10 @@ WORKING_SPACE_OUTPUT: str = path.join(WORKING_SPACE, 'output')
 WORKING_SPACE_TEMP: str = path.join(WORKING_SPACE, 'temp')
 WORKING_SPACE_TEMP_MAIN_SUBS: str = path.join(WORKING_SPACE_TEMP, 'main_subs')
 WORKING_SPACE_TEMP_ALT_SUBS: str = path.join(WORKING_SPACE_TEMP, 'alt_subs')
+WORKING_SPACE_CACHE: str = path.join(WORKING_SPACE, 'cache')
+TTS_CACHE_FOLDER: str = path.join(WORKING_SPACE_CACHE, 'tts')
+SYNTHESIS_JOURNAL_FOLDER: str = path.join(WORKING_SPACE_CACHE, 'journal')
+PHONEME_CACHE_PATH: str = path.join(WORKING_SPACE_CACHE, 'phonemes.json')
 
 # Paths for mkvtoolnix
 MKVTOOLNIX_FOLDER: str = path.join(
@@ -74,6 +86,10 @@ STYLISH_TTS_FOLDER: str = path.join(
 )
 STYLISH_TTS_CONFIG_PATH: str = path.join(STYLISH_TTS_FOLDER, 'model.yml')
 STYLISH_TTS_CHECKPOINT_DIR: str = path.join(STYLISH_TTS_FOLDER, 'checkpoint_final', 'checkpoint_final')
+STYLISH_TTS_EXPORT_PATH: str = path.join(STYLISH_TTS_FOLDER, 'stylish_export.safetensors')
+STYLISH_TTS_ONNX_PATH: str = path.join(STYLISH_TTS_FOLDER, 'stylish_export.onnx')
+STYLISH_TTS_TORCHSCRIPT_PATH: str = path.join(STYLISH_TTS_FOLDER, 'stylish_export.pt')
+STYLISH_TTS_INT8_PATH: str = path.join(STYLISH_TTS_FOLDER, 'stylish_export_int8.pt')
 
 # Add FFmpeg directory to PATH so pydub can find it
 # This MUST be done before importing pydub
@@ -201,15 +201,118 @@ class Config:
         These settings are independent of any TTS model and are applied
         AFTER the TTS engine generates the audio file.
 
+        With stream_to_eac3 enabled the lector track is piped straight into
+        one FFmpeg process that applies the volume, mixes it with the
+        original track and encodes EAC3 — no intermediate WAV on disk.
+
         Returns:
             Dict with keys: description_speed, description_volume,
-            default_pp_speed, default_pp_volume.
+            description_stream, default_pp_speed, default_pp_volume,
+            default_stream_to_eac3.
         """
         return {
             'description_speed': 'Przyspieszenie lektora (atempo) od 0.5 do 3.0, domyślna: 1.0 (bez zmiany)',
             'description_volume': 'Zmiana głośności lektora w dB (np. 0, 5, -3), domyślna: 0 (bez zmiany)',
+            'description_stream': 'Strumieniuj lektora prosto do EAC3 (bez pliku WAV na dysku), domyślnie: nie',
             'default_pp_speed': '1.0',
             'default_pp_volume': '0',
+            'default_stream_to_eac3': 'false',
+        }
+
+    @staticmethod
+    def get_synthesis_concurrency() -> Dict[str, str]:
+        """Returns per-engine synthesis concurrency defaults.
+
+        The value is the number of subtitles synthesized at the same time;
+        clips are still written into the timeline in subtitle order. For the
+        network engines (Edge, Fish, ReadLover) it is the ceiling of an adaptive
+        window that grows while the server keeps up and shrinks on errors.
+
+        default_stylish_workers is the number of STylish-TTS-Pl worker
+        processes (each with its own model on a slice of the CPU cores).
+
+        Returns:
+            Dict with keys: description, description_workers,
+            default_edge_concurrency, default_fish_concurrency,
+            default_readlover_concurrency, default_stylish_concurrency, default_stylish_workers.
+        """
+        return {
+            'description': 'Liczba równoległych zapytań TTS od 1 do 32 (1 = jedno po drugim)',
+            'description_workers': 'Liczba procesów STylish-TTS-Pl na CPU od 1 do 32 (1 = jeden model w tym procesie)',
+            'default_edge_concurrency': '8',
+            'default_fish_concurrency': '4',
+            'default_readlover_concurrency': '4',
+            'default_stylish_concurrency': '1',
+            'default_stylish_workers': '1',
+        }
+
+    @staticmethod
+    def get_fish_endpoints() -> Dict[str, str]:
+        """Returns configuration of the Fish Audio API servers.
+
+        With several addresses (e.g. one server per GPU box on the LAN) the
+        subtitles of one file are spread over all of them, least busy server
+        first; a failing server is skipped until its /health answers again.
+        fish_concurrency stays the total number of requests in flight.
+
+        Returns:
+            Dict with keys: description, default_fish_api_urls.
+        """
+        return {
+            'description': 'Adresy serwerów Fish Audio API oddzielone przecinkami, np. http://gpu1:8855,http://gpu2:8855; pusty = http://127.0.0.1:8855',
+            'default_fish_api_urls': '',
+        }
+
+    @staticmethod
+    def get_edge_coalescing() -> Dict[str, str]:
+        """Returns configuration of Edge TTS short-line coalescing.
+
+        Consecutive short subtitles are packed into one Edge request of at
+        most this many characters and split back per subtitle at the word
+        boundaries reported by Edge; '0' sends one request per subtitle.
+
+        Returns:
+            Dict with keys: description, default_edge_coalesce_chars.
+        """
+        return {
+            'description': 'Łączenie krótkich linii w jedno zapytanie Edge: maks. liczba znaków od 0 do 1000 (0 = wyłączone, np. 150)',
+            'default_edge_coalesce_chars': '0',
+        }
+
+    @staticmethod
+    def get_stylish_runtime() -> Dict[str, str]:
+        """Returns STylish-TTS-Pl inference runtime defaults.
+
+        Exported backends (onnx, torchscript) run on CPU without eager-mode
+        Python dispatch; the graph is exported on first use.
+
+        Returns:
+            Dict with keys: description_backend, default_stylish_backend,
+            description_quantize, default_stylish_quantize,
+            description_server, default_stylish_server_url.
+        """
+        return {
+            'description_backend': 'Backend STylish-TTS-Pl na CPU: eager (PyTorch), onnx lub torchscript, domyślny: eager',
+            'default_stylish_backend': 'eager',
+            'description_quantize': 'Model INT8 (kwantyzacja dynamiczna, tylko eager na CPU): szybszy i mniejszy, minimalnie gorsza jakość',
+            'default_stylish_quantize': 'false',
+            'description_server': 'Adres serwera STylish-TTS-Pl (python -m modules.tts_stylish_server), np. http://127.0.0.1:8856; pusty = model w tym procesie',
+            'default_stylish_server_url': '',
+        }
+
+    @staticmethod
+    def get_tts_cache() -> Dict[str, str]:
+        """Returns configuration of the persistent TTS clip cache.
+
+        Clips are keyed by text, engine, voice and synthesis parameters and
+        reused across runs, files and engines; '0' disables the cache.
+
+        Returns:
+            Dict with keys: description, default_tts_cache_max_mb.
+        """
+        return {
+            'description': 'Maksymalny rozmiar cache klipów TTS w MB (0 = wyłączony), domyślny: 4096',
+            'default_tts_cache_max_mb': '4096',
         }
 
     @staticmethod
@@ -48,6 +48,18 @@ class Settings:
             - tts (Optional[str]): The selected TTS engine.
             - tts_speed (Optional[str]): The speed of the TTS voice.
             - tts_volume (Optional[str]): The volume of the TTS voice.
+            - edge_concurrency (Optional[str]): Parallel synthesis requests for Edge TTS.
+            - edge_coalesce_chars (Optional[str]): Character budget for packing short lines into one Edge request.
+            - fish_concurrency (Optional[str]): Parallel synthesis requests for Fish Audio API.
+            - fish_api_urls (Optional[str]): Comma-separated Fish Audio API server addresses; empty = local server.
+            - readlover_concurrency (Optional[str]): Parallel synthesis requests for ReadLover API.
+            - stylish_concurrency (Optional[str]): Parallel synthesis jobs for STylish-TTS-Pl.
+            - stylish_workers (Optional[str]): STylish-TTS-Pl worker processes (model replicas) on CPU.
+            - stylish_backend (Optional[str]): STylish-TTS-Pl inference backend: eager, onnx or torchscript.
+            - stylish_quantize (Optional[str]): 'true' to run STylish-TTS-Pl as a dynamic INT8 model on CPU.
+            - stylish_server_url (Optional[str]): Resident STylish-TTS-Pl server address; empty = in-process model.
+            - tts_cache_max_mb (Optional[str]): Size bound of the persistent TTS clip cache in MB.
+            - stream_to_eac3 (Optional[str]): 'true' to pipe the lector track straight into the EAC3 encoder.
             - output (Optional[str]): The selected output option.
 
         Methods:
@@ -80,8 +92,20 @@ class Settings:
     readlover_speaker_id: Optional[str] = None
     readlover_preset: Optional[str] = None
     elevenbytes_voice: Optional[str] = None
+    edge_concurrency: Optional[str] = None
+    edge_coalesce_chars: Optional[str] = None
+    fish_concurrency: Optional[str] = None
+    fish_api_urls: Optional[str] = None
+    readlover_concurrency: Optional[str] = None
+    stylish_concurrency: Optional[str] = None
+    stylish_workers: Optional[str] = None
+    stylish_backend: Optional[str] = None
+    stylish_quantize: Optional[str] = None
+    stylish_server_url: Optional[str] = None
+    tts_cache_max_mb: Optional[str] = None
     pp_speed: Optional[str] = None
     pp_volume: Optional[str] = None
+    stream_to_eac3: Optional[str] = None
     output: Optional[str] = None
 
     @classmethod
@@ -130,6 +154,7 @@ class Settings:
             return get_default_settings()
 
         pp_defaults = Config.get_post_processing()
+        concurrency_defaults = Config.get_synthesis_concurrency()
         return Settings(
             translator=data.get('translator'),
             deepl_api_key=data.get('deepl_api_key'),
@@ -144,8 +169,31 @@ class Settings:
             readlover_speaker_id=data.get('readlover_speaker_id'),
             readlover_preset=data.get('readlover_preset'),
             elevenbytes_voice=data.get('elevenbytes_voice'),
+            edge_concurrency=data.get(
+                'edge_concurrency', concurrency_defaults['default_edge_concurrency']),
+            edge_coalesce_chars=data.get(
+                'edge_coalesce_chars', Config.get_edge_coalescing()['default_edge_coalesce_chars']),
+            fish_concurrency=data.get(
+                'fish_concurrency', concurrency_defaults['default_fish_concurrency']),
+            fish_api_urls=data.get(
+                'fish_api_urls', Config.get_fish_endpoints()['default_fish_api_urls']),
+            readlover_concurrency=data.get(
+                'readlover_concurrency', concurrency_defaults['default_readlover_concurrency']),
+            stylish_concurrency=data.get(
+                'stylish_concurrency', concurrency_defaults['default_stylish_concurrency']),
+            stylish_workers=data.get(
+                'stylish_workers', concurrency_defaults['default_stylish_workers']),
+            stylish_backend=data.get(
+                'stylish_backend', Config.get_stylish_runtime()['default_stylish_backend']),
+            stylish_quantize=data.get(
+                'stylish_quantize', Config.get_stylish_runtime()['default_stylish_quantize']),
+            stylish_server_url=data.get(
+                'stylish_server_url', Config.get_stylish_runtime()['default_stylish_server_url']),
+            tts_cache_max_mb=data.get(
+                'tts_cache_max_mb', Config.get_tts_cache()['default_tts_cache_max_mb']),
             pp_speed=data.get('pp_speed', pp_defaults['default_pp_speed']),
             pp_volume=data.get('pp_volume', pp_defaults['default_pp_volume']),
+            stream_to_eac3=data.get('stream_to_eac3', pp_defaults['default_stream_to_eac3']),
             output=data.get('output')
         )
 
@@ -424,16 +472,18 @@ class Settings:
         return tts_volume
 
     @staticmethod
-    def _get_fish_voice(settings: Optional['Settings']) -> Optional[str]:
-        """Fetch available voices from Fish Audio API and let user choose."""
+    def _get_fish_voice(settings: Optional['Settings'], fish_api_urls: Optional[str] = None) -> Optional[str]:
+        """Fetch available voices from Fish Audio API (first configured server) and let user choose."""
+        base_url = fish_api_urls or 'http://127.0.0.1:8855'
         try:
-            from modules.tts_fish_api import FishTTSClient
-            voices = FishTTSClient.get_voices_static()
+            from modules.tts_fish_api import FishTTSClient, parse_fish_urls
+            base_url = parse_fish_urls(fish_api_urls)[0]
+            voices = FishTTSClient.get_voices_static(base_url)
         except Exception as exc:
             console.print(
                 f'\n[red_bold]Nie można pobrać głosów z Fish Audio API: {exc}')
             console.print(
-                '[red_bold]Upewnij się, że serwer Fish Audio działa na http://127.0.0.1:8855')
+                f'[red_bold]Upewnij się, że serwer Fish Audio działa na {base_url}')
             return settings.fish_voice if settings else None
 
         if not voices:
@@ -457,6 +507,27 @@ class Settings:
             'Niepoprawny wybór. Nie zmieniono wartości!', style='red_bold')
         return settings.fish_voice if settings else None
 
+    @staticmethod
+    def _get_fish_api_urls(settings: Optional['Settings']) -> Optional[str]:
+        """Prompt user for the Fish Audio API server addresses ('-' = local server only)."""
+        endpoints_config = Config.get_fish_endpoints()
+        default = (settings.fish_api_urls if settings and settings.fish_api_urls is not None
+                   else endpoints_config['default_fish_api_urls'])
+        console.print(f'\n[yellow_bold]Serwery Fish Audio API (obecnie: {default or "lokalny"}):')
+        console.print(f'  {endpoints_config["description"]}')
+        console.print('Podaj adresy (Enter - bez zmiany, "-" - tylko lokalny): ', style='green_bold', end='')
+        choice = input().strip()
+        if not choice:
+            return default
+        if choice == '-':
+            return ''
+        from modules.tts_fish_api import parse_fish_urls
+        urls = parse_fish_urls(choice)
+        if all(url.startswith(('http://', 'https://')) for url in urls):
+            return ','.join(urls)
+        console.print('Niepoprawny adres. Nie zmieniono wartości!', style='red_bold')
+        return default
+
     @staticmethod
     def _get_fish_temperature(settings: Optional['Settings']) -> Optional[str]:
         """Prompt user for Fish Audio temperature (0.0-1.0)."""
@@ -604,6 +675,118 @@ class Settings:
             'Niepoprawny wybór. Nie zmieniono wartości!', style='red_bold')
         return settings.elevenbytes_voice if settings else None
 
+    @staticmethod
+    def _get_synthesis_concurrency(settings: Optional['Settings'], field: str) -> Optional[str]:
+        """Prompt user for the number of parallel synthesis requests (1-32).
+
+        Args:
+            settings: The user settings object.
+            field: Settings attribute to read/update, e.g. 'fish_concurrency'.
+        """
+        concurrency_config = Config.get_synthesis_concurrency()
+        default = (getattr(settings, field) if settings and getattr(settings, field)
+                   else concurrency_config[f'default_{field}'])
+        console.print(f'\n[yellow_bold]Równoległa synteza (domyślna: {default}):')
+        console.print(f'  {concurrency_config["description"]}')
+        console.print('Wpisz liczbę równoległych zapytań: ', style='green_bold', end='')
+        choice = input().strip()
+        if not choice:
+            return default
+        if choice.isdigit() and 1 <= int(choice) <= 32:
+            return choice
+        console.print('Niepoprawna wartość. Używam domyślnej wartości.', style='red_bold')
+        return default
+
+    @staticmethod
+    def _get_edge_coalesce_chars(settings: Optional['Settings']) -> Optional[str]:
+        """Prompt user for the Edge short-line coalescing budget in characters (0-1000)."""
+        coalescing_config = Config.get_edge_coalescing()
+        default = (settings.edge_coalesce_chars if settings and settings.edge_coalesce_chars
+                   else coalescing_config['default_edge_coalesce_chars'])
+        console.print(f'\n[yellow_bold]Łączenie krótkich linii Edge (domyślna: {default}):')
+        console.print(f'  {coalescing_config["description"]}')
+        console.print('Wpisz liczbę znaków: ', style='green_bold', end='')
+        choice = input().strip()
+        if not choice:
+            return default
+        if choice.isdigit() and 0 <= int(choice) <= 1000:
+            return choice
+        console.print('Niepoprawna wartość. Używam domyślnej wartości.', style='red_bold')
+        return default
+
+    @staticmethod
+    def _get_stylish_workers(settings: Optional['Settings']) -> Optional[str]:
+        """Prompt user for the number of STylish-TTS-Pl worker processes (1-32)."""
+        concurrency_config = Config.get_synthesis_concurrency()
+        default = (settings.stylish_workers if settings and settings.stylish_workers
+                   else concurrency_config['default_stylish_workers'])
+        console.print(f'\n[yellow_bold]Procesy STylish-TTS-Pl (domyślna: {default}):')
+        console.print(f'  {concurrency_config["description_workers"]}')
+        console.print('Wpisz liczbę procesów: ', style='green_bold', end='')
+        choice = input().strip()
+        if not choice:
+            return default
+        if choice.isdigit() and 1 <= int(choice) <= 32:
+            return choice
+        console.print('Niepoprawna wartość. Używam domyślnej wartości.', style='red_bold')
+        return default
+
+    @staticmethod
+    def _get_stylish_backend(settings: Optional['Settings']) -> Optional[str]:
+        """Prompt user for the STylish-TTS-Pl inference backend (eager/onnx/torchscript)."""
+        runtime_config = Config.get_stylish_runtime()
+        default = (settings.stylish_backend if settings and settings.stylish_backend
+                   else runtime_config['default_stylish_backend'])
+        backends = ['eager', 'onnx', 'torchscript']
+        console.print(f'\n[yellow_bold]Backend STylish-TTS-Pl (domyślny: {default}):')
+        console.print(f'  {runtime_config["description_backend"]}')
+        for i, backend in enumerate(backends, start=1):
+            console.print(f'  {i}. {backend}')
+        console.print('Wybierz backend: ', style='green_bold', end='')
+        choice = input().strip().lower()
+        if not choice:
+            return default
+        if choice.isdigit() and 1 <= int(choice) <= len(backends):
+            return backends[int(choice) - 1]
+        if choice in backends:
+            return choice
+        console.print('Niepoprawny wybór. Używam domyślnego.', style='red_bold')
+        return default
+
+    @staticmethod
+    def _get_stylish_quantize(settings: Optional['Settings']) -> Optional[str]:
+        """Prompt user whether to run STylish-TTS-Pl as a dynamic INT8 model."""
+        runtime_config = Config.get_stylish_runtime()
+        default = (settings.stylish_quantize if settings and settings.stylish_quantize
+                   else runtime_config['default_stylish_quantize'])
+        console.print(f'  {runtime_config["description_quantize"]}')
+        console.print('(T lub Y - tak, N - nie, Enter - bez zmiany): ', style='green_bold', end='')
+        choice = input().strip().lower()
+        if choice in ('t', 'y'):
+            return 'true'
+        if choice == 'n':
+            return 'false'
+        return default
+
+    @staticmethod
+    def _get_stylish_server_url(settings: Optional['Settings']) -> Optional[str]:
+        """Prompt user for the resident STylish-TTS-Pl server address ('-' disables it)."""
+        runtime_config = Config.get_stylish_runtime()
+        default = (settings.stylish_server_url if settings and settings.stylish_server_url is not None
+                   else runtime_config['default_stylish_server_url'])
+        console.print(f'\n[yellow_bold]Serwer STylish-TTS-Pl (obecnie: {default or "brak"}):')
+        console.print(f'  {runtime_config["description_server"]}')
+        console.print('Podaj adres (Enter - bez zmiany, "-" - bez serwera): ', style='green_bold', end='')
+        choice = input().strip()
+        if not choice:
+            return default
+        if choice == '-':
+            return ''
+        if choice.startswith(('http://', 'https://')):
+            return choice.rstrip('/')
+        console.print('Niepoprawny adres. Nie zmieniono wartości!', style='red_bold')
+        return default
+
     @staticmethod
     def _is_valid_pp_speed(speed: str) -> bool:
         """Check if post-processing speed value is valid (0.5-3.0)."""
@@ -653,6 +836,21 @@ class Settings:
         console.print('Niepoprawna wartość. Używam domyślnej wartości.', style='red_bold')
         return default
 
+    @staticmethod
+    def _get_stream_to_eac3(settings: Optional['Settings']) -> Optional[str]:
+        """Prompt user whether to pipe the lector track straight into the EAC3 encoder."""
+        pp_config = Config.get_post_processing()
+        default = (settings.stream_to_eac3 if settings and settings.stream_to_eac3
+                   else pp_config['default_stream_to_eac3'])
+        console.print(f'  {pp_config["description_stream"]}')
+        console.print('(T lub Y - tak, N - nie, Enter - bez zmiany): ', style='green_bold', end='')
+        choice = input().strip().lower()
+        if choice in ('t', 'y'):
+            return 'true'
+        if choice == 'n':
+            return 'false'
+        return default
+
     @staticmethod
     def _get_output(settings: Optional['Settings']) -> Optional[str]:
         """
@@ -694,14 +892,26 @@ class Settings:
         console.print(f'\nWybrałeś: {tts}', style='yellow_bold')
         tts_speed = Settings._get_tts_speed(tts, default_speed)
         tts_volume = Settings._get_tts_volume(tts, default_volume)
-        fish_voice = Settings._get_fish_voice(settings) if tts == 'TTS - Fish Audio API' else (settings.fish_voice if settings else None)
+        fish_api_urls = Settings._get_fish_api_urls(settings) if tts == 'TTS - Fish Audio API' else (settings.fish_api_urls if settings else None)
+        fish_voice = Settings._get_fish_voice(settings, fish_api_urls) if tts == 'TTS - Fish Audio API' else (settings.fish_voice if settings else None)
         fish_temperature = Settings._get_fish_temperature(settings) if tts == 'TTS - Fish Audio API' else (settings.fish_temperature if settings else None)
         readlover_api_key = Settings._get_readlover_api_key(settings) if tts == 'TTS - ReadLover API' else (settings.readlover_api_key if settings else None)
         readlover_speaker_id = Settings._get_readlover_voice(settings, readlover_api_key) if tts == 'TTS - ReadLover API' else (settings.readlover_speaker_id if settings else None)
         readlover_preset = Settings._get_readlover_preset(settings) if tts == 'TTS - ReadLover API' else (settings.readlover_preset if settings else None)
         elevenbytes_voice = Settings._get_elevenbytes_voice(settings) if tts == 'TTS - ElevenBytes' else (settings.elevenbytes_voice if settings else None)
+        edge_concurrency = Settings._get_synthesis_concurrency(settings, 'edge_concurrency') if tts in {'TTS - Zofia - Edge', 'TTS - Marek - Edge'} else (settings.edge_concurrency if settings else None)
+        edge_coalesce_chars = Settings._get_edge_coalesce_chars(settings) if tts in {'TTS - Zofia - Edge', 'TTS - Marek - Edge'} else (settings.edge_coalesce_chars if settings else None)
+        fish_concurrency = Settings._get_synthesis_concurrency(settings, 'fish_concurrency') if tts == 'TTS - Fish Audio API' else (settings.fish_concurrency if settings else None)
+        readlover_concurrency = Settings._get_synthesis_concurrency(settings, 'readlover_concurrency') if tts == 'TTS - ReadLover API' else (settings.readlover_concurrency if settings else None)
+        stylish_concurrency = Settings._get_synthesis_concurrency(settings, 'stylish_concurrency') if tts == 'TTS - STylish - PL' else (settings.stylish_concurrency if settings else None)
+        stylish_workers = Settings._get_stylish_workers(settings) if tts == 'TTS - STylish - PL' else (settings.stylish_workers if settings else None)
+        stylish_backend = Settings._get_stylish_backend(settings) if tts == 'TTS - STylish - PL' else (settings.stylish_backend if settings else None)
+        stylish_quantize = Settings._get_stylish_quantize(settings) if tts == 'TTS - STylish - PL' else (settings.stylish_quantize if settings else None)
+        stylish_server_url = Settings._get_stylish_server_url(settings) if tts == 'TTS - STylish - PL' else (settings.stylish_server_url if settings else None)
+        tts_cache_max_mb = settings.tts_cache_max_mb if settings else None
         pp_speed = Settings._get_pp_speed(settings)
         pp_volume = Settings._get_pp_volume(settings)
+        stream_to_eac3 = Settings._get_stream_to_eac3(settings)
         output = Settings._get_output(settings)
 
         return Settings(
@@ -718,8 +928,20 @@ class Settings:
             readlover_speaker_id=readlover_speaker_id,
             readlover_preset=readlover_preset,
             elevenbytes_voice=elevenbytes_voice,
+            edge_concurrency=edge_concurrency,
+            edge_coalesce_chars=edge_coalesce_chars,
+            fish_concurrency=fish_concurrency,
+            fish_api_urls=fish_api_urls,
+            readlover_concurrency=readlover_concurrency,
+            stylish_concurrency=stylish_concurrency,
+            stylish_workers=stylish_workers,
+            stylish_backend=stylish_backend,
+            stylish_quantize=stylish_quantize,
+            stylish_server_url=stylish_server_url,
+            tts_cache_max_mb=tts_cache_max_mb,
             pp_speed=pp_speed,
             pp_volume=pp_volume,
+            stream_to_eac3=stream_to_eac3,
             output=output
         )
 
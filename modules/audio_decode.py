@@ -0,0 +1,99 @@
+"""Parallel compressed-audio → int16 PCM decoding over ffmpeg pipes.
+
+pydub decodes through a temp file per clip and then re-wraps the samples
+(``set_channels`` / ``set_frame_rate`` / ``set_sample_width``) before they
+reach NumPy. Here ffmpeg reads the encoded bytes from stdin and writes
+mono s16le at the requested rate to stdout, so one call is one process
+and no temp files. ``decode_ordered`` runs the decoders (and an optional
+post-processing step) as ``clip_pipeline`` stages on all cores and yields
+the arrays strictly in input order, so a timeline can be assembled while
+later clips are still being decoded.
+
+Usage::
+
+    from modules.audio_decode import decode_ordered, decode_pcm
+
+    audio_int16 = decode_pcm(mp3_bytes, 44_100)
+    for clip in decode_ordered(mp3_iterable, 44_100):
+        ...
+"""
+
+import subprocess
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from constants import FFMPEG_PATH
+from modules.clip_pipeline import POST_PROCESS_WORKERS, Stage, run_pipeline
+
+
+def decode_pcm(data: bytes, sample_rate: int, input_format: str = 'mp3', channels: int = 1) -> np.ndarray:
+    """Decode an encoded clip to int16 PCM with one piped ffmpeg call.
+
+    Args:
+        data: Encoded audio (e.g. MP3 bytes).
+        sample_rate: Output sample rate in Hz.
+        input_format: ffmpeg demuxer name of *data*.
+        channels: Output channels (1 = downmix to mono).
+
+    Returns:
+        1-D ``numpy.int16`` array (interleaved when *channels* > 1).
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the data.
+    """
+    result = subprocess.run(
+        [
+            FFMPEG_PATH, '-loglevel', 'error',
+            '-f', input_format, '-i', 'pipe:0',
+            '-f', 's16le', '-acodec', 'pcm_s16le',
+            '-ac', str(channels), '-ar', str(sample_rate),
+            'pipe:1',
+        ],
+        input=data,
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg decode error: {result.stderr.decode('utf-8', errors='replace').strip()}")
+    return np.frombuffer(result.stdout, dtype='<i2')
+
+
+def decode_ordered(
+    items: Iterable[Optional[bytes]],
+    sample_rate: int,
+    input_format: str = 'mp3',
+    transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Optional[np.ndarray]]:
+    """Decode many clips in parallel and yield them in input order.
+
+    Args:
+        items: Encoded clips; ``None`` / empty entries are passed through
+            as ``None`` (e.g. subtitles without audio).
+        sample_rate: Output sample rate in Hz.
+        input_format: ffmpeg demuxer name of the clips.
+        transform: Optional per-clip post-processing (e.g. time-stretch)
+            run as its own stage, skipped for empty clips.
+        workers: Parallel decoders and transform workers (default: CPU count).
+
+    Returns:
+        Iterator of one mono int16 array (or ``None``) per item, in the same order.
+
+    Raises:
+        RuntimeError: Decoding error of a clip, raised when it is reached.
+    """
+    workers = max(1, workers or POST_PROCESS_WORKERS)
+
+    def decode(data: Optional[bytes]) -> Optional[np.ndarray]:
+        # ffmpeg does the work in its own process; the thread only feeds the pipes
+        return decode_pcm(data, sample_rate, input_format) if data else None
+
+    def post_process(audio: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        return transform(audio) if audio is not None and audio.size else audio
+
+    stages: List[Stage] = [Stage('decode', decode, workers)]
+    if transform is not None:
+        stages.append(Stage('transform', post_process, workers))
+    return run_pipeline(items, stages)
@@ -0,0 +1,180 @@
+"""Overlapped, bounded clip pipeline: source → worker stages → ordered consumer.
+
+Without it every engine path runs one clip at a time through synthesis,
+post-processing (time-stretch, decode) and the timeline write, so network
+waits, CPU work and disk writes never overlap. ``run_pipeline`` gives each
+step its own threads:
+
+* the source iterator (usually ``SynthesisScheduler.map``, which keeps its
+  own ``concurrency`` requests in flight) is drained by a feeder thread,
+* every ``Stage`` has ``workers`` threads fed from a bounded queue,
+* the caller's thread consumes the results strictly in input order, each
+  one as soon as the next needed index is ready.
+
+At most ``window`` items are between the source and the consumer at any
+time, so a slow clip at the head of the timeline stalls the source instead
+of buffering the whole file.
+
+Usage::
+
+    from modules.clip_pipeline import Stage, run_pipeline
+
+    stages = [Stage('atempo', stretch, workers=4)]
+    for subtitle, audio_int16 in zip(subtitles, run_pipeline(scheduler.map(texts), stages)):
+        timeline.write(audio_int16)
+"""
+
+import queue
+import threading
+from os import cpu_count
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+PIPELINE_PREFETCH: int = 2
+"""Queued items per stage worker (bounds memory use)."""
+
+POST_PROCESS_WORKERS: int = cpu_count() or 1
+"""Default worker count of CPU-bound stages (time-stretch, decode)."""
+
+_END = object()
+
+
+class Stage(NamedTuple):
+    """One processing step of the pipeline.
+
+    Attributes:
+        name: Label used for the worker thread names.
+        function: Turns one item into the next stage's item; must be safe
+            to call from *workers* threads at once.
+        workers: Threads running *function* in parallel.
+    """
+    name: str
+    function: Callable[[Any], Any]
+    workers: int = 1
+
+
+class _Failure(NamedTuple):
+    """Exception of one item, carried downstream and raised in order."""
+    exc: BaseException
+
+
+def run_pipeline(
+    items: Iterable[Any],
+    stages: Sequence[Stage] = (),
+    window: Optional[int] = None,
+) -> Iterator[Any]:
+    """Run *items* through *stages* concurrently and yield results in input order.
+
+    Args:
+        items: Source items; the iterator is advanced in a feeder thread.
+        stages: Steps applied to every item, in sequence. With no stages
+            the source still runs ahead of the consumer.
+        window: Max items taken from the source but not yet yielded
+            (default: ``PIPELINE_PREFETCH`` per worker, at least 2).
+
+    Yields:
+        The output of the last stage for each item, in the same order.
+
+    Raises:
+        Exception: Whatever the source or a stage raised, re-raised when
+            the failed item is reached in order.
+    """
+    stages = [stage._replace(workers=max(1, int(stage.workers))) for stage in stages]
+    workers_total = sum(stage.workers for stage in stages)
+    window = max(1, window or PIPELINE_PREFETCH * max(2, workers_total))
+
+    # queues[k] feeds stage k; the last one feeds the consumer (bounded by the window)
+    queues: List[queue.Queue] = [
+        queue.Queue(maxsize=PIPELINE_PREFETCH * stage.workers) for stage in stages]
+    queues.append(queue.Queue())
+    capacity = threading.Semaphore(window)
+    stop = threading.Event()
+    lock = threading.Lock()
+    running: List[int] = [stage.workers for stage in stages]
+
+    def consumers_of(position: int) -> int:
+        return stages[position].workers if position < len(stages) else 1
+
+    def feed() -> None:
+        iterator = iter(items)
+        index = 0
+        try:
+            while True:
+                capacity.acquire()
+                if stop.is_set():
+                    break
+                try:
+                    value = next(iterator)
+                except StopIteration:
+                    break
+                except BaseException as exc:
+                    queues[0].put((index, _Failure(exc)))
+                    break
+                queues[0].put((index, value))
+                index += 1
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            for _ in range(consumers_of(0)):
+                queues[0].put(_END)
+
+    def work(position: int) -> None:
+        function = stages[position].function
+        source, target = queues[position], queues[position + 1]
+        while (item := source.get()) is not _END:
+            index, value = item
+            # After a stop the items are only passed on, so every queue drains
+            if not stop.is_set() and not isinstance(value, _Failure):
+                try:
+                    value = function(value)
+                except BaseException as exc:
+                    value = _Failure(exc)
+            target.put((index, value))
+        with lock:
+            running[position] -= 1
+            last = running[position] == 0
+        if last:
+            for _ in range(consumers_of(position + 1)):
+                target.put(_END)
+
+    threads = [threading.Thread(target=feed, name='pipeline-source', daemon=True)]
+    for position, stage in enumerate(stages):
+        threads += [
+            threading.Thread(target=work, args=(position,), name=f'pipeline-{stage.name}-{n}', daemon=True)
+            for n in range(stage.workers)
+        ]
+    for thread in threads:
+        thread.start()
+
+    waiting: Dict[int, Any] = {}
+    next_index = 0
+    finished = False
+    try:
+        while True:
+            while next_index not in waiting and not finished:
+                item = queues[-1].get()
+                if item is _END:
+                    finished = True
+                else:
+                    waiting[item[0]] = item[1]
+            if next_index not in waiting:
+                return
+            value = waiting.pop(next_index)
+            next_index += 1
+            capacity.release()
+            if isinstance(value, _Failure):
+                raise value.exc
+            yield value
+    finally:
+        # Early exit (error, break, closed generator): wake the feeder and drain the stages
+        stop.set()
+        for _ in range(window):
+            capacity.release()
+        while not finished:
+            finished = queues[-1].get() is _END
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,278 @@
+"""Adaptive (AIMD) concurrency limit shared by the network TTS engines.
+
+Fixed limits are either too timid (Edge pinned to one request) or too
+aggressive (85 parallel ElevenBytes requests hammering a throttled proxy).
+The controller keeps a congestion window of requests in flight, the way
+TCP does:
+
+* additive increase — every success with healthy latency grows the window
+  by ``increase / window`` (about +1 per window's worth of successes),
+* multiplicative decrease — a 403/429, a 5xx or a timeout multiplies it by
+  ``decrease``, at most once per smoothed round-trip, so a burst of
+  failures from one overloaded moment counts as a single signal.
+
+Latency is "healthy" while the smoothed latency stays under
+``latency_factor`` times the best smoothed latency seen; above that the
+window holds, because the provider is already queueing. TTS latency grows
+with the text, so callers pass the request's ``cost`` (its characters)
+and the comparison is made per unit of cost: one short "Tak." does not
+set a bar that every normal line then misses.
+
+The same controller gates threads (``slot``) and asyncio tasks
+(``aslot``); use one style per controller. Both yield a ``Slot`` on which
+a caller that handles HTTP statuses itself reports them with
+``slot.status(code)``; exceptions leaving the block are classified
+automatically.
+
+Usage::
+
+    from modules.concurrency_controller import ConcurrencyController
+
+    controller = ConcurrencyController(initial=2, maximum=32, name='Fish')
+    with controller.slot(cost=len(text)):
+        audio = client.synthesize(text)
+
+    async with controller.aslot(cost=len(text)) as slot:
+        resp = await client.post(url, data=payload)
+        slot.status(resp.status_code)
+    print(controller)  # Fish: window=7.4 in_flight=3 ok=120 throttled=2 ...
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+THROTTLE_STATUS_CODES: frozenset = frozenset({403, 429})
+"""Statuses meaning "slow down" (rate limit / anti-abuse block)."""
+
+DEFAULT_LATENCY_FACTOR: float = 2.0
+"""Smoothed latency per unit of cost above this multiple of the best one stops growth."""
+
+_EWMA_ALPHA: float = 0.2
+
+# Outcome kinds; everything but ERROR shrinks the window
+SUCCESS = 'ok'
+THROTTLED = 'throttled'
+SERVER_ERROR = 'server_error'
+TIMEOUT = 'timeout'
+ERROR = 'error'
+
+
+def classify_exception(exc: BaseException) -> str:
+    """Map an exception (or its cause chain) to an outcome kind.
+
+    Works without importing the HTTP libraries: status codes are read from
+    ``status_code`` / ``status`` / ``code`` attributes or from an attached
+    ``response``, timeouts are recognized by type.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, TimeoutError) or 'Timeout' in type(exc).__name__:
+            return TIMEOUT
+        response = getattr(exc, 'response', None)
+        for status in (getattr(exc, 'status_code', None), getattr(exc, 'status', None),
+                       getattr(exc, 'code', None), getattr(response, 'status_code', None)):
+            if isinstance(status, int) and status >= 400:
+                return classify_status(status)
+        exc = exc.__cause__ or exc.__context__
+    return ERROR
+
+
+def classify_status(status: int) -> str:
+    """Map an HTTP status code to an outcome kind."""
+    if status in THROTTLE_STATUS_CODES:
+        return THROTTLED
+    if status >= 500:
+        return SERVER_ERROR
+    if status >= 400:
+        return ERROR
+    return SUCCESS
+
+
+class Slot:
+    """One request in flight; ``status``/``fail`` override the default outcome."""
+
+    __slots__ = ('outcome',)
+
+    def __init__(self) -> None:
+        self.outcome: Optional[str] = None
+
+    def status(self, code: int) -> None:
+        """Report the HTTP status of the request made in this slot."""
+        self.outcome = classify_status(code)
+
+    def fail(self, outcome: str = ERROR) -> None:
+        """Mark the request as failed without raising."""
+        self.outcome = outcome
+
+
+class ConcurrencyController:
+    """AIMD limit on requests in flight with outcome counters.
+
+    Attributes:
+        name: Label used in ``str()`` (engine name).
+        minimum: Lower bound of the window.
+        maximum: Upper bound of the window (the configured ceiling).
+        increase: Additive increase per window's worth of successes.
+        decrease: Multiplicative decrease factor on congestion.
+        latency_factor: Growth stops above this multiple of the best latency per unit of cost.
+        counters: Outcome counts: ok, throttled, server_error, timeout, error.
+    """
+
+    def __init__(
+        self,
+        initial: float = 1,
+        minimum: int = 1,
+        maximum: int = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_factor: float = DEFAULT_LATENCY_FACTOR,
+        name: str = '',
+    ) -> None:
+        self.name: str = name
+        self.minimum: int = max(1, int(minimum))
+        self.maximum: int = max(self.minimum, int(maximum))
+        self.increase: float = increase
+        self.decrease: float = decrease
+        self.latency_factor: float = latency_factor
+        self.counters: Dict[str, int] = {
+            SUCCESS: 0, THROTTLED: 0, SERVER_ERROR: 0, TIMEOUT: 0, ERROR: 0}
+
+        self._limit: float = min(max(float(initial), self.minimum), self.maximum)
+        self._in_flight: int = 0
+        self._latency: Optional[float] = None
+        self._unit_latency: Optional[float] = None
+        self._best_unit_latency: Optional[float] = None
+        self._last_decrease: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+        self._condition: threading.Condition = threading.Condition(self._lock)
+        self._async_condition: Optional[asyncio.Condition] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    @property
+    def window(self) -> int:
+        """Requests currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Requests currently in flight."""
+        return self._in_flight
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Smoothed latency of successful requests in seconds."""
+        return self._latency
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of the window, latency and outcome counters."""
+        with self._lock:
+            return {'window': self._limit, 'in_flight': self._in_flight,
+                    'latency': self._latency or 0.0, **self.counters}
+
+    def __str__(self) -> str:
+        latency = f'{self._latency:.2f}s' if self._latency is not None else '-'
+        counts = ' '.join(f'{kind}={count}' for kind, count in self.counters.items())
+        return (f'{self.name + ": " if self.name else ""}window={self._limit:.1f} '
+                f'in_flight={self._in_flight} latency={latency} {counts}')
+
+    # ------------------------------------------------------------------
+    # Gates
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def slot(self, cost: float = 1.0) -> Iterator[Slot]:
+        """Block the calling thread until a slot is free, then hold it.
+
+        Args:
+            cost: Size of the request (e.g. characters of text); latency is
+                judged per unit of it.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < self.window)
+            self._in_flight += 1
+        slot, started = Slot(), time.monotonic()
+        try:
+            yield slot
+        except BaseException as exc:
+            slot.outcome = slot.outcome or classify_exception(exc)
+            raise
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._record(slot.outcome or SUCCESS, time.monotonic() - started, cost)
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def aslot(self, cost: float = 1.0) -> AsyncIterator[Slot]:
+        """Wait in the running event loop until a slot is free, then hold it.
+
+        Args:
+            cost: Size of the request, as in ``slot``.
+        """
+        condition = self._get_async_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < self.window)
+            with self._lock:
+                self._in_flight += 1
+        slot, started = Slot(), time.monotonic()
+        try:
+            yield slot
+        except BaseException as exc:
+            slot.outcome = slot.outcome or classify_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._record(slot.outcome or SUCCESS, time.monotonic() - started, cost)
+            async with condition:
+                condition.notify_all()
+
+    def record(self, outcome: str, latency: float = 0.0, cost: float = 1.0) -> None:
+        """Feed an outcome observed outside a slot (e.g. a retried response)."""
+        with self._condition:
+            self._record(outcome, latency, cost)
+            self._condition.notify_all()
+
+    # ------------------------------------------------------------------
+    # Internal utilities
+    # ------------------------------------------------------------------
+
+    def _get_async_condition(self) -> asyncio.Condition:
+        """Lazy-init condition bound to the current running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_condition is None or self._async_loop is not loop:
+            self._async_condition = asyncio.Condition()
+            self._async_loop = loop
+        return self._async_condition
+
+    def _record(self, outcome: str, latency: float, cost: float = 1.0) -> None:
+        """AIMD step; the caller holds ``_lock``."""
+        self.counters[outcome] = self.counters.get(outcome, 0) + 1
+        now = time.monotonic()
+        if outcome == SUCCESS:
+            unit_latency = latency / max(cost, 1.0)
+            self._latency = latency if self._latency is None else (
+                (1 - _EWMA_ALPHA) * self._latency + _EWMA_ALPHA * latency)
+            self._unit_latency = unit_latency if self._unit_latency is None else (
+                (1 - _EWMA_ALPHA) * self._unit_latency + _EWMA_ALPHA * unit_latency)
+            if self._best_unit_latency is None or self._unit_latency < self._best_unit_latency:
+                self._best_unit_latency = self._unit_latency
+            if self._unit_latency <= self.latency_factor * self._best_unit_latency:
+                self._limit = min(self.maximum, self._limit + self.increase / self._limit)
+        elif outcome != ERROR:
+            # One cut per round-trip: concurrent failures share the same cause
+            if now - self._last_decrease >= (self._latency or 1.0):
+                self._limit = max(self.minimum, self._limit * self.decrease)
+                self._last_decrease = now
@@ -0,0 +1,152 @@
+"""Coalescing of short subtitle lines into single Edge TTS requests.
+
+Dialogue-heavy subtitles are mostly 1-4 word lines, and every Edge request
+pays a websocket handshake and a service round-trip for a second of audio.
+Consecutive short cues are packed into one request of at most ``budget``
+characters; the ``WordBoundary`` events Edge streams alongside the audio
+(offset and duration of every spoken word) are then matched back to the
+cues, and the decoded group audio is cut in the pause between the last word
+of one cue and the first word of the next.
+
+Usage::
+
+    from modules.edge_coalesce import plan_groups, CoalescedGroup
+
+    for indices in plan_groups(texts, budget=150):
+        group = CoalescedGroup([texts[i] for i in indices])
+        words = []
+        mp3 = await tts.generate_speech(group.text, ..., word_boundaries=words)
+        clips = group.split(decode_pcm(mp3, 24000), words, 24000)
+"""
+
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+TICKS_PER_SECOND: int = 10_000_000
+"""Edge reports offsets and durations in 100 ns ticks."""
+
+SPLIT_MARGIN_S: float = 0.1
+"""Audio kept around the first/last word of a cue when cutting a group."""
+
+_SENTENCE_END: str = '.!?…'
+
+WordBoundary = Tuple[int, int, str]
+"""(offset, duration, word) of one spoken word, in ticks."""
+
+
+def plan_groups(texts: Sequence[str], budget: int, skip: Iterable[int] = ()) -> List[List[int]]:
+    """Pack consecutive cues into requests of at most *budget* characters.
+
+    Args:
+        texts: Cue texts in timeline order.
+        budget: Character budget of one request; cues longer than that
+            (or any cue when *budget* < 1) are requested alone.
+        skip: Indices that need no request (cache or journal hits); a
+            group never spans them, so its audio stays contiguous.
+
+    Returns:
+        Lists of cue indices, one list per request, in timeline order.
+    """
+    skipped = set(skip)
+    groups: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+    for index, text in enumerate(texts):
+        if index in skipped:
+            if current:
+                groups.append(current)
+            current, size = [], 0
+            continue
+        length = len(text) + 1
+        if current and (size + length > budget or current[-1] != index - 1):
+            groups.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += length
+    if current:
+        groups.append(current)
+    return groups
+
+
+class CoalescedGroup:
+    """Joined text of several cues and the way back to per-cue audio.
+
+    Attributes:
+        texts: The cue texts, in order.
+        text: The request text; cues without final punctuation get a
+            period so the voice pauses between them.
+        spans: (start, end) character range of every cue in *text*.
+    """
+
+    def __init__(self, texts: Sequence[str]) -> None:
+        self.texts: List[str] = [text.strip() for text in texts]
+        parts: List[str] = []
+        self.spans: List[Tuple[int, int]] = []
+        position = 0
+        for text in self.texts:
+            self.spans.append((position, position + len(text)))
+            part = text if not text or text[-1] in _SENTENCE_END else text + '.'
+            parts.append(part)
+            position += len(part) + 1
+        self.text: str = ' '.join(parts)
+
+    def split(self, audio: np.ndarray, words: Sequence[WordBoundary], sample_rate: int) -> List[np.ndarray]:
+        """Cut the decoded group audio into one clip per cue.
+
+        Args:
+            audio: Decoded int16 audio of the whole request.
+            words: WordBoundary events of the request, in order.
+            sample_rate: Sample rate of *audio*.
+
+        Returns:
+            One int16 clip per cue; a group of one returns *audio* as is.
+        """
+        if len(self.texts) == 1:
+            return [audio]
+        cuts = self._cut_points(words, len(audio) / sample_rate * TICKS_PER_SECOND)
+        clips: List[np.ndarray] = []
+        for begin, end in cuts:
+            first = min(len(audio), int(begin * sample_rate / TICKS_PER_SECOND))
+            last = min(len(audio), max(first, int(end * sample_rate / TICKS_PER_SECOND)))
+            clips.append(audio[first:last])
+        return clips
+
+    def _cut_points(self, words: Sequence[WordBoundary], total: float) -> List[Tuple[float, float]]:
+        """(begin, end) of every cue in ticks."""
+        count = len(self.texts)
+        starts = [start for start, _ in self.spans]
+        first_word: List[Optional[int]] = [None] * count
+        last_word_end: List[Optional[int]] = [None] * count
+
+        # Words are matched in order, so a repeated word maps to the right cue
+        cursor = 0
+        for offset, duration, word in words:
+            position = self.text.find(word, cursor) if word else -1
+            if position < 0:
+                continue
+            cursor = position + len(word)
+            cue = bisect_right(starts, position) - 1
+            if first_word[cue] is None:
+                first_word[cue] = offset
+            last_word_end[cue] = offset + duration
+
+        margin = SPLIT_MARGIN_S * TICKS_PER_SECOND
+        begins: List[float] = [0.0] * count
+        ends: List[float] = [total] * count
+        for cue in range(1, count):
+            previous_end = last_word_end[cue - 1]
+            next_start = first_word[cue]
+            if previous_end is not None and next_start is not None and next_start >= previous_end:
+                middle = (previous_end + next_start) / 2
+                ends[cue - 1] = min(middle, previous_end + margin)
+                begins[cue] = max(middle, next_start - margin)
+            else:
+                # No usable boundary (e.g. a line without words): cut by text position
+                ends[cue - 1] = begins[cue] = total * self.spans[cue][0] / max(1, len(self.text))
+        return list(zip(begins, ends))
@@ -0,0 +1,191 @@
+"""Client-side load balancing over several equivalent inference servers.
+
+With one server per GPU box on the LAN, a job bound to a single URL leaves
+the others idle. ``EndpointPool`` routes each request to the admitted
+endpoint with the fewest requests outstanding (ties rotate), so a slower
+box naturally receives less work. An endpoint failing ``failures_to_eject``
+requests in a row is ejected for ``cooldown`` seconds; after that it is
+handed out by ``claim_probes`` to be health-checked by the client (sync or
+async, the pool does no I/O) and re-admitted on success.
+
+Thread-safe and non-blocking, so it serves both thread pools and asyncio.
+
+Usage::
+
+    from modules.endpoint_pool import EndpointPool
+
+    pool = EndpointPool(['http://gpu1:8855', 'http://gpu2:8855'])
+    for endpoint in pool.claim_probes():
+        pool.probe_result(endpoint, check_health(endpoint.url))
+    endpoint = pool.acquire()
+    try:
+        response = post(endpoint.url + '/tts', ...)
+    except ConnectionError:
+        pool.release(endpoint, ok=False)
+        raise
+    pool.release(endpoint, ok=True)
+"""
+
+import threading
+from time import monotonic
+from typing import Collection, Dict, Iterable, List
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+ENDPOINT_FAILURES_TO_EJECT: int = 2
+"""Consecutive failed requests after which an endpoint is ejected."""
+
+ENDPOINT_COOLDOWN_S: float = 30.0
+"""Seconds an ejected endpoint waits for its re-admission health check."""
+
+
+class Endpoint:
+    """One server of the pool and its routing state.
+
+    Attributes:
+        url: Base URL (no trailing slash).
+        outstanding: Requests currently sent to this endpoint.
+        failures: Consecutive failed requests.
+        ejected_until: Monotonic time of the next health check; 0 = admitted.
+        probing: A client is running the re-admission health check.
+        served: Successful requests.
+        errors: Failed requests.
+    """
+
+    __slots__ = ('url', 'outstanding', 'failures', 'ejected_until', 'probing', 'served', 'errors')
+
+    def __init__(self, url: str) -> None:
+        self.url: str = url.rstrip('/')
+        self.outstanding: int = 0
+        self.failures: int = 0
+        self.ejected_until: float = 0.0
+        self.probing: bool = False
+        self.served: int = 0
+        self.errors: int = 0
+
+    @property
+    def admitted(self) -> bool:
+        return self.ejected_until == 0.0
+
+    def __repr__(self) -> str:
+        return f'Endpoint({self.url!r})'
+
+
+class EndpointPool:
+    """Least-outstanding-requests router with ejection and re-admission.
+
+    Attributes:
+        endpoints: All endpoints, in configuration order.
+        failures_to_eject: Consecutive failures that eject an endpoint.
+        cooldown: Seconds before an ejected endpoint is probed again.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        failures_to_eject: int = ENDPOINT_FAILURES_TO_EJECT,
+        cooldown: float = ENDPOINT_COOLDOWN_S,
+    ) -> None:
+        unique: Dict[str, Endpoint] = {}
+        for url in urls:
+            if url and url.strip():
+                endpoint = Endpoint(url.strip())
+                unique.setdefault(endpoint.url, endpoint)
+        if not unique:
+            raise ValueError('EndpointPool needs at least one URL')
+        self.endpoints: List[Endpoint] = list(unique.values())
+        self.failures_to_eject: int = max(1, int(failures_to_eject))
+        self.cooldown: float = cooldown
+        self._lock: threading.Lock = threading.Lock()
+        self._turn: int = 0
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def __str__(self) -> str:
+        nodes = ' '.join(
+            f'{endpoint.url}[{"ok" if endpoint.admitted else "ejected"} '
+            f'served={endpoint.served} errors={endpoint.errors}]'
+            for endpoint in self.endpoints)
+        return f'Endpoints: {nodes}'
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def acquire(self, exclude: Collection[Endpoint] = ()) -> Endpoint:
+        """Pick the admitted endpoint with the fewest outstanding requests.
+
+        When every endpoint is ejected, the one due for its health check
+        first is used anyway, so a short outage of the whole pool costs a
+        failed request instead of stalling the job.
+
+        Args:
+            exclude: Endpoints already tried for this request.
+
+        Raises:
+            LookupError: Every endpoint is excluded.
+        """
+        with self._lock:
+            allowed = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+            if not allowed:
+                raise LookupError('Every endpoint has already been tried')
+            candidates = [endpoint for endpoint in allowed if endpoint.admitted]
+            if candidates:
+                # Rotate the start so ties spread evenly instead of piling on the first URL
+                self._turn = (self._turn + 1) % len(candidates)
+                rotated = candidates[self._turn:] + candidates[:self._turn]
+                endpoint = min(rotated, key=lambda candidate: candidate.outstanding)
+            else:
+                endpoint = min(allowed, key=lambda candidate: candidate.ejected_until)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, ok: bool) -> None:
+        """Record the outcome of a request sent to *endpoint*.
+
+        Args:
+            endpoint: Endpoint returned by ``acquire``.
+            ok: False when the failure was the server's (connection error,
+                timeout, 5xx); client errors count as ok.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok:
+                endpoint.served += 1
+                endpoint.failures = 0
+                return
+            endpoint.errors += 1
+            endpoint.failures += 1
+            if endpoint.failures >= self.failures_to_eject:
+                self._eject(endpoint)
+
+    # ------------------------------------------------------------------
+    # Health checks
+    # ------------------------------------------------------------------
+
+    def claim_probes(self) -> List[Endpoint]:
+        """Ejected endpoints whose cooldown ran out; each is handed to one caller only."""
+        now = monotonic()
+        with self._lock:
+            due = [endpoint for endpoint in self.endpoints
+                   if not endpoint.admitted and not endpoint.probing and endpoint.ejected_until <= now]
+            for endpoint in due:
+                endpoint.probing = True
+            return due
+
+    def probe_result(self, endpoint: Endpoint, healthy: bool) -> None:
+        """Re-admit a probed endpoint, or eject it for another cooldown."""
+        with self._lock:
+            endpoint.probing = False
+            if healthy:
+                endpoint.ejected_until = 0.0
+                endpoint.failures = 0
+            else:
+                self._eject(endpoint)
+
+    def _eject(self, endpoint: Endpoint) -> None:
+        """Take *endpoint* out of rotation; the caller holds ``_lock``."""
+        endpoint.ejected_until = monotonic() + self.cooldown
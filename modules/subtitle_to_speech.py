@@ -26,22 +26,25 @@
                 audio_generator.srt_to_eac3_elevenlabs() # For Alt Subs
 """
 
+from collections import deque
+from concurrent.futures import Future
+from contextlib import aclosing, contextmanager
 from dataclasses import dataclass
 from msvcrt import getch
-from os import listdir, path, remove
-from subprocess import call, Popen
-from threading import Thread
+from os import cpu_count, listdir, path, remove, replace
+from subprocess import call, Popen, PIPE
+from threading import Condition, Event, Thread
 from time import sleep
+import mmap
 import sys
 import wave
 
 
-from typing import Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pyttsx3
 import pysrt
-from edge_tts import Communicate
-from pydub import AudioSegment
 from pydub.utils import mediainfo
 
 from constants import (WORKING_SPACE,
@@ -53,16 +56,60 @@ from constants import (WORKING_SPACE,
                        FFMPEG_PATH,
                        console)
 from data.settings import Settings
-
-from asyncio import create_task, gather, run, Semaphore, sleep as asyncio_sleep, TimeoutError
+from modules.audio_decode import decode_ordered, decode_pcm
+from modules.clip_pipeline import POST_PROCESS_WORKERS, Stage, run_pipeline
+from modules.concurrency_controller import ConcurrencyController
+from modules.edge_coalesce import CoalescedGroup, WordBoundary, plan_groups
+from modules.synthesis_journal import SynthesisJournal
+from modules.synthesis_scheduler import DEFAULT_PREFETCH
+from modules.timeline_writer import TimelineWriter, WavLayout, wav_data_layout
+from modules.tts_cache import ClipCache, clip_cache_from_settings
+from modules.tts_edge_session import EdgeSession
+
+from asyncio import (all_tasks, create_task, current_task, gather, new_event_loop, run,
+                     run_coroutine_threadsafe, sleep as asyncio_sleep, TimeoutError)
 from async_timeout import timeout as timeout_scope
-from natsort import natsorted
-from os import path, stat, listdir, remove
+from os import path, listdir, remove
 
 if sys.platform == "win32":
     import asyncio
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
+# Default ceiling of the adaptive (AIMD) Edge concurrency window (setting: edge_concurrency)
+EDGE_DEFAULT_CONCURRENCY: int = 8
+
+# Edge TTS streams 24 kHz mono MP3
+EDGE_SAMPLE_RATE: int = 24000
+
+
+def _completed(value: Any) -> Future:
+    """Returns an already-resolved future (a clip served without a request)."""
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+def _prefetched(jobs: Iterable[Tuple[Any, Future]], window: int) -> Iterator[Tuple[Any, Any]]:
+    """
+        Yields (tag, result) of (tag, future) jobs in order, keeping at most *window* submitted ahead.
+
+        *jobs* is consumed lazily, so a generator that submits as it goes is
+        throttled by the consumer; futures left behind are cancelled on exit.
+    """
+    pending: Deque[Tuple[Any, Future]] = deque()
+    try:
+        for job in jobs:
+            pending.append(job)
+            if len(pending) >= window:
+                tag, future = pending.popleft()
+                yield tag, future.result()
+        while pending:
+            tag, future = pending.popleft()
+            yield tag, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
 
 @dataclass(slots=True)
 class SubtitleToSpeech:
@@ -78,6 +125,10 @@ class SubtitleToSpeech:
             - working_space_temp_alt_subs (str): The path to the alternative subtitles directory.
             - balabolka_path (str): The path to the Balabolka executable.
             - ffmpeg_path (str): The path to the FFmpeg executable.
+            - _clip_cache (Optional[ClipCache]): Persistent TTS clip cache shared by all engines.
+            - _pp_volume (float): Post-processing volume change in dB.
+            - _stream_eac3 (bool): Pipe the timeline straight into the EAC3 encoder instead of a WAV.
+            - _streamed (bool): Set when the current file was encoded by the streaming path.
 
         Methods:
             - ansi_srt(self) -> None:
@@ -111,6 +162,10 @@ class SubtitleToSpeech:
     balabolka_path: str = BALABOLKA_PATH
     ffmpeg_path: str = FFMPEG_PATH
     _pp_speed: float = 1.0
+    _clip_cache: Optional[ClipCache] = None
+    _pp_volume: float = 0.0
+    _stream_eac3: bool = False
+    _streamed: bool = False
 
     def ansi_srt(self) -> None:
         """
@@ -147,8 +202,11 @@ class SubtitleToSpeech:
             self.working_space_temp_main_subs, self.filename), encoding='ANSI')
         output_file: str = path.splitext(path.join(
             self.working_space_temp_main_subs, self.filename))[0] + '.wav'
-        self._generate_wav_file(engine, subtitles, output_file)
-        remove(path.join(self.working_space_temp, "temp.wav"))
+        self._generate_wav_file(engine, subtitles, output_file,
+                                cache_params={'rate': tts_speed, 'volume': tts_volume})
+        temp_wav: str = path.join(self.working_space_temp, "temp.wav")
+        if path.isfile(temp_wav):
+            remove(temp_wav)
 
     def _init_engine(self, tts_speed: str, tts_volume: str) -> pyttsx3.Engine:
         """
@@ -170,7 +228,8 @@ class SubtitleToSpeech:
         engine.setProperty('volume', float(tts_volume))
         return engine
 
-    def _generate_wav_file(self, engine: pyttsx3.Engine, subtitles: pysrt.SubRipFile, output_file: str) -> None:
+    def _generate_wav_file(self, engine: pyttsx3.Engine, subtitles: pysrt.SubRipFile, output_file: str,
+                           cache_params: Optional[Dict[str, str]] = None) -> None:
         """
             Generates a WAV audio file from the given subtitles using the specified TTS engine.
 
@@ -178,21 +237,25 @@ class SubtitleToSpeech:
                 - engine (pyttsx3.Engine): The TTS engine to use for speech synthesis.
                 - subtitles (pysrt.SubRipFile): The subtitles to convert to speech.
                 - output_file (str): The path to the output WAV file.
+                - cache_params (Optional[Dict[str, str]]): Engine settings that are part of the clip cache key.
         """
-        with wave.open(output_file, 'wb') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(22500)  # 22kHz
-
+        temp_wav: str = path.join(self.working_space_temp, "temp.wav")
+        with self._open_timeline(output_file, 22500) as timeline:  # Mono, 16-bit, 22kHz
             for i, subtitle in enumerate(subtitles, start=1):
                 print(
                     f"{i}\n{subtitle.start.to_time().strftime('%H:%M:%S.%f')[:-3]} --> {subtitle.end.to_time().strftime('%H:%M:%S.%f')[:-3]}\n{subtitle.text}\n")
-                start_time: float = subtitle.start.ordinal / 1000.0
-                self._save_subtitle_to_wav(engine, subtitle.text)
+                if self._clip_cache is None:
+                    self._save_subtitle_to_wav(engine, subtitle.text)
+                else:
+                    key: str = ClipCache.make_key(
+                        subtitle.text, 'harpo', 'Vocalizer Expressive Zosia Harpo 22kHz', cache_params)
+                    if not self._clip_cache.fetch_file(key, temp_wav):
+                        self._save_subtitle_to_wav(engine, subtitle.text)
+                        self._clip_cache.put_file(key, temp_wav)
                 if self._pp_speed != 1.0:
-                    self._pp_speed_file(path.join(self.working_space_temp, "temp.wav"))
-                self._add_empty_frame_if_needed(wav_file, start_time)
-                self._add_subtitle_to_wav(wav_file)
+                    self._pp_speed_file(temp_wav)
+                timeline.pad_to_ms(subtitle.start.ordinal)
+                self._add_subtitle_to_wav(timeline)
 
     def _save_subtitle_to_wav(self, engine: pyttsx3.Engine, text: str) -> None:
         """
@@ -206,33 +269,15 @@ class SubtitleToSpeech:
             self.working_space_temp, "temp.wav"))
         engine.runAndWait()
 
-    def _add_empty_frame_if_needed(self, wav_file: wave.Wave_write, start_time: float) -> None:
-        """
-            Adds an empty frame to the WAV file if the start time of the next subtitle is later than the current time in the audio.
-
-            Args:
-                - wav_file (wave.Wave_write): The WAV file to add the empty frame to.
-                - start_time (float): The start time of the next subtitle.
-        """
-        framerate: int = wav_file.getframerate()
-        nframes: int = wav_file.getnframes()
-        current_time: float = nframes / float(framerate)
-        if start_time > current_time:
-            empty_frame_duration: int = int(
-                (start_time - current_time) * framerate)
-            empty_frame: bytes = b'\x00' * empty_frame_duration * 2
-            wav_file.writeframes(empty_frame)
-
-    def _add_subtitle_to_wav(self, wav_file: wave.Wave_write) -> None:
+    def _add_subtitle_to_wav(self, timeline: TimelineWriter) -> None:
         """
-            Adds a subtitle to the WAV file.
+            Adds a subtitle to the WAV timeline.
 
             Args:
-                - wav_file (wave.Wave_write): The WAV file to add the subtitle to.
+                - timeline (TimelineWriter): The timeline to add the subtitle to.
         """
         with wave.open(path.join(self.working_space_temp, "temp.wav"), 'rb') as temp_file:
-            data: bytes = temp_file.readframes(temp_file.getnframes())
-            wav_file.writeframes(data)
+            timeline.write(temp_file.readframes(temp_file.getnframes()))
 
     def srt_to_wav_balabolka(self, tts_speed: str, tts_volume: str) -> None:
         """
@@ -250,16 +295,29 @@ class SubtitleToSpeech:
             self.working_space_temp_main_subs, path.splitext(self.filename)[0] + ".wav")
         command: List[str] = self._prepare_balabolka_command(
             balcon_path, file_path, output_wav_path, tts_speed, tts_volume)
+        subtitles: pysrt.SubRipFile = pysrt.open(file_path, encoding='ANSI')
 
-        command_thread: Thread = Thread(
-            target=call, args=(command,))
-        command_thread.start()
+        # Balabolka reads the whole file at once — cache the whole WAV keyed by the SRT content
+        cache_key: Optional[str] = None
+        if self._clip_cache is not None:
+            with open(file_path, 'r', encoding='ANSI') as srt_file:
+                cache_key = ClipCache.make_key(
+                    srt_file.read(), 'balabolka', 'IVONA 2 Agnieszka',
+                    {'speed': tts_speed, 'volume': tts_volume})
 
-        subtitles: pysrt.SubRipFile = pysrt.open(file_path, encoding='ANSI')
-        for subtitle in subtitles:
-            self.process_subtitle(subtitle)
+        if cache_key is not None and self._clip_cache.fetch_file(cache_key, output_wav_path):
+            console.print("Balabolka: plik WAV wczytany z cache.", style='green_bold')
+        else:
+            command_thread: Thread = Thread(
+                target=call, args=(command,))
+            command_thread.start()
+
+            for subtitle in subtitles:
+                self.process_subtitle(subtitle)
 
-        command_thread.join()
+            command_thread.join()
+            if cache_key is not None and path.isfile(output_wav_path):
+                self._clip_cache.put_file(cache_key, output_wav_path)
 
         # Balabolka generates whole WAV at once — per-subtitle speed extraction
         if self._pp_speed != 1.0 and path.isfile(output_wav_path):
@@ -303,131 +361,439 @@ class SubtitleToSpeech:
         print(f"{i}\n{start_time} --> {end_time}\n{text}\n")
         sleep(0.02)
 
-    async def generate_speech(self, subtitle: pysrt.SubRipItem, voice: str, output_file: str, rate: str, volume: str) -> None:
+    async def generate_speech(self, text: str, voice: str, rate: str, volume: str,
+                              word_boundaries: Optional[List[WordBoundary]] = None,
+                              session: Optional[EdgeSession] = None) -> bytes:
         """
-            Generates speech from a single subtitle using the specified TTS voice.
+            Generates speech from a single text using the specified TTS voice.
+
+            The streamed audio chunks are collected in memory; nothing is written to disk.
 
             Args:
-                - subtitle (pysrt.SubRipItem): The subtitle to convert to speech.
+                - text (str): The text to convert to speech.
                 - voice (str): The TTS voice to use.
-                - output_file (str): The path to the output audio file.
                 - rate (str): The speed of the TTS voice.
                 - volume (str): The volume of the TTS voice.
+                - word_boundaries (List[WordBoundary], optional): Receives the
+                  (offset, duration, word) of every spoken word when given.
+                - session (EdgeSession, optional): Pool of warm connections; without it
+                  a one-off connection is opened for this text.
+
+            Returns:
+                - bytes: The MP3 stream returned by Edge TTS.
         """
-        communicate = Communicate(
-            subtitle.text, voice, rate=rate, volume=volume)
-        with open(output_file, "wb") as file:
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    file.write(chunk["data"])
-
-    async def generate_wav_files(self, subtitles: pysrt.SubRipFile, voice: str, rate: str, volume: str) -> List[str]:
+        if session is None:
+            async with EdgeSession(pool_size=1) as own_session:
+                return await own_session.synthesize(text, voice, rate, volume, word_boundaries)
+        return await session.synthesize(text, voice, rate, volume, word_boundaries)
+
+    async def _edge_request(self, controller: ConcurrencyController, text: str, voice: str, rate: str,
+                            volume: str, label: str, word_boundaries: Optional[List[WordBoundary]] = None,
+                            max_retries: int = 3, session: Optional[EdgeSession] = None) -> bytes:
         """
-            Generates WAV audio files from the given subtitles using the specified TTS voice.
+            Runs one Edge request inside a controller slot, retrying failures.
 
             Args:
-                - subtitles (pysrt.SubRipFile): The subtitles to convert to speech.
+                - controller (ConcurrencyController): Adaptive limit of requests in flight.
+                - text (str): The text to convert to speech.
                 - voice (str): The TTS voice to use.
                 - rate (str): The speed of the TTS voice.
                 - volume (str): The volume of the TTS voice.
+                - label (str): Name of the request in error messages.
+                - word_boundaries (List[WordBoundary], optional): Receives the word
+                  boundaries of the successful attempt.
+                - max_retries (int): Attempts before the error is raised.
+                - session (EdgeSession, optional): Pool of warm connections to send the request over.
 
             Returns:
-                - List[str]: The paths to the generated WAV files.
+                - bytes: The MP3 stream returned by Edge TTS.
         """
-        tasks = []
-        mp3_files: List[str] = []
-        file_name: str = path.splitext(subtitles.path)[0]
-        # Zmniejszam liczbę równoległych połączeń
-        semaphore: Semaphore = Semaphore(1)
         timeout: float = 30.0  # Dodaję timeout na połączenie
+        for attempt in range(max_retries):
+            if word_boundaries is not None:
+                word_boundaries.clear()
+            try:
+                async with controller.aslot(cost=len(text)) as slot, timeout_scope(timeout):
+                    audio = await self.generate_speech(text, voice, rate, volume, word_boundaries, session)
+                    if audio:
+                        return audio
+                    slot.fail()
+                # Zwiększam czas oczekiwania między próbami
+                await asyncio_sleep(2)
+            except (TimeoutError, Exception) as e:
+                if attempt == max_retries - 1:
+                    console.print(
+                        f"Failed to generate {label} after {max_retries} attempts: {e}", style="red_bold")
+                    raise
+                # Zwiększam czas oczekiwania proporcjonalnie do liczby prób
+                await asyncio_sleep(attempt * 2)
+        raise RuntimeError(f"Edge TTS returned no audio for {label}")
+
+    @contextmanager
+    def _edge_requests(self, voice: str, rate: str, volume: str,
+                       concurrency: int) -> Iterator[Callable[..., Future]]:
+        """
+            Runs Edge requests on a background event loop sharing one controller and session.
+
+            The caller thread stays synchronous: it submits texts and waits on
+            the returned futures, so clips can be consumed in order while the
+            next requests are in flight.
+
+            Args:
+                - voice (str): The TTS voice to use.
+                - rate (str): The speed of the TTS voice.
+                - volume (str): The volume of the TTS voice.
+                - concurrency (int): Ceiling of the adaptive number of requests in flight.
 
-        async def generate_with_retry(subtitle: pysrt.SubRipItem, output_file: str, max_retries: int = 3) -> None:
-            async with semaphore:
-                for attempt in range(max_retries):
-                    try:
-                        async with timeout_scope(timeout):
-                            await self.generate_speech(subtitle, voice, output_file, rate, volume)
-                            if path.exists(output_file) and stat(output_file).st_size > 0:
-                                return
-                            # Zwiększam czas oczekiwania między próbami
-                            await asyncio_sleep(2)
-                    except (TimeoutError, Exception) as e:
-                        if attempt == max_retries - 1:
-                            console.print(
-                                f"Failed to generate {output_file} after {max_retries} attempts: {e}", style="red_bold")
-                            raise
-                        # Zwiększam czas oczekiwania proporcjonalnie do liczby prób
-                        await asyncio_sleep(attempt * 2)
-
-        for i, subtitle in enumerate(subtitles, start=1):
-            output_file: str = f"{file_name}_{i}.mp3"
-            mp3_files.append(output_file)
-            tasks.append(create_task(
-                generate_with_retry(subtitle, output_file)))
-
-        await gather(*tasks)
-        return natsorted(mp3_files)
-
-    def merge_audio_files(self, mp3_files: List[str], subtitles: pysrt.SubRipFile, dir_path: str) -> None:
+            Yields:
+                - Callable[..., Future]: submit(text, label, word_boundaries=None), returning
+                  a future of the MP3 bytes.
+        """
+        # Równoległość adaptacyjna (AIMD): start od ustawionego sufitu, cofanie przy
+        # błędach i powrót, dopóki Edge odpowiada szybko (opóźnienie na znak tekstu)
+        controller = ConcurrencyController(initial=concurrency, maximum=concurrency, name='Edge')
+        # Zapytania idą po ciepłych połączeniach z puli zamiast nowego handshake'u na każdą linię
+        session = EdgeSession(pool_size=concurrency)
+        loop = new_event_loop()
+        loop_thread = Thread(target=loop.run_forever, name='edge-loop', daemon=True)
+        loop_thread.start()
+
+        async def shutdown() -> None:
+            # Requests abandoned by an early exit are cancelled before the pool closes
+            tasks = [task for task in all_tasks() if task is not current_task()]
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            await session.close()
+
+        def submit(text: str, label: str, word_boundaries: Optional[List[WordBoundary]] = None) -> Future:
+            return run_coroutine_threadsafe(self._edge_request(
+                controller, text, voice, rate, volume, label, word_boundaries, session=session), loop)
+
+        try:
+            run_coroutine_threadsafe(session.__aenter__(), loop).result()
+            yield submit
+        finally:
+            run_coroutine_threadsafe(shutdown(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
+            console.print(str(controller), style='blue_italic')
+            console.print(str(session), style='blue_italic')
+
+    def generate_edge_clips(self, subtitles: pysrt.SubRipFile, voice: str, rate: str, volume: str,
+                            concurrency: int = EDGE_DEFAULT_CONCURRENCY,
+                            journal: Optional[SynthesisJournal] = None) -> Iterator[bytes]:
         """
-            Merges the given MP3 audio files into a single WAV file.
+            Generates in-memory MP3 clips for the given subtitles using the specified TTS voice.
+
+            Requests run ahead of the consumer by at most ``DEFAULT_PREFETCH``
+            windows of the concurrency ceiling, so memory stays bounded.
 
             Args:
-                - mp3_files (List[str]): The paths to the MP3 files to merge.
-                - subtitles (pysrt.SubRipFile): The subtitles corresponding to the audio files.
-                - dir_path (str): The directory where the audio files are located.
+                - subtitles (pysrt.SubRipFile): The subtitles to convert to speech.
+                - voice (str): The TTS voice to use.
+                - rate (str): The speed of the TTS voice.
+                - volume (str): The volume of the TTS voice.
+                - concurrency (int): Ceiling of the adaptive number of requests in flight.
+                - journal (SynthesisJournal, optional): Clips journaled by an earlier run are reused.
+
+            Yields:
+                - bytes: One MP3 clip per subtitle, in subtitle order.
         """
-        file_name: str = path.splitext(subtitles.path)[0]
-        with wave.open(f"{file_name}.wav", 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(24000)
+        keys: List[str] = [
+            ClipCache.make_key(subtitle.text, 'edge', voice, {'rate': rate, 'volume': volume})
+            for subtitle in subtitles]
+
+        with self._edge_requests(voice, rate, volume, concurrency) as submit:
+            def jobs() -> Iterator[Tuple[str, Future]]:
+                for index, (subtitle, key) in enumerate(zip(subtitles, keys)):
+                    if journal is not None and (audio := journal.get(index, key)) is not None:
+                        yield 'journal', _completed(audio)
+                    elif self._clip_cache is not None and (audio := self._clip_cache.get(key)) is not None:
+                        yield 'cache', _completed(audio)
+                    else:
+                        yield 'edge', submit(subtitle.text, f"subtitle {index + 1}")
+
+            for index, (source, audio) in enumerate(_prefetched(jobs(), concurrency * DEFAULT_PREFETCH)):
+                if source == 'edge' and self._clip_cache is not None:
+                    self._clip_cache.put(keys[index], audio)
+                if source != 'journal' and journal is not None:
+                    journal.put(index, keys[index], audio, '.mp3', stored_at=self._cached_path(keys[index]))
+                yield audio
+
+    def _coalesced_edge_clips(self, subtitles: pysrt.SubRipFile, voice: str, rate: str, volume: str,
+                              concurrency: int, coalesce_chars: int,
+                              journal: Optional[SynthesisJournal] = None) -> Iterator[np.ndarray]:
+        """
+            Synthesizes short consecutive subtitles together and splits them back per cue.
 
-            for i, mp3_file in enumerate(mp3_files, start=1):
-                print(
-                    f"{i}\n{subtitles[i-1].start.to_time().strftime('%H:%M:%S.%f')[:-3]} --> {subtitles[i-1].end.to_time().strftime('%H:%M:%S.%f')[:-3]}\n{subtitles[i-1].text}\n")
-                mp3_file_path: str = path.join(dir_path, mp3_file)
-                if path.isfile(mp3_file_path):
-                    start_time: float = subtitles[i-1].start.ordinal / 1000.0
-                    sound: AudioSegment = AudioSegment.from_file(
-                        mp3_file_path, format="mp3")
-                    remove(mp3_file_path)
-                    self._add_empty_frame_if_needed(wav_file, start_time)
-                    sound_data: bytes = sound.raw_data
-                    wav_file.writeframes(sound_data)
-
-    def srt_to_wav_edge_online(self, tts: str, tts_speed: str, tts_volume: str) -> None:
+            Clips found in the journal or the clip cache are not requested
+            again; a group never spans them, so its audio stays contiguous.
+
+            Args:
+                - subtitles (pysrt.SubRipFile): The subtitles to convert to speech.
+                - voice (str): The TTS voice to use.
+                - rate (str): The speed of the TTS voice.
+                - volume (str): The volume of the TTS voice.
+                - concurrency (int): Ceiling of the adaptive number of requests in flight.
+                - coalesce_chars (int): Character budget of one request.
+                - journal (SynthesisJournal, optional): Clips journaled by an earlier run are reused.
+
+            Yields:
+                - np.ndarray: One int16 clip per subtitle, in subtitle order.
+        """
+        texts: List[str] = [subtitle.text for subtitle in subtitles]
+        # Clips cut from a group sound slightly different from single requests
+        params = {'rate': rate, 'volume': volume, 'coalesced': True}
+        keys: List[str] = [ClipCache.make_key(text, 'edge', voice, params) for text in texts]
+
+        def stored(index: int) -> Optional[np.ndarray]:
+            audio = journal.get_audio(index, keys[index]) if journal is not None else None
+            if audio is None and self._clip_cache is not None:
+                audio = self._clip_cache.get_audio(keys[index])
+            return audio
+
+        hits = {index for index, key in enumerate(keys)
+                if (journal is not None and journal.has(index, key))
+                or (self._clip_cache is not None and self._clip_cache.contains(key))}
+        plan: List[List[int]] = plan_groups(texts, coalesce_chars, hits)
+        groups: List[CoalescedGroup] = [CoalescedGroup([texts[index] for index in indices]) for indices in plan]
+        console.print(
+            f"Edge: {len(texts) - len(hits)} linii w {len(groups)} zapytaniach "
+            f"({len(hits)} z cache)", style='blue_bold')
+
+        def group_jobs(submit: Callable[..., Future]) -> Iterator[Tuple[Any, Future]]:
+            for number, group in enumerate(groups):
+                words: List[WordBoundary] = []
+                yield (group, words), submit(group.text, f"request {number + 1}", words)
+
+        def split(item: Tuple[Any, bytes]) -> List[np.ndarray]:
+            (group, words), mp3 = item
+            return group.split(decode_pcm(mp3, EDGE_SAMPLE_RATE), words, EDGE_SAMPLE_RATE)
+
+        split_groups: Optional[Iterator[List[np.ndarray]]] = None
+        try:
+            with self._edge_requests(voice, rate, volume, concurrency) as submit:
+                split_groups = run_pipeline(
+                    _prefetched(group_jobs(submit), concurrency * DEFAULT_PREFETCH),
+                    [Stage('decode', split, POST_PROCESS_WORKERS)])
+                pending_groups = zip(plan, split_groups)
+
+                group_clips: Dict[int, np.ndarray] = {}
+                for index, key in enumerate(keys):
+                    audio = stored(index) if index in hits else None
+                    fresh: bool = audio is None
+                    if audio is None and index in hits:
+                        # Evicted or torn since the lookup: request the line alone in the shared window
+                        audio = decode_pcm(submit(texts[index], f"subtitle {index + 1}").result(), EDGE_SAMPLE_RATE)
+                    if audio is None:
+                        if index not in group_clips:
+                            indices, clips = next(pending_groups)
+                            group_clips.update(zip(indices, clips))
+                        audio = group_clips.pop(index)
+                    if fresh and self._clip_cache is not None:
+                        self._clip_cache.put_audio(key, audio)
+                    if journal is not None and not (index in hits and journal.has(index, key)):
+                        journal.put_audio(index, key, audio, stored_at=self._cached_path(key))
+                    yield audio
+        finally:
+            # After the requests are cancelled, so the decode stage drains without waiting on Edge
+            if split_groups is not None:
+                split_groups.close()
+
+    def srt_to_wav_edge_online(self, tts: str, tts_speed: str, tts_volume: str,
+                               concurrency: int = EDGE_DEFAULT_CONCURRENCY, coalesce_chars: int = 0) -> None:
         """
             Converts the subtitle file to a WAV audio file using Edge TTS.
 
+            Clips stay in memory: the MP3 streams are decoded in parallel over
+            ffmpeg pipes and placed on the timeline without per-cue files.
+
             Args:
                 - tts (str): The TTS service to use.
                 - tts_speed (str): The speed of the TTS voice.
                 - tts_volume (str): The volume of the TTS voice.
+                - concurrency (int): Ceiling of Edge requests in flight at once (adaptive window).
+                - coalesce_chars (int): Character budget for packing consecutive short
+                  subtitles into one request (0 = one request per subtitle).
         """
         self.ansi_srt()
         voice = "pl-PL-ZofiaNeural" if tts == "TTS - Zofia - Edge" else "pl-PL-MarekNeural"
 
         subtitles: pysrt.SubRipFile = pysrt.open(path.join(
             self.working_space_temp_main_subs, self.filename), encoding='ANSI')
-        mp3_files: List[str] = run(self.generate_wav_files(
-            subtitles, voice, tts_speed, tts_volume))
+        output_file: str = path.splitext(path.join(
+            self.working_space_temp_main_subs, self.filename))[0] + '.wav'
+        with self._synthesis_journal() as journal:
+            if coalesce_chars > 0:
+                clips = self._coalesced_edge_clips(
+                    subtitles, voice, tts_speed, tts_volume, concurrency, coalesce_chars, journal)
+            else:
+                clips = decode_ordered(self.generate_edge_clips(
+                    subtitles, voice, tts_speed, tts_volume, concurrency, journal), EDGE_SAMPLE_RATE)
+            self._write_timeline(output_file, EDGE_SAMPLE_RATE, subtitles, clips)
+
+    def _cached_path(self, key: str) -> Optional[str]:
+        """Returns the clip cache file of *key* for the journal to point at (None without the cache)."""
+        return self._clip_cache.path_for(key) if self._clip_cache is not None else None
+
+    @contextmanager
+    def _synthesis_journal(self) -> Iterator[SynthesisJournal]:
+        """Opens the resumable synthesis journal of the current subtitle file.
+
+        The journal is deleted when the block completes (the timeline is
+        built) and kept for the next run when it raises.
+
+        Yields:
+            SynthesisJournal: The journal to consult and record clips in.
+        """
+        journal = SynthesisJournal.for_subtitles(self.filename)
+        if journal.resumed:
+            console.print(
+                f"Wznawianie syntezy: {journal.resumed} klipów zapisanych w dzienniku",
+                style='blue_bold')
+        try:
+            yield journal
+        except BaseException:
+            journal.close()
+            raise
+        journal.discard()
+
+    @contextmanager
+    def _open_timeline(self, output_file: str, sample_rate: int) -> Iterator[TimelineWriter]:
+        """Opens the lector timeline: a WAV file, or the EAC3 encoder in streaming mode.
+
+        In streaming mode the PCM goes to the stdin of one FFmpeg process that
+        applies the volume, mixes it with the original track and encodes
+        EAC3, so *output_file* is never written.
+
+        Args:
+            output_file: Path of the WAV file written in the normal mode.
+            sample_rate: Sample rate of the mono 16-bit timeline.
+
+        Yields:
+            TimelineWriter: The timeline to place clips on.
+
+        Raises:
+            RuntimeError: FFmpeg exited with an error; the inputs are kept
+                and the partial EAC3 file is removed.
+        """
+        if not self._stream_eac3:
+            with TimelineWriter(output_file, sample_rate) as timeline:
+                yield timeline
+            return
+
+        console.print("Strumieniowanie lektora do EAC3 (bez pliku WAV)...", style='blue_bold')
+        command: List[str] = self._build_stream_command(sample_rate)
+        process: Popen = Popen(command, stdin=PIPE)
+        try:
+            with TimelineWriter(process.stdin, sample_rate, raw=True) as timeline:
+                yield timeline
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass  # FFmpeg already exited; its return code tells why
+            returncode: int = process.wait()
+            if returncode != 0:
+                if path.isfile(command[-1]):
+                    remove(command[-1])
+                raise RuntimeError(f"FFmpeg EAC3 encode failed with exit code {returncode}")
+        self._streamed = True
+
+    def _build_stream_command(self, sample_rate: int) -> List[str]:
+        """Builds the FFmpeg command of the streaming mode (same mix as merge_tts_audio).
+
+        Args:
+            sample_rate: Sample rate of the s16le PCM piped to stdin.
+
+        Returns:
+            List[str]: The FFmpeg command.
+        """
+        file_name: str = path.splitext(self.filename)[0]
+        output_file: str = path.join(self.working_space_output, file_name + ".eac3")
+        original_file: Optional[str] = self._get_files_dict(self.working_space_temp).get(file_name)
+
+        command: List[str] = [
+            self.ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+        ]
+        if original_file is not None:
+            volume_db: float = 7.0 + self._pp_volume
+            command += [
+                "-i", path.join(self.working_space_temp, original_file),
+                "-filter_complex", f"[0:a]volume={volume_db:.1f}dB[a1];[a1][1:a]amix=inputs=2:duration=longest",
+            ]
+        elif self._pp_volume != 0.0:
+            command += ["-af", f"volume={self._pp_volume:.1f}dB"]
+        command += ["-c:a", "eac3", output_file]
+        return command
+
+    def _finish_streamed_audio(self) -> None:
+        """Removes the inputs of a file that was already encoded by the streaming path."""
+        file_name: str = path.splitext(self.filename)[0]
+        original_file: Optional[str] = self._get_files_dict(self.working_space_temp).get(file_name)
+        if original_file is not None:
+            remove(path.join(self.working_space_temp, original_file))
+        self._remove_same_name_files(self.working_space_temp_main_subs, file_name)
+
+    def _write_timeline(self, output_file: str, sample_rate: int, subtitles: pysrt.SubRipFile,
+                        clips: Iterable) -> None:
+        """Places synthesized int16 clips on the subtitle timeline of a mono WAV.
+
+        Synthesis, post-processing and writing run as overlapped pipeline
+        stages: *clips* is drained in a feeder thread, atempo runs on
+        ``POST_PROCESS_WORKERS`` threads and this thread writes each clip
+        as soon as the next one in timeline order is ready.
+
+        Args:
+            output_file: Path of the WAV file to write.
+            sample_rate: Sample rate of the clips.
+            subtitles: Subtitles matching *clips* one to one.
+            clips: 1-D int16 clips in subtitle order (``None`` = silence).
+        """
+        stages: List[Stage] = []
         if self._pp_speed != 1.0:
-            for mp3_file in mp3_files:
-                mp3_path = path.join(self.working_space_temp_main_subs, path.basename(mp3_file)) if not path.isabs(mp3_file) else mp3_file
-                if path.isfile(mp3_path):
-                    self._pp_speed_file(mp3_path)
-        self.merge_audio_files(mp3_files, subtitles,
-                               self.working_space_temp_main_subs)
-
-    def srt_to_wav_stylish(self, tts_speed: str, tts_volume: str) -> None:
+            stages.append(Stage(
+                'atempo',
+                lambda audio: self._pp_speed_audio(audio, sample_rate) if audio is not None and len(audio) > 0 else audio,
+                POST_PROCESS_WORKERS))
+
+        with self._open_timeline(output_file, sample_rate) as timeline:
+            ready_clips = run_pipeline(clips, stages)
+            try:
+                for i, (subtitle, audio_int16) in enumerate(zip(subtitles, ready_clips), start=1):
+                    print(
+                        f"{i}\n{subtitle.start.to_time().strftime('%H:%M:%S.%f')[:-3]} --> "
+                        f"{subtitle.end.to_time().strftime('%H:%M:%S.%f')[:-3]}\n{subtitle.text}\n")
+
+                    timeline.pad_to_ms(subtitle.start.ordinal)
+                    if audio_int16 is not None:
+                        timeline.write(audio_int16)
+            finally:
+                # Stops the feeder and joins the stages before the caller closes clients/journal
+                ready_clips.close()
+
+    def srt_to_wav_stylish(self, tts_speed: str, tts_volume: str, concurrency: int = 1, workers: int = 1,
+                           backend: str = 'eager', quantize: bool = False, server_url: str = '') -> None:
         """Converts the subtitle file to a WAV audio file using STylish-TTS-Pl.
 
         Args:
             tts_speed: Speed multiplier as string (e.g. '1.0'). Range 0.5-2.0.
             tts_volume: Volume (unused, kept for interface consistency).
+            concurrency: Number of subtitles synthesized at the same time.
+            workers: Worker processes with a model replica each (1 = in this process).
+            backend: Inference backend: 'eager', 'onnx' or 'torchscript'.
+            quantize: Dynamic INT8 model on CPU (eager backend only).
+            server_url: Resident STylish server (modules.tts_stylish_server);
+                when set, the model settings above are the server's.
         """
-        from modules.tts_stylish import StylishTTS, STYLISH_SAMPLE_RATE
+        from modules.synthesis_scheduler import SynthesisScheduler
+        from modules.tts_stylish import (StylishPhonemizer, StylishTTS,
+                                         STYLISH_SAMPLE_RATE, STYLISH_SUBTITLE_WINDOW)
+        from modules.tts_stylish_pool import StylishWorkerPool
+        from modules.tts_stylish_server import StylishServerClient
 
         self.ansi_srt()
         subtitles: pysrt.SubRipFile = pysrt.open(path.join(
@@ -436,35 +802,38 @@ class SubtitleToSpeech:
             self.working_space_temp_main_subs, self.filename))[0] + '.wav'
 
         speed = float(tts_speed) if tts_speed not in ('auto', '') else 1.0
-        tts = StylishTTS()
-
-        with wave.open(output_file, 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(STYLISH_SAMPLE_RATE)
-
-            for i, subtitle in enumerate(subtitles, start=1):
-                print(
-                    f"{i}\n{subtitle.start.to_time().strftime('%H:%M:%S.%f')[:-3]} --> "
-                    f"{subtitle.end.to_time().strftime('%H:%M:%S.%f')[:-3]}\n{subtitle.text}\n")
-                start_time: float = subtitle.start.ordinal / 1000.0
-
-                audio_int16 = tts.synthesize_long(subtitle.text, speed=speed)
-
-                if self._pp_speed != 1.0 and len(audio_int16) > 0:
-                    audio_int16 = self._pp_speed_audio(audio_int16, STYLISH_SAMPLE_RATE)
-
-                framerate: int = wav_file.getframerate()
-                nframes: int = wav_file.getnframes()
-                current_time: float = nframes / float(framerate)
-                if start_time > current_time:
-                    empty_frames: int = int((start_time - current_time) * framerate)
-                    wav_file.writeframes(b'\x00' * empty_frames * 2)
-
-                if len(audio_int16) > 0:
-                    wav_file.writeframes(audio_int16.tobytes())
-
-    def srt_to_wav_fish_api(self, tts_speed: str, tts_volume: str, fish_voice: Optional[str] = None, fish_temperature: float = 0.8) -> None:
+        if server_url:
+            tts = StylishServerClient(server_url)
+            quantize, backend = tts.quantize, tts.backend
+            tts.prefetch_phonemes(subtitle.text for subtitle in subtitles)
+            # Let this file's windows join the server batches of other files
+            concurrency = max(concurrency, 2)
+        elif workers > 1:
+            # Phonemes are prefetched here and picked up by the workers from the disk cache
+            StylishPhonemizer().prefetch(subtitle.text for subtitle in subtitles)
+            tts = StylishWorkerPool.shared(workers, device='cpu', backend=backend, quantize=quantize)
+            concurrency = max(concurrency, workers)
+        else:
+            tts = StylishTTS.shared(backend=backend, quantize=quantize)
+            tts.prefetch_phonemes(subtitle.text for subtitle in subtitles)
+        cache_params = {'speed': speed}
+        if quantize and backend == 'eager':
+            # INT8 output differs slightly from fp32 — keep the clips apart in the cache
+            cache_params['precision'] = 'int8'
+        with self._synthesis_journal() as journal:
+            scheduler = SynthesisScheduler(
+                lambda text: tts.synthesize_batch([text], speed=speed)[0], concurrency,
+                cache=self._clip_cache,
+                cache_key=lambda text: ClipCache.make_key(text, 'stylish', 'pl', cache_params),
+                synthesize_batch=lambda texts: tts.synthesize_batch(texts, speed=speed),
+                batch_size=STYLISH_SUBTITLE_WINDOW,
+                journal=journal)
+            clips = scheduler.map(subtitle.text for subtitle in subtitles)
+
+            self._write_timeline(output_file, STYLISH_SAMPLE_RATE, subtitles, clips)
+
+    def srt_to_wav_fish_api(self, tts_speed: str, tts_volume: str, fish_voice: Optional[str] = None, fish_temperature: float = 0.8, concurrency: int = 1,
+                            fish_api_urls: Optional[str] = None) -> None:
         """Converts the subtitle file to a WAV audio file using Fish Audio S2 Pro API.
 
         Args:
@@ -472,8 +841,12 @@ class SubtitleToSpeech:
             tts_volume: Unused (auto), kept for interface consistency.
             fish_voice: Name of the voice profile to use.
             fish_temperature: Temperature for expressiveness (0.0-1.0).
+            concurrency: Ceiling of synthesis requests in flight at once (adaptive window).
+            fish_api_urls: Comma-separated Fish Audio servers to spread the requests over
+                (default: the local one).
         """
-        from modules.tts_fish_api import FishTTSClient, FISH_SAMPLE_RATE
+        from modules.synthesis_scheduler import SynthesisScheduler
+        from modules.tts_fish_api import FishTTSClient, FISH_SAMPLE_RATE, parse_fish_urls
 
         self.ansi_srt()
         subtitles: pysrt.SubRipFile = pysrt.open(path.join(
@@ -481,33 +854,24 @@ class SubtitleToSpeech:
         output_file: str = path.splitext(path.join(
             self.working_space_temp_main_subs, self.filename))[0] + '.wav'
 
-        client = FishTTSClient(voice=fish_voice, temperature=fish_temperature)
-
-        with wave.open(output_file, 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(FISH_SAMPLE_RATE)
-
-            for i, subtitle in enumerate(subtitles, start=1):
-                print(
-                    f"{i}\n{subtitle.start.to_time().strftime('%H:%M:%S.%f')[:-3]} --> "
-                    f"{subtitle.end.to_time().strftime('%H:%M:%S.%f')[:-3]}\n{subtitle.text}\n")
-                start_time: float = subtitle.start.ordinal / 1000.0
-
-                audio_int16 = client.synthesize(subtitle.text)
-
-                if self._pp_speed != 1.0 and len(audio_int16) > 0:
-                    audio_int16 = self._pp_speed_audio(audio_int16, FISH_SAMPLE_RATE)
-
-                framerate: int = wav_file.getframerate()
-                nframes: int = wav_file.getnframes()
-                current_time: float = nframes / float(framerate)
-                if start_time > current_time:
-                    empty_frames: int = int((start_time - current_time) * framerate)
-                    wav_file.writeframes(b'\x00' * empty_frames * 2)
-
-                if len(audio_int16) > 0:
-                    wav_file.writeframes(audio_int16.tobytes())
+        # Pula połączeń keep-alive wielkości sufitu równoległości, rozłożona na wszystkie serwery
+        client = FishTTSClient(parse_fish_urls(fish_api_urls), voice=fish_voice,
+                               temperature=fish_temperature, concurrency=concurrency)
+        controller = ConcurrencyController(initial=concurrency, maximum=concurrency, name='Fish')
+        with client, self._synthesis_journal() as journal:
+            scheduler = SynthesisScheduler(
+                client.synthesize, concurrency,
+                cache=self._clip_cache,
+                cache_key=lambda text: ClipCache.make_key(
+                    text, 'fish', fish_voice, {'temperature': fish_temperature}),
+                controller=controller,
+                journal=journal)
+            clips = scheduler.map(subtitle.text for subtitle in subtitles)
+
+            self._write_timeline(output_file, FISH_SAMPLE_RATE, subtitles, clips)
+        console.print(str(controller), style='blue_italic')
+        if len(client.endpoints) > 1:
+            console.print(str(client.endpoints), style='blue_italic')
 
     def srt_to_wav_readlover(
         self,
@@ -516,6 +880,7 @@ class SubtitleToSpeech:
         readlover_api_key: str,
         readlover_speaker_id: int = 6,
         readlover_preset: str = "neutral",
+        concurrency: int = 1,
     ) -> None:
         """Converts the subtitle file to a WAV audio file using ReadLover API.
 
@@ -525,7 +890,9 @@ class SubtitleToSpeech:
             readlover_api_key: Bearer API key for ReadLover.
             readlover_speaker_id: Speaker ID from /v1/voices.
             readlover_preset: 'neutral' or 'expressive'.
+            concurrency: Ceiling of synthesis requests in flight at once (adaptive window).
         """
+        from modules.synthesis_scheduler import SynthesisScheduler
         from modules.tts_readlover import ReadLoverClient, READLOVER_SAMPLE_RATE
 
         length_scale = 1.0
@@ -548,38 +915,30 @@ class SubtitleToSpeech:
             preset=readlover_preset,
             length_scale=length_scale,
         )
-
-        with wave.open(output_file, 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(READLOVER_SAMPLE_RATE)
-
-            for i, subtitle in enumerate(subtitles, start=1):
-                print(
-                    f"{i}\n{subtitle.start.to_time().strftime('%H:%M:%S.%f')[:-3]} --> "
-                    f"{subtitle.end.to_time().strftime('%H:%M:%S.%f')[:-3]}\n{subtitle.text}\n")
-                start_time: float = subtitle.start.ordinal / 1000.0
-
-                audio_int16 = client.synthesize(subtitle.text)
-
-                if self._pp_speed != 1.0 and len(audio_int16) > 0:
-                    audio_int16 = self._pp_speed_audio(audio_int16, READLOVER_SAMPLE_RATE)
-
-                framerate: int = wav_file.getframerate()
-                nframes: int = wav_file.getnframes()
-                current_time: float = nframes / float(framerate)
-                if start_time > current_time:
-                    empty_frames: int = int((start_time - current_time) * framerate)
-                    wav_file.writeframes(b'\x00' * empty_frames * 2)
-
-                if len(audio_int16) > 0:
-                    wav_file.writeframes(audio_int16.tobytes())
+        controller = ConcurrencyController(initial=concurrency, maximum=concurrency, name='ReadLover')
+        with self._synthesis_journal() as journal:
+            scheduler = SynthesisScheduler(
+                client.synthesize, concurrency,
+                cache=self._clip_cache,
+                cache_key=lambda text: ClipCache.make_key(
+                    text, 'readlover', str(readlover_speaker_id),
+                    {'language_id': client.language_id, 'preset': readlover_preset,
+                     'length_scale': length_scale}),
+                controller=controller,
+                journal=journal)
+            clips = scheduler.map(subtitle.text for subtitle in subtitles)
+
+            self._write_timeline(output_file, READLOVER_SAMPLE_RATE, subtitles, clips)
+        console.print(str(controller), style='blue_italic')
 
     def srt_to_wav_elevenbytes(self, tts_speed: str, tts_volume: str, elevenbytes_voice: Optional[str] = None) -> None:
         """Async parallel batch synthesis via ElevenBytes (ElevenLabs proxy).
 
-        Saves each MP3 to disk cache so progress survives crashes.
-        On restart, loads existing MP3s and retries only missing ones.
+        Saves each MP3 to the content-addressed clip cache so progress survives
+        crashes and repeated lines are synthesized once. On restart, only lines
+        missing from the cache are requested. The timeline is built while the
+        rounds are still running: each clip is decoded and written as soon as
+        it and every clip before it are in the cache (or given up on).
 
         Args:
             tts_speed: Unused (auto), kept for interface consistency.
@@ -589,10 +948,8 @@ class SubtitleToSpeech:
         import re
         import sys
         import time as _time
-        from io import BytesIO
         from pathlib import Path as _Path
         from modules.tts_elevenbytes import TTS as ElevenBytesTTS
-        import numpy as np
 
         # Force unbuffered stdout for real-time terminal visibility
         if hasattr(sys.stdout, 'reconfigure'):
@@ -608,11 +965,17 @@ class SubtitleToSpeech:
         output_file: str = path.splitext(path.join(
             self.working_space_temp_main_subs, self.filename))[0] + '.wav'
 
-        # MP3 cache dir — survives crashes
-        cache_dir = _Path(self.working_space_temp_main_subs) / "_elevenbytes_cache"
-        cache_dir.mkdir(parents=True, exist_ok=True)
+        # MP3 clip cache — survives crashes; per-file fallback when the shared cache is disabled
+        voice: str = elevenbytes_voice or 'dallin'
+        fallback_cache_dir: Optional[_Path] = None
+        if self._clip_cache is not None:
+            cache: ClipCache = self._clip_cache
+        else:
+            fallback_cache_dir = _Path(self.working_space_temp_main_subs) / "_elevenbytes_cache"
+            cache = ClipCache(root=str(fallback_cache_dir))
 
-        tts = ElevenBytesTTS(default_voice=elevenbytes_voice or 'dallin')
+        MAX_CONCURRENCY: int = 85
+        tts = ElevenBytesTTS(default_voice=voice, concurrency=MAX_CONCURRENCY)
 
         # ── Phase 1: Parse & clean all subtitles ──
         sub_items: list[tuple[int, float, str]] = []
@@ -634,193 +997,212 @@ class SubtitleToSpeech:
                 f"{sub.end.to_time().strftime('%H:%M:%S.%f')[:-3]}  "
                 f"{text[:80]}", flush=True)
 
-        # ── Phase 1.5: Load cached MP3s from previous runs ──
-        cached_indices: set[int] = set()
-        for mp3_file in cache_dir.glob("*.mp3"):
-            try:
-                idx = int(mp3_file.stem)
-                if mp3_file.stat().st_size >= 1024:
-                    cached_indices.add(idx)
-            except (ValueError, OSError):
-                pass
-
-        synthable: list[tuple[int, str]] = [
-            (idx, text) for idx, _, text in sub_items if len(text) >= 2
-        ]
-        total_to_synth: int = len(synthable)
-
-        if cached_indices:
+        # ── Phase 1.5: Look up cached MP3s — identical lines are synthesized once ──
+        item_keys: dict[int, str] = {
+            idx: ClipCache.make_key(text, 'elevenbytes', voice, {'fmt': 'mp3'})
+            for idx, _, text in sub_items if len(text) >= 2
+        }
+        unique_items: dict[str, tuple[int, str]] = {}
+        for idx, _, text in sub_items:
+            if idx in item_keys:
+                unique_items.setdefault(item_keys[idx], (idx, text))
+        cached_keys: set[str] = {key for key in unique_items if cache.contains(key)}
+        total_to_synth: int = len(unique_items)
+
+        if cached_keys:
             console.print(
-                f"[cyan bold]ElevenBytes cache: {len(cached_indices)} "
-                f"MP3s loaded from previous run"
+                f"[cyan bold]ElevenBytes cache: {len(cached_keys)} "
+                f"MP3s loaded from cache"
             )
 
         pending: list[tuple[int, str]] = [
-            (idx, text) for idx, text in synthable if idx not in cached_indices
+            (idx, text) for key, (idx, text) in unique_items.items() if key not in cached_keys
         ]
 
         print(
             f"\nElevenBytes: {len(sub_items)} parsed, "
-            f"{len(cached_indices)} cached, "
+            f"{total_to_synth} unique, "
+            f"{len(cached_keys)} cached, "
             f"{len(pending)} to synthesize",
             flush=True,
         )
 
-        # ── Phase 2: Parallel with real-time output — retry until 100% or 5h ──
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        import threading
+        # ── Phase 2: Async rounds with real-time output — retry until 100% or 5h ──
+        # One event loop drives every request; the AIMD window of tts.controller
+        # caps the requests in flight and finished MP3s go to the cache via a writer task.
+        import asyncio
 
         t_start: float = _time.monotonic()
         round_num: int = 0
-        done_count: int = len(cached_indices)
-        _print_lock = threading.Lock()
-        CONCURRENCY: int = 85
-        consecutive_zero: int = 0
-
-        def _synth_one(orig_idx: int, text: str) -> tuple[int, str, bytes | None, str | None, float]:
-            """Synthesize single subtitle. Returns (idx, text, audio|None, error|None, elapsed)."""
-            t0 = _time.monotonic()
+        done_count: int = len(cached_keys)
+
+        # Keys whose MP3 is in the cache; Phase 3 waits on this until synthesis ends
+        ready: Condition = Condition()
+        resolved: set[str] = set(cached_keys)
+        synthesis_done: bool = False
+        synthesis_errors: list[BaseException] = []
+        # Set when Phase 3 ends, early or not: wakes the feeder and stops the rounds
+        cancelled: Event = Event()
+
+        async def _cache_writer(queue: 'asyncio.Queue[tuple[str, bytes] | None]') -> None:
+            """Write finished clips to the cache off the event loop, in arrival order."""
+            while (item := await queue.get()) is not None:
+                await asyncio.to_thread(cache.put, *item)
+                with ready:
+                    resolved.add(item[0])
+                    ready.notify_all()
+
+        async def _watch_cancel(rounds: 'asyncio.Task[None]') -> None:
+            """Cancel *rounds* once Phase 3 sets ``cancelled`` (from another thread, so polled)."""
+            while not cancelled.is_set():
+                await asyncio_sleep(0.25)
+            rounds.cancel()
+
+        async def _run_rounds() -> None:
+            nonlocal pending, round_num, done_count
+            consecutive_zero: int = 0
+            queue: asyncio.Queue[tuple[str, bytes] | None] = asyncio.Queue()
+            writer = create_task(_cache_writer(queue))
+            watcher = create_task(_watch_cancel(asyncio.current_task()))
             try:
-                mp3 = tts.synthesize_sync(text)
-                return (orig_idx, text, mp3, None, _time.monotonic() - t0)
-            except Exception as exc:
-                return (orig_idx, text, None, str(exc), _time.monotonic() - t0)
-
-        while pending:
-            elapsed: float = _time.monotonic() - t_start
-            if elapsed >= HARD_TIMEOUT_S:
-                console.print(
-                    f"[red bold]ElevenBytes: 5h timeout — "
-                    f"{done_count}/{total_to_synth} done, "
-                    f"{len(pending)} still pending."
-                )
-                break
-
-            round_num += 1
-            remaining_m: float = (HARD_TIMEOUT_S - elapsed) / 60.0
-
-            print(f"\n{'=' * 60}", flush=True)
-            print(
-                f"ElevenBytes round {round_num} — {len(pending)} requests "
-                f"(concurrency={CONCURRENCY}) | done: {done_count}/{total_to_synth} "
-                f"| remaining: {remaining_m:.0f}min",
-                flush=True,
-            )
-            print(f"{'=' * 60}", flush=True)
-
-            new_pending: list[tuple[int, str]] = []
-            round_ok: int = 0
-
-            with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
-                future_map = {
-                    pool.submit(_synth_one, idx, text): (idx, text)
-                    for idx, text in pending
-                }
-                for future in as_completed(future_map):
-                    orig_idx, orig_text, audio, error, elapsed_s = future.result()
-                    sub = subtitles[orig_idx]
-                    time_range = (
-                        f"{sub.start.to_time().strftime('%H:%M:%S.%f')[:-3]} --> "
-                        f"{sub.end.to_time().strftime('%H:%M:%S.%f')[:-3]}"
+                while pending and not cancelled.is_set():
+                    elapsed: float = _time.monotonic() - t_start
+                    if elapsed >= HARD_TIMEOUT_S:
+                        console.print(
+                            f"[red bold]ElevenBytes: 5h timeout — "
+                            f"{done_count}/{total_to_synth} done, "
+                            f"{len(pending)} still pending."
+                        )
+                        break
+
+                    round_num += 1
+                    remaining_m: float = (HARD_TIMEOUT_S - elapsed) / 60.0
+
+                    print(f"\n{'=' * 60}", flush=True)
+                    print(
+                        f"ElevenBytes round {round_num} — {len(pending)} requests "
+                        f"(window={tts.controller.window}/{MAX_CONCURRENCY}) | done: {done_count}/{total_to_synth} "
+                        f"| remaining: {remaining_m:.0f}min",
+                        flush=True,
                     )
-                    if audio and len(audio) >= 1024:
-                        (cache_dir / f"{orig_idx:04d}.mp3").write_bytes(audio)
-                        done_count += 1
-                        round_ok += 1
-                        kb = len(audio) / 1024
-                        with _print_lock:
-                            print(
-                                f"  OK  #{orig_idx + 1:>3}  {time_range}  "
-                                f"{kb:.0f}KB  {elapsed_s:.1f}s  "
-                                f"[{done_count}/{total_to_synth}]  {orig_text[:50]}",
-                                flush=True,
+                    print(f"{'=' * 60}", flush=True)
+
+                    new_pending: list[tuple[int, str]] = []
+                    round_ok: int = 0
+
+                    # Bounded window: at most STREAM_WINDOW_FACTOR × concurrency requests exist at once;
+                    # closing the stream (cancelled mid-round) cancels and reaps the ones in flight
+                    async with aclosing(tts.stream_batch(text for _, text in pending)) as results:
+                        async for result in results:
+                            orig_idx, orig_text = pending[result.index]
+                            audio, error, elapsed_s = result.audio, result.error, result.elapsed
+                            sub = subtitles[orig_idx]
+                            time_range = (
+                                f"{sub.start.to_time().strftime('%H:%M:%S.%f')[:-3]} --> "
+                                f"{sub.end.to_time().strftime('%H:%M:%S.%f')[:-3]}"
                             )
-                    else:
-                        new_pending.append((orig_idx, orig_text))
-                        with _print_lock:
-                            print(
-                                f"  FAIL #{orig_idx + 1:>3}  {time_range}  "
-                                f"{error or 'too small'}  {orig_text[:50]}",
-                                flush=True,
-                            )
-
-            print(
-                f"\nRound {round_num}: {round_ok}/{len(pending)} OK | "
-                f"Total: {done_count}/{total_to_synth}",
-                flush=True,
-            )
+                            if audio and len(audio) >= 1024:
+                                queue.put_nowait((item_keys[orig_idx], audio))
+                                done_count += 1
+                                round_ok += 1
+                                kb = len(audio) / 1024
+                                print(
+                                    f"  OK  #{orig_idx + 1:>3}  {time_range}  "
+                                    f"{kb:.0f}KB  {elapsed_s:.1f}s  "
+                                    f"[{done_count}/{total_to_synth}]  {orig_text[:50]}",
+                                    flush=True,
+                                )
+                            else:
+                                new_pending.append((orig_idx, orig_text))
+                                print(
+                                    f"  FAIL #{orig_idx + 1:>3}  {time_range}  "
+                                    f"{error or 'too small'}  {orig_text[:50]}",
+                                    flush=True,
+                                )
 
-            pending = new_pending
-            if pending:
-                if round_ok == 0:
-                    consecutive_zero += 1
-                    cooldown = min(30.0 * (2 ** (consecutive_zero - 1)), 300.0)
                     print(
-                        f"API blocked — cooldown {cooldown:.0f}s "
-                        f"(zero rounds: {consecutive_zero})...",
+                        f"\nRound {round_num}: {round_ok}/{len(pending)} OK | "
+                        f"Total: {done_count}/{total_to_synth}",
                         flush=True,
                     )
-                    _time.sleep(cooldown)
-                else:
-                    consecutive_zero = 0
-                    print("Immediate next round...", flush=True)
-
-        # ── Phase 3: Build RAW PCM timeline from cache to bypass 4GB WAV limit ──
-        raw_pcm_path = output_file.replace(".wav", ".pcm")
-        flac_path = output_file.replace(".wav", ".flac")
-
-        current_samples: int = 0
-
-        with open(raw_pcm_path, 'wb') as pcm_file:
-            for idx, start_time, text in sub_items:
-                framerate: int = ELEVENBYTES_SAMPLE_RATE
-                current_time: float = current_samples / float(framerate)
-
-                if start_time > current_time:
-                    empty_frames: int = int((start_time - current_time) * framerate)
-                    pcm_file.write(b'\x00' * empty_frames * 2)
-                    current_samples += empty_frames
+                    print(f"  {tts.controller}", flush=True)
 
-                mp3_path = cache_dir / f"{idx:04d}.mp3"
-                if not mp3_path.exists():
+                    pending = new_pending
+                    if pending:
+                        if round_ok == 0:
+                            consecutive_zero += 1
+                            cooldown = min(30.0 * (2 ** (consecutive_zero - 1)), 300.0)
+                            print(
+                                f"API blocked — cooldown {cooldown:.0f}s "
+                                f"(zero rounds: {consecutive_zero})...",
+                                flush=True,
+                            )
+                            await asyncio_sleep(cooldown)
+                        else:
+                            consecutive_zero = 0
+                            print("Immediate next round...", flush=True)
+            finally:
+                watcher.cancel()
+                # Drain the writer so every finished clip is on disk before Phase 3
+                queue.put_nowait(None)
+                await writer
+                await tts.close()
+
+        def _synthesize_all() -> None:
+            nonlocal synthesis_done
+            try:
+                run(_run_rounds())
+            except asyncio.CancelledError:
+                pass  # Phase 3 stopped early and raises its own error
+            except BaseException as exc:
+                synthesis_errors.append(exc)
+            finally:
+                with ready:
+                    synthesis_done = True
+                    ready.notify_all()
+
+        synthesis_thread = Thread(target=_synthesize_all, name='elevenbytes-rounds', daemon=True)
+        synthesis_thread.start()
+
+        # ── Phase 3: Build the timeline from cache (RF64 past the 4GB WAV limit) ──
+        # Runs alongside Phase 2: the source waits for the next clip in timeline order,
+        # MP3s are decoded and stretched on all cores while earlier clips are written
+        def _cached_mp3s() -> Iterator[Optional[bytes]]:
+            for idx, _, _ in sub_items:
+                key = item_keys.get(idx)
+                if key is None:
+                    yield None
                     continue
-
-                mp3_bytes: bytes = mp3_path.read_bytes()
-                audio_seg = AudioSegment.from_mp3(BytesIO(mp3_bytes))
-                audio_seg = audio_seg.set_channels(1).set_frame_rate(ELEVENBYTES_SAMPLE_RATE).set_sample_width(2)
-                audio_int16 = np.frombuffer(audio_seg.raw_data, dtype=np.int16)
-
-                if self._pp_speed != 1.0 and len(audio_int16) > 0:
-                    audio_int16 = self._pp_speed_audio(audio_int16, ELEVENBYTES_SAMPLE_RATE)
-
-                if len(audio_int16) > 0:
-                    pcm_file.write(audio_int16.tobytes())
-                    current_samples += len(audio_int16)
-
-        # Konwersja surowego PCM na .wav z flagą -rf64 auto (pozwala na WAV > 4GB)
-        call([
-            self.ffmpeg_path, "-y", "-loglevel", "quiet",
-            "-f", "s16le", "-ar", str(ELEVENBYTES_SAMPLE_RATE), "-ac", "1",
-            "-i", raw_pcm_path,
-            "-c:a", "pcm_s16le", "-rf64", "auto",
-            output_file
-        ])
-
+                with ready:
+                    ready.wait_for(lambda: key in resolved or synthesis_done or cancelled.is_set())
+                if cancelled.is_set():
+                    return
+                yield cache.get(key)
+
+        clips = decode_ordered(
+            _cached_mp3s(), ELEVENBYTES_SAMPLE_RATE,
+            transform=(lambda audio: self._pp_speed_audio(audio, ELEVENBYTES_SAMPLE_RATE))
+            if self._pp_speed != 1.0 else None)
         try:
-            import os
-            if os.path.exists(raw_pcm_path):
-                os.remove(raw_pcm_path)
-        except Exception:
-            pass
-
-        try:
-            tts.close_sync()
-        except Exception:
-            pass
-
-        # Clean up MP3 cache after successful WAV build
-        import shutil as _shutil
-        _shutil.rmtree(cache_dir, ignore_errors=True)
+            with self._open_timeline(output_file, ELEVENBYTES_SAMPLE_RATE) as timeline:
+                for (idx, _, _), audio_int16 in zip(sub_items, clips):
+                    timeline.pad_to_ms(subtitles[idx].start.ordinal)
+                    if audio_int16 is not None:
+                        timeline.write(audio_int16)
+        finally:
+            # Wake the feeder before the pipeline joins it, then wait for the rounds to stop
+            cancelled.set()
+            with ready:
+                ready.notify_all()
+            clips.close()
+            synthesis_thread.join()
+        if synthesis_errors:
+            raise synthesis_errors[0]
+
+        # The per-file fallback cache is only needed until the WAV is built
+        if fallback_cache_dir is not None:
+            import shutil as _shutil
+            _shutil.rmtree(fallback_cache_dir, ignore_errors=True)
 
         # ── Summary ──
         total_elapsed: float = _time.monotonic() - t_start
@@ -837,10 +1219,24 @@ class SubtitleToSpeech:
             )
 
     def _pp_speed_file(self, file_path: str) -> None:
-        """Applies atempo to a single audio file in-place. No-op if _pp_speed is 1.0."""
+        """Applies atempo to a single audio file in-place. No-op if _pp_speed is 1.0.
+
+        16-bit mono WAV files are stretched in-process; other formats go through FFmpeg.
+        """
         if self._pp_speed == 1.0 or not path.isfile(file_path):
             return
         base, ext = path.splitext(file_path)
+        if ext.lower() == '.wav':
+            with wave.open(file_path, 'rb') as rf:
+                params = rf.getparams()
+                frames = rf.readframes(rf.getnframes())
+            if params.sampwidth == 2 and params.nchannels == 1:
+                audio_int16 = self._pp_speed_audio(
+                    np.frombuffer(frames, dtype=np.int16), params.framerate)
+                with wave.open(file_path, 'wb') as wf:
+                    wf.setparams(params)
+                    wf.writeframes(audio_int16.tobytes())
+                return
         tmp = base + '_pp_tmp' + ext
         filters = ",".join(self._build_atempo_chain(self._pp_speed))
         call([
@@ -853,88 +1249,83 @@ class SubtitleToSpeech:
             rename(tmp, file_path)
 
     def _pp_speed_audio(self, audio_int16, sample_rate: int):
-        """Applies atempo to a numpy int16 audio array via FFmpeg temp file."""
-        import numpy as np
-        tmp_in = path.join(self.working_space_temp, "pp_speed_in.wav")
-        tmp_out = path.join(self.working_space_temp, "pp_speed_out.wav")
-        with wave.open(tmp_in, 'wb') as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(sample_rate)
-            wf.writeframes(audio_int16.tobytes())
-        filters = ",".join(self._build_atempo_chain(self._pp_speed))
-        call([
-            self.ffmpeg_path, "-y", "-loglevel", "quiet",
-            "-i", tmp_in, "-af", filters,
-            "-c:a", "pcm_s16le", tmp_out,
-        ])
-        if path.isfile(tmp_out):
-            with wave.open(tmp_out, 'rb') as rf:
-                result = np.frombuffer(rf.readframes(rf.getnframes()), dtype=np.int16)
-            remove(tmp_out)
-        else:
-            result = audio_int16
-        if path.isfile(tmp_in):
-            remove(tmp_in)
-        return result
+        """Applies atempo to a numpy int16 audio array in-process (WSOLA, no FFmpeg)."""
+        from modules.time_stretch import time_stretch
+        return time_stretch(audio_int16, self._pp_speed, sample_rate)
 
     def _pp_speed_whole_wav(self, wav_path: str, subtitles: pysrt.SubRipFile) -> None:
-        """Per-subtitle atempo for engines that generate the whole WAV at once (e.g. Balabolka)."""
-        with wave.open(wav_path, 'rb') as wf:
-            nchannels = wf.getnchannels()
-            sampwidth = wf.getsampwidth()
-            framerate = wf.getframerate()
-            all_frames = wf.readframes(wf.getnframes())
-
-        bps = sampwidth * nchannels
-        bytes_per_sec = framerate * bps
-        total_bytes = len(all_frames)
-        total_ms = (total_bytes / bps / framerate) * 1000.0
-        atempo_filters = ",".join(self._build_atempo_chain(self._pp_speed))
-
-        clips: List[tuple] = []
+        """Per-subtitle atempo for engines that generate the whole WAV at once (e.g. Balabolka).
+
+        Expects 16-bit mono PCM (balcon output). The source is memory-mapped,
+        windows of segments are stretched in parallel and streamed in order
+        into a new WAV that then replaces the source, so memory stays bounded
+        by the windows in flight rather than by the length of the file.
+        """
+        layout = wav_data_layout(wav_path)
+        if layout.channels != 1 or layout.sample_width != 2:
+            console.print(
+                f"Post-processing: pominięto atempo — oczekiwano 16-bit mono WAV ({wav_path})",
+                style='red_bold',
+            )
+            return
+        if layout.data_bytes < 2:
+            return
+
+        output_path = f'{wav_path}.pp.tmp'
+        with open(wav_path, 'rb') as source, \
+                mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            self._stretch_mapped_wav(mapped, layout, subtitles, output_path)
+        replace(output_path, wav_path)
+
+    def _stretch_mapped_wav(self, mapped: mmap.mmap, layout: WavLayout,
+                            subtitles: pysrt.SubRipFile, output_path: str) -> None:
+        """Stretch the subtitle segments of a mapped 16-bit mono WAV into *output_path*.
+
+        Segment arrays are views of the mapping; they must not outlive this
+        call, because the caller closes the mapping right after it.
+        """
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+        from modules.time_stretch import BATCH_SIZE, time_stretch_batch
+
+        framerate = layout.sample_rate
+        samples = np.frombuffer(
+            mapped, dtype='<i2', count=layout.data_bytes // 2, offset=layout.data_offset)
+        total_ms = samples.size / framerate * 1000.0
+
+        spans: List[tuple] = []
         for i, subtitle in enumerate(subtitles):
             start_ms = subtitle.start.ordinal
             end_ms = subtitles[i + 1].start.ordinal if i + 1 < len(subtitles) else int(total_ms)
-
-            sb = int(start_ms / 1000.0 * bytes_per_sec)
-            eb = min(int(end_ms / 1000.0 * bytes_per_sec), total_bytes)
-            sb -= sb % bps
-            eb -= eb % bps
-            if sb >= eb:
-                continue
-
-            tmp_in = path.join(self.working_space_temp, "bal_pp_in.wav")
-            tmp_out = path.join(self.working_space_temp, "bal_pp_out.wav")
-            with wave.open(tmp_in, 'wb') as cf:
-                cf.setnchannels(nchannels)
-                cf.setsampwidth(sampwidth)
-                cf.setframerate(framerate)
-                cf.writeframes(all_frames[sb:eb])
-
-            call([
-                self.ffmpeg_path, "-y", "-loglevel", "quiet",
-                "-i", tmp_in, "-af", atempo_filters,
-                "-c:a", "pcm_s16le", tmp_out,
-            ])
-
-            if path.isfile(tmp_out):
-                with wave.open(tmp_out, 'rb') as sf:
-                    clips.append((start_ms, sf.readframes(sf.getnframes())))
-                remove(tmp_out)
-            if path.isfile(tmp_in):
-                remove(tmp_in)
-
-        with wave.open(wav_path, 'wb') as wf:
-            wf.setnchannels(nchannels)
-            wf.setsampwidth(sampwidth)
-            wf.setframerate(framerate)
-            for start_ms, clip_bytes in clips:
-                cur = wf.getnframes() / float(framerate)
-                gap = start_ms / 1000.0 - cur
-                if gap > 0:
-                    wf.writeframes(b'\x00' * int(gap * framerate) * bps)
-                wf.writeframes(clip_bytes)
+            ss = int(start_ms / 1000.0 * framerate)
+            es = min(int(end_ms / 1000.0 * framerate), samples.size)
+            if ss < es:
+                spans.append((start_ms, ss, es))
+
+        def stretch(window: List[tuple]) -> List[np.ndarray]:
+            # Pages of the mapping are read on demand; WSOLA copies them into its own buffers
+            return time_stretch_batch(
+                [samples[ss:es] for _, ss, es in window], self._pp_speed, framerate)
+
+        workers = cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool, \
+                TimelineWriter(output_path, framerate) as timeline:
+            # At most 2 windows per worker in flight; results are written in subtitle order
+            pending: deque = deque()
+
+            def write_oldest() -> None:
+                window, future = pending.popleft()
+                for (start_ms, _, _), clip in zip(window, future.result()):
+                    timeline.pad_to_ms(start_ms)
+                    timeline.write(clip)
+
+            for begin in range(0, len(spans), BATCH_SIZE):
+                window = spans[begin:begin + BATCH_SIZE]
+                pending.append((window, pool.submit(stretch, window)))
+                if len(pending) >= 2 * workers:
+                    write_oldest()
+            while pending:
+                write_oldest()
 
     @staticmethod
     def _build_atempo_chain(speed: float) -> List[str]:
@@ -1159,6 +1550,10 @@ class SubtitleToSpeech:
         tts_speed: Optional[str] = settings.tts_speed
         tts_volume: Optional[str] = settings.tts_volume
         self._pp_speed = float(getattr(settings, 'pp_speed', None) or '1.0')
+        self._pp_volume = float(getattr(settings, 'pp_volume', None) or '0')
+        self._stream_eac3 = (getattr(settings, 'stream_to_eac3', None) or 'false') == 'true'
+        self._streamed = False
+        self._clip_cache = clip_cache_from_settings(getattr(settings, 'tts_cache_max_mb', None))
 
         if self._pp_speed != 1.0:
             console.print(
@@ -1174,12 +1569,24 @@ class SubtitleToSpeech:
         elif tts == "TTS - Agnieszka - Ivona":
             self.srt_to_wav_balabolka(tts_speed, tts_volume)
         elif tts in ["TTS - Zofia - Edge", "TTS - Marek - Edge"]:
-            self.srt_to_wav_edge_online(tts, tts_speed, tts_volume)
+            self.srt_to_wav_edge_online(
+                tts, tts_speed, tts_volume,
+                concurrency=int(settings.edge_concurrency or EDGE_DEFAULT_CONCURRENCY),
+                coalesce_chars=int(settings.edge_coalesce_chars or '0'))
         elif tts == "TTS - STylish - PL":
-            self.srt_to_wav_stylish(tts_speed, tts_volume)
+            self.srt_to_wav_stylish(
+                tts_speed, tts_volume,
+                concurrency=int(settings.stylish_concurrency or '1'),
+                workers=int(settings.stylish_workers or '1'),
+                backend=settings.stylish_backend or 'eager',
+                quantize=settings.stylish_quantize == 'true',
+                server_url=settings.stylish_server_url or '')
         elif tts == "TTS - Fish Audio API":
             fish_temp = float(settings.fish_temperature or '0.8')
-            self.srt_to_wav_fish_api(tts_speed, tts_volume, fish_voice=settings.fish_voice, fish_temperature=fish_temp)
+            self.srt_to_wav_fish_api(
+                tts_speed, tts_volume, fish_voice=settings.fish_voice, fish_temperature=fish_temp,
+                concurrency=int(settings.fish_concurrency or '1'),
+                fish_api_urls=settings.fish_api_urls)
         elif tts == "TTS - ReadLover API":
             self.srt_to_wav_readlover(
                 tts_speed,
@@ -1187,6 +1594,7 @@ class SubtitleToSpeech:
                 readlover_api_key=settings.readlover_api_key or '',
                 readlover_speaker_id=int(settings.readlover_speaker_id or '6'),
                 readlover_preset=settings.readlover_preset or 'neutral',
+                concurrency=int(settings.readlover_concurrency or '1'),
             )
         elif tts == "TTS - ElevenBytes":
             self.srt_to_wav_elevenbytes(
@@ -1197,8 +1605,11 @@ class SubtitleToSpeech:
         console.print(
             "Generowanie pliku audio zakończone.", style='green_bold')
 
-        self._apply_post_processing(settings)
-        self.merge_tts_audio()
+        if self._streamed:
+            self._finish_streamed_audio()
+        else:
+            self._apply_post_processing(settings)
+            self.merge_tts_audio()
 
     def _apply_post_processing(self, settings: Settings) -> None:
         """Applies FFmpeg volume adjustment to the whole generated WAV.
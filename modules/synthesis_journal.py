@@ -0,0 +1,253 @@
+"""Append-only, resumable synthesis journal of one subtitle file.
+
+The clip cache is optional and shared, so after a crash at cue 1,400 of
+1,500 an engine without it starts from scratch. The journal records every
+finished clip of one file as a JSON line::
+
+    {"i": 1399, "hash": "<text hash>", "file": "01399.pcm", "bytes": 96000, "crc": 271828}
+
+``i`` is the subtitle index, ``hash`` a digest of the text and of every
+setting that changes the audio, ``file`` the audio location relative to
+the journal folder. A clip that is already in the ``ClipCache`` is not
+copied: ``file`` is then the absolute path of the cache entry, passed as
+``stored_at``. On restart an entry is reused only when its hash
+matches the current text and the audio still has the recorded size and
+CRC-32, so edited lines, changed settings and clips torn by a crash are
+synthesized again.
+
+Lines are handed to the OS one by one (a killed process loses nothing),
+while ``fsync`` runs once per ``sync_every`` records or ``sync_interval``
+seconds, so durability against power loss costs one disk flush per batch
+instead of one per clip. A record whose audio did not reach the disk fails
+its CRC check and is redone.
+
+Usage::
+
+    from modules.synthesis_journal import SynthesisJournal
+
+    with SynthesisJournal.for_subtitles('episode_01.srt') as journal:
+        key = SynthesisJournal.text_hash(text, {'engine': 'fish', 'voice': voice})
+        audio = journal.get_audio(index, key)
+        if audio is None:
+            audio = client.synthesize(text)
+            journal.put_audio(index, key, audio)
+    journal.discard()  # the timeline is complete
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import zlib
+from os import path
+from typing import Any, Dict, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+from constants import SYNTHESIS_JOURNAL_FOLDER
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+JOURNAL_SYNC_EVERY: int = 64
+"""Records appended between two fsync calls."""
+
+JOURNAL_SYNC_INTERVAL_S: float = 2.0
+"""Max seconds a record may wait for its fsync."""
+
+_JOURNAL_NAME: str = 'journal.jsonl'
+
+
+class JournalEntry(NamedTuple):
+    """One finished clip as recorded in the journal."""
+    index: int
+    text_hash: str
+    file: str
+    size: int
+    crc: int
+
+
+class SynthesisJournal:
+    """Per-file record of synthesized clips that survives a crash.
+
+    Thread-safe: engines record clips from their worker threads.
+
+    Attributes:
+        folder: Journal folder (journal lines and journal-owned clips).
+        entries: Latest entry per subtitle index, as loaded and recorded.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        sync_every: int = JOURNAL_SYNC_EVERY,
+        sync_interval: float = JOURNAL_SYNC_INTERVAL_S,
+    ) -> None:
+        self.folder: str = folder
+        self.sync_every: int = max(1, int(sync_every))
+        self.sync_interval: float = sync_interval
+        self.entries: Dict[int, JournalEntry] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._unsynced: int = 0
+        self._last_sync: float = time.monotonic()
+
+        os.makedirs(self.folder, exist_ok=True)
+        journal_path = path.join(self.folder, _JOURNAL_NAME)
+        torn = self._load(journal_path)
+        self._resumed: int = len(self.entries)
+        self._file = open(journal_path, 'a', encoding='utf-8')
+        if torn:
+            # Terminate the half-written line so the next record starts clean
+            self._file.write('\n')
+
+    @classmethod
+    def for_subtitles(cls, filename: str, root: str = SYNTHESIS_JOURNAL_FOLDER) -> 'SynthesisJournal':
+        """Open the journal of the subtitle file *filename* (created when missing)."""
+        return cls(path.join(root, path.splitext(path.basename(filename))[0]))
+
+    @staticmethod
+    def text_hash(text: str, params: Optional[Mapping[str, Any]] = None) -> str:
+        """Digest of *text* and the settings that shape its audio."""
+        payload = json.dumps({'text': text, 'params': dict(params or {})},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def resumed(self) -> int:
+        """Number of clips recorded before this run."""
+        return self._resumed
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def has(self, index: int, text_hash: str) -> bool:
+        """Cheap check (hash and file size, no CRC) that a clip can be reused."""
+        entry = self.entries.get(index)
+        if entry is None or entry.text_hash != text_hash:
+            return False
+        try:
+            return path.getsize(self._resolve(entry.file)) == entry.size
+        except OSError:
+            return False
+
+    def get(self, index: int, text_hash: str) -> Optional[bytes]:
+        """Return a journaled clip, or ``None`` when it must be synthesized."""
+        entry = self.entries.get(index)
+        if entry is None or entry.text_hash != text_hash:
+            return None
+        try:
+            with open(self._resolve(entry.file), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != entry.size or zlib.crc32(data) != entry.crc:
+            return None
+        return data
+
+    def get_audio(self, index: int, text_hash: str) -> Optional[np.ndarray]:
+        """Return a journaled int16 clip, or ``None`` when it must be synthesized."""
+        data = self.get(index, text_hash)
+        return None if data is None else np.frombuffer(data, dtype=np.int16)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def put(self, index: int, text_hash: str, data: bytes, suffix: str = '.bin',
+            stored_at: Optional[str] = None) -> None:
+        """Record an encoded clip (e.g. Edge MP3 bytes).
+
+        Args:
+            index: Subtitle index.
+            text_hash: Digest of the text and settings.
+            data: The clip, used for its size and CRC.
+            suffix: Extension of the copy written to the journal folder.
+            stored_at: File already holding *data* (a clip cache entry);
+                only its path is recorded, nothing is written.
+        """
+        if stored_at is not None:
+            name = path.abspath(stored_at)
+        else:
+            name = f'{index:05d}{suffix}'
+            tmp = path.join(self.folder, name + '.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path.join(self.folder, name))
+        self._append(JournalEntry(index, text_hash, name, len(data), zlib.crc32(data)))
+
+    def put_audio(self, index: int, text_hash: str, audio: np.ndarray,
+                  stored_at: Optional[str] = None) -> None:
+        """Record an int16 clip, copied to the journal folder unless *stored_at* holds it."""
+        self.put(index, text_hash, np.ascontiguousarray(audio, dtype=np.int16).tobytes(), '.pcm', stored_at)
+
+    def sync(self) -> None:
+        """Flush every recorded line to the disk."""
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        """Sync and close the journal file; the journal can be reopened later."""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def discard(self) -> None:
+        """Delete the journal and its own clips (never cache entries) once the file is built."""
+        self.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def __enter__(self) -> 'SynthesisJournal':
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Internal utilities
+    # ------------------------------------------------------------------
+
+    def _load(self, journal_path: str) -> bool:
+        """Read existing lines; True when the last one was torn by a crash."""
+        line = '\n'
+        try:
+            with open(journal_path, encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        entry = JournalEntry(int(record['i']), record['hash'], record['file'],
+                                             int(record['bytes']), int(record['crc']))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    self.entries[entry.index] = entry
+        except FileNotFoundError:
+            pass
+        return not line.endswith('\n')
+
+    def _resolve(self, file: str) -> str:
+        return path.normpath(path.join(self.folder, file))
+
+    def _append(self, entry: JournalEntry) -> None:
+        line = json.dumps({'i': entry.index, 'hash': entry.text_hash, 'file': entry.file,
+                           'bytes': entry.size, 'crc': entry.crc})
+        with self._lock:
+            self.entries[entry.index] = entry
+            self._file.write(line + '\n')
+            # To the OS right away (survives a killed process); fsync in batches
+            self._file.flush()
+            self._unsynced += 1
+            if (self._unsynced >= self.sync_every
+                    or time.monotonic() - self._last_sync >= self.sync_interval):
+                self._sync()
+
+    def _sync(self) -> None:
+        """fsync pending lines; the caller holds ``_lock``."""
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
@@ -0,0 +1,254 @@
+"""Bounded-parallel synthesis scheduler shared by the TTS engine paths.
+
+Keeps up to ``concurrency`` synthesis jobs in flight on a thread pool and
+yields their results strictly in input order, so the caller can keep
+writing clips into the timeline one subtitle after another while the
+next requests are already being served.
+
+With a ``ClipCache`` attached, cached clips are served without touching
+the engine, and a line repeated within the window ("Tak.", "Co?") is
+synthesized once and shared by every occurrence.
+
+Engines with a batched API (``StylishTTS.synthesize_batch``) pass
+``synthesize_batch`` and ``batch_size``: texts are then handed over in
+windows of ``batch_size`` and each window counts as one job.
+
+Network engines pass a ``ConcurrencyController``: the pool is then sized to
+its ceiling and every engine call holds one slot of its adaptive window,
+so the number of requests in flight follows what the provider tolerates.
+
+With a ``SynthesisJournal`` attached, clips finished by an earlier (crashed)
+run of the same file are read back from the journal, only the missing or
+changed lines reach the engine, and every new clip is journaled.
+
+Usage::
+
+    from modules.synthesis_scheduler import SynthesisScheduler
+
+    scheduler = SynthesisScheduler(client.synthesize, concurrency=4)
+    for subtitle, audio_int16 in zip(subtitles, scheduler.map(texts)):
+        ...
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from modules.concurrency_controller import ConcurrencyController
+from modules.synthesis_journal import SynthesisJournal
+from modules.tts_cache import ClipCache
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_PREFETCH: int = 2
+"""Submitted-but-not-yet-consumed jobs per worker (bounds memory use)."""
+
+
+class SynthesisScheduler:
+    """Ordered, bounded-parallel ``map`` over a synthesis callable.
+
+    The callable must be safe to call from several threads at once
+    (HTTP clients such as ``FishTTSClient`` and ``ReadLoverClient`` are)
+    and return a 1-D int16 array.
+
+    Attributes:
+        synthesize: Function turning one text into one int16 clip.
+        concurrency: Number of synthesis jobs running at the same time.
+        window: Max jobs submitted ahead of the consumer.
+        cache: Optional clip cache consulted before synthesizing.
+        cache_key: Maps a text to its cache key (required with *cache*).
+        synthesize_batch: Optional function turning a list of texts into
+            a list of clips; used instead of *synthesize* when set.
+        batch_size: Texts per ``synthesize_batch`` call.
+        controller: Optional adaptive limit; engine calls run inside its
+            slots and *concurrency* becomes its ceiling.
+        journal: Optional per-file journal; the position of a text in
+            ``map`` is its subtitle index.
+    """
+
+    def __init__(
+        self,
+        synthesize: Callable[[str], np.ndarray],
+        concurrency: int = 1,
+        prefetch: int = DEFAULT_PREFETCH,
+        cache: Optional[ClipCache] = None,
+        cache_key: Optional[Callable[[str], str]] = None,
+        synthesize_batch: Optional[Callable[[List[str]], List[np.ndarray]]] = None,
+        batch_size: int = 1,
+        controller: Optional[ConcurrencyController] = None,
+        journal: Optional[SynthesisJournal] = None,
+    ) -> None:
+        self.synthesize: Callable[[str], np.ndarray] = synthesize
+        self.controller: Optional[ConcurrencyController] = controller
+        self.concurrency: int = max(1, int(controller.maximum if controller else concurrency))
+        self.window: int = self.concurrency * max(1, int(prefetch))
+        self.cache: Optional[ClipCache] = cache if cache_key else None
+        self.cache_key: Optional[Callable[[str], str]] = cache_key
+        self.synthesize_batch: Optional[Callable[[List[str]], List[np.ndarray]]] = synthesize_batch
+        self.batch_size: int = max(1, int(batch_size))
+        self.journal: Optional[SynthesisJournal] = journal
+
+    def map(self, texts: Iterable[str]) -> Iterator[np.ndarray]:
+        """Synthesize *texts* concurrently and yield results in input order.
+
+        At most ``window`` results are held in memory; a slow clip at the
+        head of the queue stalls submission instead of buffering the
+        whole file.
+
+        Args:
+            texts: Texts to synthesize, in timeline order.
+
+        Yields:
+            The int16 clip for each text, in the same order.
+
+        Raises:
+            Exception: Whatever the synthesis callable raised, re-raised
+                when its result is reached in order.
+        """
+        if self.journal is not None:
+            yield from self._map_journaled(list(texts))
+        else:
+            yield from self._map_synthesized(texts)
+
+    def _map_synthesized(self, texts: Iterable[str]) -> Iterator[np.ndarray]:
+        """``map`` without the journal: every text goes to the cache or the engine."""
+        if self.synthesize_batch is not None and self.batch_size > 1:
+            yield from self._map_batched(texts)
+            return
+
+        if self.concurrency == 1:
+            for text in texts:
+                yield self._synthesize_cached(text, self._key(text))
+            return
+
+        pending: Deque[Tuple[Optional[str], Future]] = deque()
+        in_flight: Dict[str, Future] = {}
+        pool = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix='tts-synth')
+
+        def consume() -> np.ndarray:
+            key, future = pending.popleft()
+            if key is not None and in_flight.get(key) is future:
+                del in_flight[key]
+            return future.result()
+
+        try:
+            for text in texts:
+                key = self._key(text)
+                future = in_flight.get(key) if key is not None else None
+                if future is None:
+                    future = self._lookup(key) or pool.submit(self._synthesize_cached, text, key)
+                    if key is not None:
+                        in_flight[key] = future
+                pending.append((key, future))
+                if len(pending) >= self.window:
+                    yield consume()
+            while pending:
+                yield consume()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _map_batched(self, texts: Iterable[str]) -> Iterator[np.ndarray]:
+        """``map`` for batched engines: one job per window of ``batch_size`` texts."""
+        iterator = iter(texts)
+        pending: Deque[Future] = deque()
+        pool = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix='tts-synth')
+        try:
+            while True:
+                window = list(islice(iterator, self.batch_size))
+                if not window:
+                    break
+                pending.append(pool.submit(self._synthesize_window, window))
+                if len(pending) >= self.window:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _map_journaled(self, texts: List[str]) -> Iterator[np.ndarray]:
+        """``map`` that reuses journaled clips and journals the synthesized ones."""
+        hashes: List[str] = [
+            self.cache_key(text) if self.cache_key is not None else SynthesisJournal.text_hash(text)
+            for text in texts]
+        missing: List[int] = [
+            index for index, text_hash in enumerate(hashes) if not self.journal.has(index, text_hash)]
+        synthesized = self._map_synthesized(texts[index] for index in missing)
+        missing_set = set(missing)
+
+        for index, (text, text_hash) in enumerate(zip(texts, hashes)):
+            audio = None if index in missing_set else self.journal.get_audio(index, text_hash)
+            if audio is None:
+                # A clip that failed its CRC check after the size check is redone inline
+                audio = (next(synthesized) if index in missing_set
+                         else self._synthesize_cached(text, self._key(text)))
+                # With the cache on, the clip is already in it: journal only its location
+                self.journal.put_audio(
+                    index, text_hash, audio,
+                    stored_at=self.cache.path_for(text_hash) if self.cache is not None else None)
+            yield audio
+
+    # ------------------------------------------------------------------
+    # Internal utilities
+    # ------------------------------------------------------------------
+
+    def _key(self, text: str) -> Optional[str]:
+        return self.cache_key(text) if self.cache is not None else None
+
+    def _lookup(self, key: Optional[str]) -> Optional[Future]:
+        """Return an already-completed future on a cache hit."""
+        if key is None:
+            return None
+        audio = self.cache.get_audio(key)
+        if audio is None:
+            return None
+        future: Future = Future()
+        future.set_result(audio)
+        return future
+
+    def _call(self, function: Callable, argument: object) -> object:
+        """Run one engine call, inside a controller slot when one is attached."""
+        if self.controller is None:
+            return function(argument)
+        # Clip latency grows with the text, so the slot is weighted by its characters
+        texts = [argument] if isinstance(argument, str) else argument
+        with self.controller.slot(cost=sum(len(text) for text in texts)):
+            return function(argument)
+
+    def _synthesize_cached(self, text: str, key: Optional[str]) -> np.ndarray:
+        if key is None:
+            return self._call(self.synthesize, text)
+        audio = self.cache.get_audio(key)
+        if audio is None:
+            audio = self._call(self.synthesize, text)
+            self.cache.put_audio(key, audio)
+        return audio
+
+    def _synthesize_window(self, window: List[str]) -> List[np.ndarray]:
+        """Serve a window from the cache and batch-synthesize the misses once each."""
+        keys: List[str] = [self._key(text) or text for text in window]
+        results: Dict[str, np.ndarray] = {}
+        if self.cache is not None:
+            for key in set(keys):
+                audio = self.cache.get_audio(key)
+                if audio is not None:
+                    results[key] = audio
+
+        misses: Dict[str, str] = {}
+        for key, text in zip(keys, window):
+            if key not in results:
+                misses.setdefault(key, text)
+        if misses:
+            clips = self._call(self.synthesize_batch, list(misses.values()))
+            for key, audio in zip(misses, clips):
+                results[key] = audio
+                if self.cache is not None:
+                    self.cache.put_audio(key, audio)
+
+        return [results[key] for key in keys]
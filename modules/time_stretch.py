@@ -0,0 +1,144 @@
+"""In-process WSOLA time-stretch for int16 TTS clips.
+
+Changes tempo without changing pitch, directly on the NumPy arrays the
+TTS engines already hold in memory — no temp WAV, no ffmpeg spawn.
+Speed semantics match ``SubtitleToSpeech._build_atempo_chain``: the
+factor is clamped to ``[0.5, 100.0]`` and the output lasts
+``len(input) / speed`` samples.
+
+The batch entry point stretches many clips at once: clips are sorted by
+length, padded into a 2-D array and every WSOLA step (overlap-add and
+the cross-correlation search) runs as one vectorized operation over the
+whole batch.
+
+Usage::
+
+    from modules.time_stretch import time_stretch, time_stretch_batch
+
+    faster = time_stretch(audio_int16, 1.25, 44_100)
+    clips = time_stretch_batch([clip_a, clip_b], 1.25, 24_000)
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+MIN_SPEED: float = 0.5
+"""Lower speed bound (same as ffmpeg ``atempo``)."""
+
+MAX_SPEED: float = 100.0
+"""Upper speed bound (same as ``_build_atempo_chain``)."""
+
+FRAME_SECONDS: float = 0.04
+"""WSOLA frame length — 40 ms keeps voiced speech smooth."""
+
+TOLERANCE_SECONDS: float = 0.01
+"""Max shift of each analysis frame when searching for the best overlap."""
+
+BATCH_SIZE: int = 32
+"""Clips processed together in one vectorized WSOLA pass."""
+
+
+def clamp_speed(speed: float) -> float:
+    """Clamp *speed* to the range supported by the atempo chain."""
+    return max(MIN_SPEED, min(float(speed), MAX_SPEED))
+
+
+def time_stretch(audio: np.ndarray, speed: float, sample_rate: int) -> np.ndarray:
+    """Change the tempo of a mono int16 clip without changing its pitch.
+
+    Args:
+        audio: 1-D ``numpy.int16`` array of PCM samples.
+        speed: Tempo multiplier (>1 faster, <1 slower).
+        sample_rate: Sample rate of *audio* in Hz.
+
+    Returns:
+        1-D ``numpy.int16`` array of ``round(len(audio) / speed)`` samples.
+    """
+    return time_stretch_batch([audio], speed, sample_rate)[0]
+
+
+def time_stretch_batch(
+    clips: Sequence[np.ndarray],
+    speed: float,
+    sample_rate: int,
+    batch_size: int = BATCH_SIZE,
+) -> List[np.ndarray]:
+    """Time-stretch many mono int16 clips with the same speed factor.
+
+    Args:
+        clips: 1-D ``numpy.int16`` arrays, all at *sample_rate*.
+        speed: Tempo multiplier (>1 faster, <1 slower).
+        sample_rate: Sample rate of the clips in Hz.
+        batch_size: Clips stretched together in one vectorized pass.
+
+    Returns:
+        Stretched clips, in the same order as *clips*.
+    """
+    speed = clamp_speed(speed)
+    results: List[np.ndarray] = [np.asarray(clip, dtype=np.int16) for clip in clips]
+    if speed == 1.0:
+        return results
+
+    # Similar lengths share a batch so padding wastes little work
+    order = sorted(
+        (i for i, clip in enumerate(results) if clip.size),
+        key=lambda i: results[i].size,
+    )
+    for start in range(0, len(order), max(1, batch_size)):
+        group = order[start:start + batch_size]
+        for i, stretched in zip(group, _wsola([results[i] for i in group], speed, sample_rate)):
+            results[i] = stretched
+    return results
+
+
+def _wsola(clips: List[np.ndarray], speed: float, sample_rate: int) -> List[np.ndarray]:
+    """Vectorized WSOLA over a batch of non-empty clips."""
+    frame = max(64, int(sample_rate * FRAME_SECONDS)) & ~1
+    hop = frame // 2
+    tol = max(1, int(sample_rate * TOLERANCE_SECONDS))
+    window = (0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(frame) / frame)).astype(np.float32)
+
+    lengths = np.array([clip.size for clip in clips])
+    out_lengths = np.maximum(1, np.round(lengths / speed).astype(np.int64))
+    n_frames = int(np.ceil(out_lengths.max() / hop)) + 2
+
+    # Analysis anchors; the input is padded so every frame and search range fits
+    anchors = np.round(np.arange(n_frames + 1) * hop * speed).astype(np.int64)
+    lead = hop + tol
+    padded_len = lead + int(anchors[-1]) + frame + hop + tol
+    x = np.zeros((len(clips), padded_len), dtype=np.float32)
+    for row, clip in enumerate(clips):
+        x[row, lead:lead + clip.size] = clip
+
+    # Cross-correlation over the search range is done in the frequency domain
+    search_len = frame + 2 * tol
+    n_fft = 1 << (search_len - 1).bit_length()
+
+    frames_view = sliding_window_view(x, frame, axis=1)  # (B, positions, frame)
+    rows = np.arange(len(clips))
+    y = np.zeros((len(clips), n_frames * hop + frame), dtype=np.float32)
+    weight = np.zeros(n_frames * hop + frame, dtype=np.float32)
+    delta = np.zeros(len(clips), dtype=np.int64)
+
+    for k in range(n_frames):
+        pos = anchors[k] + tol + delta
+        y[:, k * hop:k * hop + frame] += frames_view[rows, pos] * window
+        weight[k * hop:k * hop + frame] += window
+
+        # Pick the next frame so it continues the current one most naturally
+        natural = frames_view[rows, pos + hop]
+        base = anchors[k + 1]
+        region = x[:, base:base + search_len]
+        similarity = np.fft.irfft(
+            np.fft.rfft(region, n_fft) * np.conj(np.fft.rfft(natural, n_fft)), n_fft)
+        delta = np.argmax(similarity[:, :2 * tol + 1], axis=1) - tol
+
+    y /= np.maximum(weight, 1e-3)
+    out = np.clip(np.rint(y[:, hop:]), -32768, 32767).astype(np.int16)
+    return [out[row, :n] for row, n in enumerate(out_lengths)]
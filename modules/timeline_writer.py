@@ -0,0 +1,217 @@
+"""Streaming WAV timeline assembler shared by every TTS engine path.
+
+Clips are placed on the timeline by start time: the writer tracks its
+position in integer samples, fills gaps from one preallocated zero buffer
+(a 40-minute gap costs no allocation) and writes clip buffers straight
+from NumPy memory without ``tobytes()`` copies.
+
+The WAV header reserves a ``JUNK`` chunk that is turned into a ``ds64``
+chunk on close when the data outgrows the 4 GB RIFF limit, so long
+audiobooks come out as RF64 directly — no raw PCM + ffmpeg pass.
+
+``wav_data_layout`` is the reading counterpart: it locates the PCM data of
+a WAV / RF64 file so callers can memory-map it instead of reading it.
+
+Usage::
+
+    from modules.timeline_writer import TimelineWriter
+
+    with TimelineWriter("episode.wav", 44_100) as timeline:
+        for subtitle, audio_int16 in zip(subtitles, clips):
+            timeline.pad_to_ms(subtitle.start.ordinal)
+            timeline.write(audio_int16)
+"""
+
+import os
+import struct
+from typing import BinaryIO, NamedTuple, Optional, Union
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+SILENCE_CHUNK_BYTES: int = 1 << 20
+"""Size of the shared zero buffer used for gaps (1 MiB)."""
+
+_SILENCE: memoryview = memoryview(bytes(SILENCE_CHUNK_BYTES))
+
+_RIFF_LIMIT: int = 0xFFFFFFFF
+_HEADER_SIZE: int = 80  # RIFF/WAVE (12) + JUNK/ds64 (36) + fmt (24) + data header (8)
+
+
+class WavLayout(NamedTuple):
+    """Format and position of the PCM data in a WAV file."""
+    sample_rate: int
+    channels: int
+    sample_width: int
+    data_offset: int
+    data_bytes: int
+
+
+def wav_data_layout(file_path: str) -> WavLayout:
+    """Locate the PCM data of a RIFF or RF64 WAV file without reading it.
+
+    A data size that runs past the end of the file (e.g. a writer that was
+    interrupted before fixing the header) is clamped to the file size.
+
+    Raises:
+        ValueError: If the file is not a WAVE file or has no fmt/data chunk.
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        head = f.read(12)
+        if len(head) < 12 or head[:4] not in (b'RIFF', b'RF64') or head[8:] != b'WAVE':
+            raise ValueError(f'Not a WAVE file: {file_path}')
+        fmt = None
+        ds64_data_bytes = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            chunk_id, size = struct.unpack('<4sI', chunk)
+            if chunk_id == b'data':
+                if fmt is None:
+                    break
+                offset = f.tell()
+                if size == _RIFF_LIMIT and ds64_data_bytes is not None:
+                    size = ds64_data_bytes
+                return WavLayout(*fmt, offset, min(size, file_size - offset))
+            if chunk_id == b'fmt ':
+                _, channels, rate, _, _, bits = struct.unpack_from('<HHIIHH', f.read(size))
+                fmt = (rate, channels, bits // 8)
+            elif chunk_id == b'ds64':
+                ds64_data_bytes = struct.unpack_from('<Q', f.read(size), 8)[0]
+            else:
+                f.seek(size, os.SEEK_CUR)
+            if size % 2:
+                f.seek(1, os.SEEK_CUR)
+    raise ValueError(f'No fmt/data chunk in WAV file: {file_path}')
+
+
+class TimelineWriter:
+    """Write PCM clips at given timeline positions into a WAV (or raw) stream.
+
+    Attributes:
+        sample_rate: Frames per second.
+        channels: Interleaved channels per frame.
+        sample_width: Bytes per sample (2 for int16).
+        raw: When True no WAV header is written (e.g. for pipes).
+    """
+
+    def __init__(
+        self,
+        target: Union[str, BinaryIO],
+        sample_rate: int,
+        channels: int = 1,
+        sample_width: int = 2,
+        raw: bool = False,
+    ) -> None:
+        self.sample_rate: int = sample_rate
+        self.channels: int = channels
+        self.sample_width: int = sample_width
+        self.raw: bool = raw
+        self._frame_bytes: int = channels * sample_width
+        self._frames: int = 0
+        self._owns_file: bool = isinstance(target, str)
+        self._file: Optional[BinaryIO] = open(target, 'wb') if isinstance(target, str) else target
+        if not raw:
+            self._file.write(self._header(0, rf64=False))
+
+    # ------------------------------------------------------------------
+    # Context manager
+    # ------------------------------------------------------------------
+
+    def __enter__(self) -> 'TimelineWriter':
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Position
+    # ------------------------------------------------------------------
+
+    @property
+    def frames(self) -> int:
+        """Number of frames written so far (the current position)."""
+        return self._frames
+
+    @property
+    def seconds(self) -> float:
+        """Current position in seconds."""
+        return self._frames / float(self.sample_rate)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def pad_to(self, frame: int) -> None:
+        """Write silence up to *frame*; no-op if the position is already past it."""
+        remaining = (frame - self._frames) * self._frame_bytes
+        if remaining <= 0:
+            return
+        while remaining > 0:
+            chunk = min(remaining, SILENCE_CHUNK_BYTES)
+            self._file.write(_SILENCE[:chunk])
+            remaining -= chunk
+        self._frames = frame
+
+    def pad_to_ms(self, start_ms: int) -> None:
+        """Write silence up to the timeline position *start_ms* (milliseconds)."""
+        self.pad_to(start_ms * self.sample_rate // 1000)
+
+    def write(self, audio: Union[np.ndarray, bytes, bytearray, memoryview]) -> None:
+        """Append a clip at the current position.
+
+        NumPy arrays are written through the buffer protocol (no copy when
+        already contiguous); ``bytes``-like objects are written as-is.
+        """
+        if isinstance(audio, np.ndarray):
+            audio = np.ascontiguousarray(audio)
+        data = memoryview(audio).cast('B')
+        usable = len(data) - len(data) % self._frame_bytes
+        if usable <= 0:
+            return
+        self._file.write(data[:usable])
+        self._frames += usable // self._frame_bytes
+
+    def close(self) -> None:
+        """Finalize the header (RIFF or RF64) and close the owned file."""
+        if self._file is None:
+            return
+        try:
+            if not self.raw:
+                data_bytes = self._frames * self._frame_bytes
+                if data_bytes % 2:
+                    self._file.write(b'\x00')  # RIFF chunks are word-aligned
+                rf64 = _HEADER_SIZE - 8 + data_bytes + data_bytes % 2 > _RIFF_LIMIT
+                self._file.seek(0)
+                self._file.write(self._header(data_bytes, rf64=rf64))
+            self._file.flush()
+        finally:
+            if self._owns_file:
+                self._file.close()
+            self._file = None
+
+    # ------------------------------------------------------------------
+    # Internal utilities
+    # ------------------------------------------------------------------
+
+    def _header(self, data_bytes: int, rf64: bool) -> bytes:
+        """Build the 80-byte header; JUNK is swapped for ds64 in RF64 mode."""
+        riff_size = _HEADER_SIZE - 8 + data_bytes + data_bytes % 2
+        if rf64:
+            head = struct.pack('<4sI4s', b'RF64', _RIFF_LIMIT, b'WAVE')
+            reserved = struct.pack(
+                '<4sIQQQI', b'ds64', 28, riff_size, data_bytes, self._frames, 0)
+            data_size = _RIFF_LIMIT
+        else:
+            head = struct.pack('<4sI4s', b'RIFF', riff_size, b'WAVE')
+            reserved = struct.pack('<4sI', b'JUNK', 28) + bytes(28)
+            data_size = data_bytes
+        fmt = struct.pack(
+            '<4sIHHIIHH', b'fmt ', 16, 1, self.channels, self.sample_rate,
+            self.sample_rate * self._frame_bytes, self._frame_bytes, self.sample_width * 8)
+        return head + reserved + fmt + struct.pack('<4sI', b'data', data_size)
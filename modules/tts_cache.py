@@ -0,0 +1,287 @@
+"""Content-addressed TTS clip cache shared across runs, files and engines.
+
+Every synthesized clip is stored under a SHA-256 of the normalized text,
+the engine name, the voice and the synthesis parameters, so the same line
+("Tak.", "Co?") spoken with the same settings is synthesized exactly once
+— in this episode, the next one, or after a crash.
+
+Entries live as plain files in ``TTS_CACHE_FOLDER`` (two-level fan-out).
+The file mtime is the LRU stamp: hits touch it, and when the total size
+goes over ``max_bytes`` the oldest entries are evicted. Entries written
+or read in the current session (see ``start_session``) are never evicted,
+so a file being built cannot lose its own clips mid-run.
+
+Usage::
+
+    from modules.tts_cache import ClipCache
+
+    cache = ClipCache(max_bytes=4 * 1024 ** 3)
+    key = ClipCache.make_key("Cześć!", "fish", "Jarocinski", {"temperature": 0.8})
+    audio = cache.get_audio(key)
+    if audio is None:
+        audio = client.synthesize("Cześć!")
+        cache.put_audio(key, audio)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from os import path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from constants import TTS_CACHE_FOLDER
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_MAX_BYTES: int = 4 * 1024 ** 3
+"""Default size bound of the cache (4 GiB)."""
+
+EVICT_TARGET_RATIO: float = 0.9
+"""Eviction trims the cache down to this fraction of ``max_bytes``."""
+
+_ENTRY_SUFFIX: str = '.bin'
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class ClipCache:
+    """Persistent, size-bounded LRU store of synthesized audio clips.
+
+    Thread-safe; several processes may share one cache directory (writes
+    are atomic renames, eviction tolerates concurrently removed files).
+
+    Attributes:
+        root: Cache directory.
+        max_bytes: Size bound that triggers LRU eviction.
+    """
+
+    _shared: Dict[Tuple[str, int], 'ClipCache'] = {}
+    _shared_lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, root: str = TTS_CACHE_FOLDER, max_bytes: int = DEFAULT_MAX_BYTES) -> 'ClipCache':
+        """Return the process-wide cache for *root*, scanning the directory only on first use."""
+        key = (path.abspath(root), max_bytes)
+        with cls._shared_lock:
+            instance = cls._shared.get(key)
+            if instance is None:
+                instance = cls(root=root, max_bytes=max_bytes)
+                cls._shared[key] = instance
+            return instance
+
+    def __init__(self, root: str = TTS_CACHE_FOLDER, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root: str = root
+        self.max_bytes: int = max_bytes
+        self._lock: threading.Lock = threading.Lock()
+        self._session_start: float = time.time()
+        self._evict_floor: int = 0
+        os.makedirs(self.root, exist_ok=True)
+        self._total_bytes: int = sum(size for _, size, _ in self._scan())
+
+    def start_session(self) -> None:
+        """Protect only entries used from now on (e.g. by the next file) from eviction."""
+        with self._lock:
+            self._session_start = time.time()
+            self._evict_floor = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Collapse whitespace so trivially different lines share one entry."""
+        return _WHITESPACE_RE.sub(' ', text).strip()
+
+    @classmethod
+    def make_key(
+        cls,
+        text: str,
+        engine: str,
+        voice: Optional[str] = None,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> str:
+        """Build the content address of a clip.
+
+        Args:
+            text: Text that is synthesized.
+            engine: Engine name, e.g. ``"fish"`` or ``"elevenbytes"``.
+            voice: Voice / speaker identifier.
+            params: Any other setting that changes the audio (speed,
+                preset, sample rate...). Must be JSON-serializable.
+
+        Returns:
+            Hex SHA-256 digest.
+        """
+        payload = json.dumps(
+            {
+                'text': cls.normalize_text(text),
+                'engine': engine,
+                'voice': voice,
+                'params': dict(params or {}),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        """Return the file path of the entry for *key* (may not exist)."""
+        return path.join(self.root, key[:2], key + _ENTRY_SUFFIX)
+
+    # ------------------------------------------------------------------
+    # Bytes API
+    # ------------------------------------------------------------------
+
+    def contains(self, key: str) -> bool:
+        """Check whether *key* is cached (marks it as recently used)."""
+        return self._touch(self.path_for(key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached bytes for *key*, or ``None`` on a miss."""
+        entry = self.path_for(key)
+        try:
+            with open(entry, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        self._touch(entry)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store *data* under *key* (atomic replace)."""
+        entry = self.path_for(key)
+        os.makedirs(path.dirname(entry), exist_ok=True)
+        tmp = f'{entry}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as file:
+            file.write(data)
+        self._commit(tmp, entry)
+
+    def put_file(self, key: str, source_path: str) -> None:
+        """Store a copy of the file at *source_path* under *key*."""
+        entry = self.path_for(key)
+        os.makedirs(path.dirname(entry), exist_ok=True)
+        tmp = f'{entry}.{os.getpid()}.{threading.get_ident()}.tmp'
+        shutil.copyfile(source_path, tmp)
+        self._commit(tmp, entry)
+
+    def fetch_file(self, key: str, target_path: str) -> bool:
+        """Copy the entry for *key* to *target_path*.
+
+        Returns:
+            True on a hit, False when *key* is not cached.
+        """
+        entry = self.path_for(key)
+        if not self._touch(entry):
+            return False
+        try:
+            shutil.copyfile(entry, target_path)
+        except OSError:
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # int16 audio API
+    # ------------------------------------------------------------------
+
+    def get_audio(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached clip for *key* as a 1-D int16 array, or ``None``."""
+        data = self.get(key)
+        if data is None:
+            return None
+        return np.frombuffer(data, dtype=np.int16)
+
+    def put_audio(self, key: str, audio: np.ndarray) -> None:
+        """Store a 1-D int16 clip under *key*."""
+        self.put(key, np.ascontiguousarray(audio, dtype=np.int16).tobytes())
+
+    # ------------------------------------------------------------------
+    # Internal utilities
+    # ------------------------------------------------------------------
+
+    def _touch(self, entry: str) -> bool:
+        """Bump the LRU stamp of *entry*; False when it does not exist."""
+        try:
+            os.utime(entry)
+        except OSError:
+            return False
+        return True
+
+    def _commit(self, tmp: str, entry: str) -> None:
+        """Move a written temp file into place and account for its size."""
+        size = path.getsize(tmp)
+        try:
+            old_size = path.getsize(entry)
+        except OSError:
+            old_size = 0
+        os.replace(tmp, entry)
+        with self._lock:
+            self._total_bytes += size - old_size
+            over_limit = self._total_bytes > max(self.max_bytes, self._evict_floor)
+        if over_limit:
+            self._evict()
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        """List cache entries as ``(mtime, size, path)``."""
+        entries: List[Tuple[float, int, str]] = []
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(_ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        """Remove least recently used entries down to the target size."""
+        with self._lock:
+            entries = self._scan()
+            self._total_bytes = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * EVICT_TARGET_RATIO)
+            for mtime, size, entry in sorted(entries):
+                if self._total_bytes <= target or mtime >= self._session_start:
+                    break
+                try:
+                    os.remove(entry)
+                except OSError:
+                    continue
+                self._total_bytes -= size
+            # Everything left is in use by this run — don't rescan on every put
+            self._evict_floor = int(self._total_bytes / EVICT_TARGET_RATIO)
+
+
+def clip_cache_from_settings(max_mb: Optional[str]) -> Optional[ClipCache]:
+    """Return the shared clip cache for the ``tts_cache_max_mb`` setting.
+
+    The instance is reused across files of one process, so the cache
+    directory is walked once per run rather than once per file; each call
+    starts a new eviction session for the file about to be synthesized.
+
+    Args:
+        max_mb: Size bound in MiB as string; ``'0'`` disables the cache.
+
+    Returns:
+        A ``ClipCache`` instance, or ``None`` when caching is disabled.
+    """
+    try:
+        max_bytes = int(float(max_mb)) * 1024 ** 2 if max_mb else DEFAULT_MAX_BYTES
+    except ValueError:
+        max_bytes = DEFAULT_MAX_BYTES
+    if max_bytes <= 0:
+        return None
+    cache = ClipCache.shared(max_bytes=max_bytes)
+    cache.start_session()
+    return cache
+
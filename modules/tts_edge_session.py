@@ -0,0 +1,380 @@
+"""Pooled Edge TTS session: warm websockets reused across utterances.
+
+``edge_tts.Communicate`` opens a new TLS websocket for every request, sends
+the ``speech.config`` message, synthesizes one text and closes. For short
+subtitle lines the handshake costs more than the synthesis itself, all the
+more on a high-latency link. ``EdgeSession`` keeps up to ``pool_size``
+connections open and sends the successive ``Path:ssml`` requests over them:
+
+* the ``speech.config`` message is sent once per connection (again only
+  when the boundary type changes),
+* a turn is read until ``turn.end``; audio frames are collected in memory,
+  ``audio.metadata`` frames give the word boundaries,
+* a connection idle for longer than ``idle_timeout`` or closed by the
+  service is dropped before reuse,
+* a reused connection that fails mid-request is replaced by a fresh one
+  and the request is sent again; failures of a fresh connection are raised
+  to the caller, who owns the retry policy.
+
+The service URL is a parameter, so the session can be pointed at a local
+stand-in server speaking the same framing (see tests/tts_edge_session_test.py).
+
+Usage::
+
+    from modules.tts_edge_session import EdgeSession
+
+    async with EdgeSession(pool_size=8) as session:
+        words = []
+        mp3 = await session.synthesize('Dzień dobry.', 'pl-PL-ZofiaNeural', word_boundaries=words)
+"""
+
+import asyncio
+import json
+import ssl
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, unescape
+
+import aiohttp
+import certifi
+from edge_tts.communicate import (connect_id,
+                                  date_to_string,
+                                  get_headers_and_data,
+                                  mkssml,
+                                  remove_incompatible_characters,
+                                  split_text_by_byte_length,
+                                  ssml_headers_plus_data)
+from edge_tts.constants import SEC_MS_GEC_VERSION, WSS_HEADERS, WSS_URL
+from edge_tts.data_classes import TTSConfig
+from edge_tts.drm import DRM
+from edge_tts.exceptions import NoAudioReceived, UnexpectedResponse, UnknownResponse, WebSocketError
+
+from modules.edge_coalesce import WordBoundary
+
+# ---------------------------------------------------------------------------
+# Module-level constants
+# ---------------------------------------------------------------------------
+
+EDGE_DEFAULT_POOL_SIZE: int = 4
+"""Connections kept open by default."""
+
+EDGE_IDLE_TIMEOUT_S: float = 30.0
+"""Idle connections older than this are closed instead of reused."""
+
+EDGE_CONNECT_TIMEOUT_S: float = 10.0
+"""Max seconds of the TCP/TLS connect."""
+
+EDGE_RECEIVE_TIMEOUT_S: float = 60.0
+"""Max seconds between two frames of one turn."""
+
+EDGE_CLOSE_TIMEOUT_S: float = 2.0
+"""Max wait for the service to acknowledge a close frame."""
+
+EDGE_MAX_SSML_BYTES: int = 4096
+"""Longer texts are sent as several turns on the same connection."""
+
+_TURN_PADDING_TICKS: int = 8_750_000
+"""Average silence the service appends to a turn (offset of the next one)."""
+
+_OUTPUT_FORMAT: str = 'audio-24khz-48kbitrate-mono-mp3'
+
+
+class _EdgeConnection:
+    """One open websocket and the ``speech.config`` it was sent."""
+
+    __slots__ = ('websocket', 'boundary', 'last_used', 'turns')
+
+    def __init__(self, websocket: aiohttp.ClientWebSocketResponse) -> None:
+        self.websocket: aiohttp.ClientWebSocketResponse = websocket
+        self.boundary: Optional[str] = None
+        self.last_used: float = monotonic()
+        self.turns: int = 0
+
+    def reusable(self, idle_timeout: float) -> bool:
+        return not self.websocket.closed and monotonic() - self.last_used < idle_timeout
+
+    async def close(self) -> None:
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+
+class EdgeSession:
+    """Async context manager holding a pool of Edge TTS websockets.
+
+    Must be used within one event loop; ``synthesize`` may be awaited by
+    many tasks at once, each holding its own connection for the turn.
+
+    Attributes:
+        pool_size: Max connections open at once; callers beyond it wait.
+        url: Service websocket URL (a stand-in server in tests).
+        idle_timeout: Idle seconds after which a connection is not reused.
+        receive_timeout: Max seconds between two frames of one turn.
+        counters: Requests, connects, reconnects and closed stale connections.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = EDGE_DEFAULT_POOL_SIZE,
+        url: str = WSS_URL,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        idle_timeout: float = EDGE_IDLE_TIMEOUT_S,
+        receive_timeout: float = EDGE_RECEIVE_TIMEOUT_S,
+        connect_timeout: float = EDGE_CONNECT_TIMEOUT_S,
+    ) -> None:
+        self.pool_size: int = max(1, int(pool_size))
+        self.url: str = url
+        self.idle_timeout: float = idle_timeout
+        self.receive_timeout: float = receive_timeout
+        self.connect_timeout: float = connect_timeout
+        self.counters: Dict[str, int] = {'requests': 0, 'connects': 0, 'reconnects': 0, 'stale': 0}
+        self._ssl: Optional[ssl.SSLContext] = ssl_context
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._idle: List[_EdgeConnection] = []
+        self._open: int = 0
+        self._available: Optional[asyncio.Condition] = None
+
+    async def __aenter__(self) -> 'EdgeSession':
+        if self._ssl is None and self.url.startswith('wss:'):
+            self._ssl = ssl.create_default_context(cafile=certifi.where())
+        self._session = aiohttp.ClientSession(
+            trust_env=True,
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout))
+        self._available = asyncio.Condition()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close every idle connection and the HTTP session."""
+        idle, self._idle = self._idle, []
+        self._open -= len(idle)
+        for connection in idle:
+            await connection.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def __str__(self) -> str:
+        counts = ' '.join(f'{kind}={count}' for kind, count in self.counters.items())
+        return f'Edge session: pool={self.pool_size} open={self._open} {counts}'
+
+    # ------------------------------------------------------------------
+    # Synthesis
+    # ------------------------------------------------------------------
+
+    async def synthesize(
+        self,
+        text: str,
+        voice: str,
+        rate: str = '+0%',
+        volume: str = '+0%',
+        word_boundaries: Optional[List[WordBoundary]] = None,
+    ) -> bytes:
+        """Synthesize *text* over a pooled connection.
+
+        Args:
+            text: Plain text to speak (escaped here).
+            voice: Edge voice, e.g. ``pl-PL-ZofiaNeural``.
+            rate: Speed change, e.g. ``+10%``.
+            volume: Volume change, e.g. ``-5%``.
+            word_boundaries: Receives (offset, duration, word) of every
+                spoken word when given.
+
+        Returns:
+            The MP3 stream (24 kHz mono).
+
+        Raises:
+            NoAudioReceived, UnexpectedResponse, UnknownResponse, WebSocketError,
+            aiohttp.ClientError, asyncio.TimeoutError: The request failed on a
+                fresh connection (a failed reused connection is retried once).
+        """
+        if self._session is None:
+            raise RuntimeError('EdgeSession must be used as an async context manager')
+        boundary = 'WordBoundary' if word_boundaries is not None else 'SentenceBoundary'
+        config = TTSConfig(voice, rate, volume, '+0Hz', boundary)
+        chunks = list(split_text_by_byte_length(
+            escape(remove_incompatible_characters(text)), EDGE_MAX_SSML_BYTES))
+        self.counters['requests'] += 1
+
+        while True:
+            connection, reused = await self._acquire()
+            healthy = False
+            try:
+                audio, words = await self._request(connection, config, chunks)
+                healthy = True
+            except (aiohttp.ClientError, WebSocketError, ConnectionError, asyncio.TimeoutError):
+                if not reused:
+                    raise
+                # The service dropped a warm connection: replay on a fresh one
+                self.counters['reconnects'] += 1
+                continue
+            finally:
+                await self._release(connection, healthy)
+            if word_boundaries is not None:
+                word_boundaries.extend(words)
+            return audio
+
+    async def _request(
+        self,
+        connection: _EdgeConnection,
+        config: TTSConfig,
+        chunks: List[bytes],
+    ) -> Tuple[bytes, List[WordBoundary]]:
+        """Send every chunk of one text as a turn and collect the answers."""
+        websocket = connection.websocket
+        if connection.boundary != config.boundary:
+            await websocket.send_str(self._config_message(config.boundary))
+            connection.boundary = config.boundary
+
+        audio = bytearray()
+        words: List[WordBoundary] = []
+        offset = 0
+        for chunk in chunks:
+            await websocket.send_str(ssml_headers_plus_data(connect_id(), date_to_string(), mkssml(config, chunk)))
+            last_end = offset
+            while True:
+                message = await websocket.receive(timeout=self.receive_timeout)
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    encoded: bytes = message.data.encode('utf-8')
+                    headers, data = get_headers_and_data(encoded, encoded.find(b'\r\n\r\n'))
+                    frame_path = headers.get(b'Path')
+                    if frame_path == b'audio.metadata':
+                        for word in self._parse_metadata(data):
+                            words.append((word[0] + offset, word[1], word[2]))
+                            last_end = word[0] + offset + word[1]
+                    elif frame_path == b'turn.end':
+                        break
+                    elif frame_path not in (b'response', b'turn.start'):
+                        raise UnknownResponse(f'Unknown path received: {frame_path!r}')
+                elif message.type == aiohttp.WSMsgType.BINARY:
+                    audio += self._parse_audio(message.data)
+                elif message.type == aiohttp.WSMsgType.ERROR:
+                    raise WebSocketError(str(message.data or 'Unknown error'))
+                else:
+                    # CLOSE / CLOSING / CLOSED: the service ended the connection mid-turn
+                    raise WebSocketError(f'Connection closed by the service ({message.type.name})')
+            offset = last_end + _TURN_PADDING_TICKS
+            connection.turns += 1
+
+        if not audio:
+            raise NoAudioReceived('No audio was received. Please verify that your parameters are correct.')
+        return bytes(audio), words
+
+    # ------------------------------------------------------------------
+    # Pool
+    # ------------------------------------------------------------------
+
+    async def _acquire(self) -> Tuple[_EdgeConnection, bool]:
+        """Take a warm connection (reused=True) or open a new one once a pool slot is free."""
+        stale: List[_EdgeConnection] = []
+        try:
+            async with self._available:
+                while True:
+                    while self._idle:
+                        connection = self._idle.pop()
+                        if connection.reusable(self.idle_timeout):
+                            return connection, True
+                        stale.append(connection)
+                        self._open -= 1
+                        self.counters['stale'] += 1
+                    if self._open < self.pool_size:
+                        self._open += 1
+                        break
+                    await self._available.wait()
+        finally:
+            for connection in stale:
+                await connection.close()
+
+        try:
+            return await self._connect(), False
+        except BaseException:
+            async with self._available:
+                self._open -= 1
+                self._available.notify()
+            raise
+
+    async def _release(self, connection: _EdgeConnection, healthy: bool) -> None:
+        """Return a connection to the pool, or close it after a failed turn."""
+        if not healthy:
+            # A cancelled or failed turn may leave unread frames behind
+            await connection.close()
+        async with self._available:
+            if healthy and not connection.websocket.closed:
+                connection.last_used = monotonic()
+                self._idle.append(connection)
+            else:
+                self._open -= 1
+            self._available.notify()
+
+    async def _connect(self) -> _EdgeConnection:
+        """Open one websocket; a 403 from clock skew is corrected and retried once."""
+        for attempt in range(2):
+            try:
+                websocket = await self._session.ws_connect(
+                    f'{self.url}&ConnectionId={connect_id()}'
+                    f'&Sec-MS-GEC={DRM.generate_sec_ms_gec()}'
+                    f'&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}',
+                    compress=15,
+                    headers=DRM.headers_with_muid(WSS_HEADERS),
+                    ssl=self._ssl,
+                    timeout=aiohttp.ClientWSTimeout(ws_close=EDGE_CLOSE_TIMEOUT_S),
+                )
+            except aiohttp.WSServerHandshakeError as e:
+                if e.status != 403 or attempt:
+                    raise
+                DRM.handle_client_response_error(e)
+                continue
+            self.counters['connects'] += 1
+            return _EdgeConnection(websocket)
+        raise AssertionError('unreachable')
+
+    # ------------------------------------------------------------------
+    # Framing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _config_message(boundary: str) -> str:
+        word_boundary = 'true' if boundary == 'WordBoundary' else 'false'
+        sentence_boundary = 'false' if boundary == 'WordBoundary' else 'true'
+        return (
+            f'X-Timestamp:{date_to_string()}\r\n'
+            'Content-Type:application/json; charset=utf-8\r\n'
+            'Path:speech.config\r\n\r\n'
+            '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+            f'"sentenceBoundaryEnabled":"{sentence_boundary}","wordBoundaryEnabled":"{word_boundary}"'
+            '},'
+            f'"outputFormat":"{_OUTPUT_FORMAT}"'
+            '}}}}\r\n'
+        )
+
+    @staticmethod
+    def _parse_audio(frame: bytes) -> bytes:
+        """Audio payload of a binary frame: 2-byte big-endian header length, headers, data."""
+        if len(frame) < 2:
+            raise UnexpectedResponse('Binary message is missing the header length.')
+        header_length = int.from_bytes(frame[:2], 'big')
+        if header_length > len(frame):
+            raise UnexpectedResponse('The header length is greater than the length of the data.')
+        headers, data = get_headers_and_data(frame, header_length)
+        if headers.get(b'Path') != b'audio':
+            raise UnexpectedResponse('Received binary message, but the path is not audio.')
+        content_type = headers.get(b'Content-Type')
+        if content_type is None and not data:
+            return b''  # end-of-stream marker
+        if content_type != b'audio/mpeg' or not data:
+            raise UnexpectedResponse('Received binary message with unexpected content.')
+        return data
+
+    @staticmethod
+    def _parse_metadata(data: bytes) -> List[WordBoundary]:
+        words: List[WordBoundary] = []
+        for item in json.loads(data)['Metadata']:
+            if item['Type'] in ('WordBoundary', 'SentenceBoundary'):
+                words.append((item['Data']['Offset'], item['Data']['Duration'],
+                              unescape(item['Data']['text']['Text'])))
+            elif item['Type'] != 'SessionEnd':
+                raise UnknownResponse(f"Unknown metadata type: {item['Type']}")
+        return words
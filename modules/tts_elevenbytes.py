@@ -1,7 +1,10 @@
 """ElevenBytes TTS — produkcyjna biblioteka async/sync.
 
 Jeden plik, jedna zależność (httpx). Retry, concurrency control, batch, walidacja.
-Formaty: mp3 (default), wav, ogg, flac (wav/ogg/flac wymaga ffmpeg w PATH lub imageio-ffmpeg).
+Z pakietem h2 (pip install httpx[http2]) requesty są multipleksowane po HTTP/2.
+Formaty: mp3 (default), wav, ogg, flac, pcm (wymagają ffmpeg w PATH lub imageio-ffmpeg).
+Konwersja idzie przez stdin/stdout ffmpeg (bez plików tymczasowych), maks. jeden
+proces na rdzeń naraz. "pcm" to surowe s16le mono PCM_SAMPLE_RATE — bez parsowania WAV.
 
     async with TTS(output_dir="output/audio") as tts:
         # Pojedyncza synteza — auto-path w output_dir
@@ -18,6 +21,10 @@ Formaty: mp3 (default), wav, ogg, flac (wav/ogg/flac wymaga ffmpeg w PATH lub im
         # Batch — wiele tekstów równolegle
         results = await tts.synthesize_batch(["Tekst 1", "Tekst 2"], fmt="wav")
 
+        # Strumień — ograniczone okno w locie, wyniki od razu po ukończeniu
+        async for result in tts.stream_batch(lines, ordered=True):
+            save(result.index, result.audio)   # i zapomnij o klipie
+
         # Dynamiczne głosy
         tts.add_voice("rachel", "Rachel — Calm", "21m00Tcm4TlvDq8ikWAM")
         audio = await tts.synthesize("Hej!", voice="rachel")
@@ -35,17 +42,24 @@ from __future__ import annotations
 
 import asyncio
 import concurrent.futures
+import functools
+import importlib.util
 import logging
+import os
 import shutil
 import threading
+import struct
 import subprocess
-import tempfile
 import time
+from collections.abc import AsyncIterator, Iterable
+from contextlib import aclosing, suppress
 from dataclasses import dataclass, field
 from pathlib import Path
 
 import httpx
 
+from modules.concurrency_controller import ConcurrencyController
+
 log = logging.getLogger("elevenbytes")
 
 # ─── Config ────────────────────────────────────────────────────────────────────
@@ -57,11 +71,26 @@ MIN_CHARS: int = 2
 MIN_AUDIO_BYTES: int = 1024
 DEFAULT_VOICE: str = "dallin"
 DEFAULT_CONCURRENCY: int = 100
+DEFAULT_INITIAL_CONCURRENCY: int = 8
+STREAM_WINDOW_FACTOR: int = 2  # stream_batch: zadań w locie = factor × concurrency
 DEFAULT_TIMEOUT: float = 30.0
 DEFAULT_MAX_RETRIES: int = 100
 RETRY_BACKOFF_BASE: float = 2.0
 RETRY_STATUS_CODES: frozenset[int] = frozenset({403, 429, 502, 503, 504})
-SUPPORTED_FORMATS: frozenset[str] = frozenset({"mp3", "wav", "ogg", "flac"})
+SUPPORTED_FORMATS: frozenset[str] = frozenset({"mp3", "wav", "ogg", "flac", "pcm"})
+PCM_SAMPLE_RATE: int = 44_100  # fmt="pcm": surowe s16le, mono
+CONVERT_CONCURRENCY: int = os.cpu_count() or 1  # równoległe procesy ffmpeg
+
+# Argumenty wyjścia ffmpeg (stdout) dla formatów innych niż mp3
+_FFMPEG_OUTPUT_ARGS: dict[str, list[str]] = {
+    "wav": ["-f", "wav"],
+    "ogg": ["-f", "ogg"],
+    "flac": ["-f", "flac"],
+    "pcm": ["-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE)],
+}
+
+# httpx speaks HTTP/2 only with the optional h2 package installed
+HTTP2_AVAILABLE: bool = importlib.util.find_spec("h2") is not None
 
 # ─── Głosy ElevenLabs ─────────────────────────────────────────────────────────
 # alias → (display_name, voice_id)
@@ -132,14 +161,16 @@ class TTSAPIError(TTSError):
 class TTS:
     """Async ElevenLabs TTS via ElevenBytes proxy.
 
-    Retry z backoff, concurrency control (semaphore), batch processing.
+    Retry z backoff, adaptacyjna concurrency (AIMD, ``controller``), batch processing.
 
     Args:
         default_voice: Domyślny głos (alias lub raw voice ID).
         output_dir: Domyślny folder na pliki audio. None = CWD.
-        concurrency: Max równoległych requestów (default 20).
+        concurrency: Sufit równoległych requestów; okno rośnie do niego od
+            ``DEFAULT_INITIAL_CONCURRENCY`` i maleje na 403/429/5xx/timeout.
         max_retries: Max retryów na 403/429/5xx z exponential backoff.
         timeout: Timeout HTTP w sekundach.
+        http2: Multipleksuj requesty po HTTP/2 (gdy dostępny pakiet h2).
     """
 
     def __init__(
@@ -149,13 +180,26 @@ class TTS:
         concurrency: int = DEFAULT_CONCURRENCY,
         max_retries: int = DEFAULT_MAX_RETRIES,
         timeout: float = DEFAULT_TIMEOUT,
+        http2: bool = True,
     ) -> None:
         self._default_voice = default_voice
         self._output_dir = Path(output_dir) if output_dir else None
         self._max_retries = max_retries
         self._concurrency = concurrency
-        self._sem: asyncio.Semaphore | None = None
-        transport = httpx.AsyncHTTPTransport(retries=2)
+        # Every HTTP attempt (retries included) holds one slot of the shared window
+        self.controller = ConcurrencyController(
+            initial=min(DEFAULT_INITIAL_CONCURRENCY, concurrency),
+            maximum=concurrency,
+            name="ElevenBytes",
+        )
+        # One pool sized to the semaphore: over HTTP/2 the requests share a few
+        # multiplexed connections instead of one TLS handshake per slot
+        self.http2: bool = http2 and HTTP2_AVAILABLE
+        transport = httpx.AsyncHTTPTransport(
+            retries=2,
+            http2=self.http2,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
         self._client = httpx.AsyncClient(
             transport=transport,
             timeout=httpx.Timeout(timeout, connect=10.0),
@@ -173,13 +217,8 @@ class TTS:
         )
         self._sync_loop: asyncio.AbstractEventLoop | None = None
         self._sync_thread: threading.Thread | None = None
-
-    def _get_sem(self) -> asyncio.Semaphore:
-        """Lazy-init semaphore bound to the current running event loop."""
-        loop = asyncio.get_running_loop()
-        if self._sem is None or self._sem._loop is not loop:  # type: ignore[attr-defined]
-            self._sem = asyncio.Semaphore(self._concurrency)
-        return self._sem
+        self._convert_sem: asyncio.Semaphore | None = None
+        self._convert_loop: asyncio.AbstractEventLoop | None = None
 
     # ── Async API ──────────────────────────────────────────────────────────
 
@@ -192,12 +231,12 @@ class TTS:
         """Syntezuj tekst → audio bytes.
 
         Retry z exponential backoff na 403/429/5xx.
-        Concurrency kontrolowana semaforem.
+        Concurrency kontrolowana oknem AIMD (``controller``).
 
         Args:
             text: Tekst do syntezy (2–5000 znaków).
             voice: Alias głosu lub raw voice ID. None = default.
-            fmt: Format wyjściowy: mp3 (default), wav, ogg, flac.
+            fmt: Format wyjściowy: mp3 (default), wav, ogg, flac, pcm.
 
         Returns:
             Surowe bajty audio w wybranym formacie.
@@ -210,12 +249,11 @@ class TTS:
         self._validate_format(fmt)
         voice_id = self._resolve_voice(voice or self._default_voice)
 
-        async with self._get_sem():
-            mp3_data = await self._request_with_retry(text, voice_id)
+        mp3_data = await self._request_with_retry(text, voice_id)
 
         if fmt == "mp3":
             return mp3_data
-        return self._convert_audio(mp3_data, fmt)
+        return await self._convert_audio_async(mp3_data, fmt)
 
     async def synthesize_to_file(
         self,
@@ -258,11 +296,14 @@ class TTS:
     ) -> BatchReport:
         """Syntezuj wiele tekstów równolegle z concurrency control.
 
+        Zbiera wyniki ``stream_batch`` — całe audio trzymane jest w raporcie;
+        dla długich list lepiej iterować ``stream_batch`` bezpośrednio.
+
         Args:
             texts: Lista tekstów.
             voice: Głos dla wszystkich (alias lub ID).
             save_dir: Opcjonalny folder — zapisz każdy plik audio.
-            fmt: Format wyjściowy: mp3, wav, ogg, flac.
+            fmt: Format wyjściowy: mp3, wav, ogg, flac, pcm.
 
         Returns:
             BatchReport z wynikami per tekst.
@@ -273,20 +314,46 @@ class TTS:
             out_dir.mkdir(parents=True, exist_ok=True)
 
         t_wall = time.perf_counter()
-        tasks = [
-            self._batch_item(i, text, voice, out_dir, fmt)
-            for i, text in enumerate(texts)
+        results = [
+            result async for result in self._stream(texts, voice, out_dir, fmt, None, ordered=True)
         ]
-        results = await asyncio.gather(*tasks)
         wall = time.perf_counter() - t_wall
 
-        report = BatchReport(
-            results=sorted(results, key=lambda r: r.index),
-            wall_time=wall,
-        )
+        report = BatchReport(results=results, wall_time=wall)
         log.info("Batch done: %s", report.summary())
         return report
 
+    async def stream_batch(
+        self,
+        texts: Iterable[str],
+        voice: str | None = None,
+        fmt: str = "mp3",
+        window: int | None = None,
+        ordered: bool = False,
+    ) -> AsyncIterator[SynthResult]:
+        """Syntezuj strumieniowo: ograniczone okno zadań, wyniki od razu po ukończeniu.
+
+        *texts* czytane są leniwie (może to być generator), więc w pamięci
+        jest najwyżej *window* zadań i klipów — wywołujący zapisuje każdy
+        wynik i go porzuca. Błędy nie przerywają strumienia (``ok=False``).
+
+        Args:
+            texts: Teksty do syntezy (dowolny iterable).
+            voice: Głos dla wszystkich (alias lub ID).
+            fmt: Format wyjściowy: mp3, wav, ogg, flac, pcm.
+            window: Maks. zadań w locie + wyników czekających na kolejność.
+                None = STREAM_WINDOW_FACTOR × concurrency.
+            ordered: True = wyniki w kolejności *texts* (po ``index``).
+
+        Yields:
+            SynthResult z ``index`` = pozycja tekstu w *texts*.
+        """
+        self._validate_format(fmt)
+        # aclosing: zamknięcie tego generatora od razu sprząta zadania _stream
+        async with aclosing(self._stream(texts, voice, None, fmt, window, ordered)) as stream:
+            async for result in stream:
+                yield result
+
     async def close(self) -> None:
         """Zamknij klienta HTTP."""
         await self._client.aclose()
@@ -385,16 +452,22 @@ class TTS:
             raise TTSValidationError(f"Tekst za długi ({len(text)} zn., max {MAX_CHARS})")
 
     async def _request_with_retry(self, text: str, voice_id: str) -> bytes:
-        """POST z retry + exponential backoff na retryable status codes."""
+        """POST z retry + exponential backoff na retryable status codes.
+
+        Każda próba zajmuje slot okna AIMD; status i timeouty są raportowane
+        do ``controller``, a backoff czeka już poza slotem.
+        """
         last_status = 0
         last_err = ""
 
         for attempt in range(1, self._max_retries + 1):
             try:
-                resp = await self._client.post(
-                    API_URL,
-                    data={"text": text, "voice": voice_id, "key": API_KEY},
-                )
+                async with self.controller.aslot(cost=len(text)) as slot:
+                    resp = await self._client.post(
+                        API_URL,
+                        data={"text": text, "voice": voice_id, "key": API_KEY},
+                    )
+                    slot.status(resp.status_code)
                 last_status = resp.status_code
 
                 if resp.status_code in RETRY_STATUS_CODES:
@@ -433,6 +506,56 @@ class TTS:
             f"(last: {last_err or last_status})"
         )
 
+    async def _stream(
+        self,
+        texts: Iterable[str],
+        voice: str | None,
+        out_dir: Path | None,
+        fmt: str,
+        window: int | None,
+        ordered: bool,
+    ) -> AsyncIterator[SynthResult]:
+        """Wspólna pętla ``stream_batch`` / ``synthesize_batch``."""
+        limit = max(1, window or STREAM_WINDOW_FACTOR * self._concurrency)
+        items = enumerate(texts)
+        exhausted = False
+        pending: set[asyncio.Task[SynthResult]] = set()
+        # ordered: ukończone wyniki czekające na wcześniejsze indeksy (liczą się do limitu)
+        waiting: dict[int, SynthResult] = {}
+        next_index = 0
+
+        def fill() -> None:
+            nonlocal exhausted
+            while not exhausted and len(pending) + len(waiting) < limit:
+                item = next(items, None)
+                if item is None:
+                    exhausted = True
+                    return
+                index, text = item
+                pending.add(asyncio.create_task(self._batch_item(index, text, voice, out_dir, fmt)))
+
+        try:
+            fill()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                for task in done:
+                    result = task.result()
+                    if ordered:
+                        waiting[result.index] = result
+                    else:
+                        yield result
+                while next_index in waiting:
+                    yield waiting.pop(next_index)
+                    next_index += 1
+                fill()
+        finally:
+            # Przerwany strumień (break/wyjątek u wywołującego) nie zostawia zadań w tle:
+            # anulowane zadania są też doczekane, żeby zamknęły swoje strumienie httpx
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
     async def _batch_item(
         self,
         index: int,
@@ -448,10 +571,9 @@ class TTS:
             self._validate_text(text)
             voice_id = self._resolve_voice(voice or self._default_voice)
 
-            async with self._get_sem():
-                mp3_data = await self._request_with_retry(text, voice_id)
+            mp3_data = await self._request_with_retry(text, voice_id)
 
-            audio = mp3_data if fmt == "mp3" else self._convert_audio(mp3_data, fmt)
+            audio = mp3_data if fmt == "mp3" else await self._convert_audio_async(mp3_data, fmt)
 
             if out_dir:
                 fname = f"{index:04d}.{fmt}"
@@ -483,40 +605,41 @@ class TTS:
 
     @staticmethod
     def _convert_audio(mp3_data: bytes, target_fmt: str) -> bytes:
-        """Konwertuj MP3 → target format via ffmpeg (bundled z imageio-ffmpeg)."""
-        try:
-            from imageio_ffmpeg import get_ffmpeg_exe
-            ffmpeg = get_ffmpeg_exe()
-        except ImportError:
-            ffmpeg = shutil.which("ffmpeg")
-            if not ffmpeg:
-                raise TTSError(
-                    "Brak ffmpeg. Zainstaluj: uv add imageio-ffmpeg "
-                    "lub dodaj ffmpeg do PATH."
-                ) from None
-
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp_in:
-            tmp_in.write(mp3_data)
-            tmp_in_path = Path(tmp_in.name)
-
-        tmp_out_path = tmp_in_path.with_suffix(f".{target_fmt}")
-        try:
-            result = subprocess.run(
-                [
-                    ffmpeg, "-y", "-i", str(tmp_in_path),
-                    "-loglevel", "error",
-                    str(tmp_out_path),
-                ],
-                capture_output=True,
-                text=True,
-                check=False,
+        """Konwertuj MP3 → target format przez pipe ffmpeg (bez plików tymczasowych)."""
+        result = subprocess.run(
+            _ffmpeg_convert_args(target_fmt),
+            input=mp3_data,
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            raise TTSError(f"ffmpeg error: {result.stderr.decode('utf-8', errors='replace').strip()}")
+        return _finish_output(result.stdout, target_fmt)
+
+    async def _convert_audio_async(self, mp3_data: bytes, target_fmt: str) -> bytes:
+        """Jak ``_convert_audio``, ale nie blokuje pętli; maks. CONVERT_CONCURRENCY procesów."""
+        loop = asyncio.get_running_loop()
+        if self._convert_sem is None or self._convert_loop is not loop:
+            self._convert_sem = asyncio.Semaphore(CONVERT_CONCURRENCY)
+            self._convert_loop = loop
+        async with self._convert_sem:
+            proc = await asyncio.create_subprocess_exec(
+                *_ffmpeg_convert_args(target_fmt),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
-            if result.returncode != 0:
-                raise TTSError(f"ffmpeg error: {result.stderr.strip()}")
-            return tmp_out_path.read_bytes()
-        finally:
-            tmp_in_path.unlink(missing_ok=True)
-            tmp_out_path.unlink(missing_ok=True)
+            try:
+                stdout, stderr = await proc.communicate(mp3_data)
+            except BaseException:
+                # Anulowanie (break w stream_batch, watcher rund) — nie zostawiaj sieroty ffmpeg
+                with suppress(ProcessLookupError):
+                    proc.kill()
+                await proc.wait()
+                raise
+        if proc.returncode != 0:
+            raise TTSError(f"ffmpeg error: {stderr.decode('utf-8', errors='replace').strip()}")
+        return _finish_output(stdout, target_fmt)
 
     def _auto_path(self, fmt: str = "mp3") -> Path:
         ts = time.strftime("%Y%m%d_%H%M%S")
@@ -545,3 +668,49 @@ class TTS:
         except concurrent.futures.TimeoutError:
             future.cancel()
             raise TTSAPIError("Request timed out after 3600s — event loop blocked")
+
+
+# ─── ffmpeg helpers ────────────────────────────────────────────────────────────
+
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_exe() -> str:
+    """ffmpeg z imageio-ffmpeg albo z PATH (wynik zapamiętany)."""
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe
+        return get_ffmpeg_exe()
+    except ImportError:
+        ffmpeg = shutil.which("ffmpeg")
+        if not ffmpeg:
+            raise TTSError(
+                "Brak ffmpeg. Zainstaluj: uv add imageio-ffmpeg "
+                "lub dodaj ffmpeg do PATH."
+            ) from None
+        return ffmpeg
+
+
+def _ffmpeg_convert_args(target_fmt: str) -> list[str]:
+    """Komenda ffmpeg: MP3 ze stdin → *target_fmt* na stdout."""
+    return [
+        _ffmpeg_exe(), "-loglevel", "error",
+        "-f", "mp3", "-i", "pipe:0",
+        *_FFMPEG_OUTPUT_ARGS[target_fmt],
+        "pipe:1",
+    ]
+
+
+def _finish_output(data: bytes, target_fmt: str) -> bytes:
+    """Uzupełnij rozmiary w nagłówku WAV — na pipe ffmpeg nie może ich cofnąć i poprawić."""
+    if target_fmt != "wav" or data[:4] != b"RIFF" or len(data) < 12:
+        return data
+    fixed = bytearray(data)
+    struct.pack_into("<I", fixed, 4, len(fixed) - 8)
+    offset = 12
+    while offset + 8 <= len(fixed):
+        chunk_id = bytes(fixed[offset:offset + 4])
+        (size,) = struct.unpack_from("<I", fixed, offset + 4)
+        if chunk_id == b"data":
+            struct.pack_into("<I", fixed, offset + 4, len(fixed) - offset - 8)
+            break
+        offset += 8 + size + (size & 1)
+    return bytes(fixed)
@@ -4,60 +4,287 @@ Wrapper module for Fish Audio S2 Pro TTS API.
 Sends text to a locally-running Fish Audio server and receives WAV audio.
 No GPU needed in this process — inference runs on the separate server.
 
+Both clients keep a pool of keep-alive HTTP connections (httpx), so a file
+of 1,500 lines costs a handful of TCP connects instead of one per line.
+The audio can be requested as WAV (default) or raw PCM, and optionally as
+a streamed (chunked) response that is decoded while it arrives.
+
+Given several base URLs (one Fish server per GPU box), the clients spread
+the requests over them by least outstanding requests (``EndpointPool``):
+a server failing requests is ejected, its requests are retried on the
+others, and it is re-admitted once its ``/health`` answers again.
+
 Usage:
-    from modules.tts_fish_api import FishTTSClient
+    from modules.tts_fish_api import FishTTSClient, AsyncFishTTSClient
+
+    with FishTTSClient() as client:  # thread-safe, used by SynthesisScheduler
+        audio_int16 = client.synthesize("Cześć, jak się masz?")
+
+    with FishTTSClient(["http://gpu1:8855", "http://gpu2:8855"], concurrency=8) as client:
+        audio_int16 = client.synthesize("Dwa serwery, jedno zadanie.")
 
-    client = FishTTSClient()
-    audio_bytes = client.synthesize("Cześć, jak się masz?")
+    async with AsyncFishTTSClient(response_format="pcm") as client:
+        clips = await client.synthesize_many(lines, concurrency=4)
+        async for chunk in client.stream("Długi akapit..."):
+            player.write(chunk)
 """
 
+import asyncio
 import io
-import json
+import re
+import struct
 import wave
-from typing import Dict, List, Optional
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
+import httpx
 import numpy as np
 
 from constants import console
+from modules.concurrency_controller import ConcurrencyController
+from modules.endpoint_pool import Endpoint, EndpointPool
 
 # Fish Audio S2 Pro API defaults
 FISH_API_BASE_URL: str = "http://127.0.0.1:8855"
 FISH_SAMPLE_RATE: int = 44_100
 FISH_REQUEST_TIMEOUT: int = 300  # 5 min — matches server-side timeout
+FISH_CONNECT_TIMEOUT: float = 10.0
+FISH_DEFAULT_CONCURRENCY: int = 4  # keep-alive connections / synthesize_many requests in flight
+FISH_RESPONSE_FORMATS: frozenset = frozenset({"wav", "pcm"})  # "pcm": raw s16le mono, FISH_SAMPLE_RATE
+
+FISH_URL_SEPARATORS: str = ", ;"  # fish_api_urls: addresses separated by commas, spaces or semicolons
+
+_WAVE_FORMAT_PCM: int = 1
+_WAVE_FORMAT_EXTENSIBLE: int = 0xFFFE
+_WAVE_STREAMING_SIZES: frozenset = frozenset({0, 0xFFFFFFFF})  # data sizes of a WAV of unknown length
+
+
+def parse_fish_urls(value: Optional[str]) -> List[str]:
+    """Split the ``fish_api_urls`` setting into server addresses (default: the local server)."""
+    urls = [url.rstrip("/") for url in re.split(f"[{FISH_URL_SEPARATORS}]+", value or "") if url]
+    return urls or [FISH_API_BASE_URL]
+
+
+class FishPcmDecoder:
+    """Incremental WAV / raw PCM → int16 decoder for (streamed) response bodies.
+
+    Bytes are fed as they arrive; every ``feed`` returns the whole samples
+    decodable so far, so a chunked response is turned into audio without
+    waiting for its end. 32-bit samples are shifted down to int16.
+
+    Attributes:
+        raw: The body is headerless s16le PCM.
+        sample_rate: Rate from the WAV header (``FISH_SAMPLE_RATE`` for raw PCM).
+        sample_width: Bytes per sample (2 or 4).
+    """
+
+    def __init__(self, raw: bool = False) -> None:
+        self.raw: bool = raw
+        self.sample_rate: int = FISH_SAMPLE_RATE
+        self.sample_width: int = 2
+        self._header_done: bool = raw
+        self._pending: bytearray = bytearray()
+        self._remaining: Optional[int] = None  # data bytes not yet returned; None = up to the end
+
+    def feed(self, data: bytes) -> np.ndarray:
+        """Add body bytes; return the int16 samples completed by them."""
+        self._pending += data
+        if not self._header_done and not self._parse_header():
+            return np.array([], dtype=np.int16)
+        if self._remaining is not None:
+            # Chunks after the declared data (LIST, id3) are not audio
+            del self._pending[self._remaining:]
+        usable = len(self._pending) - len(self._pending) % self.sample_width
+        samples = bytes(self._pending[:usable])
+        del self._pending[:usable]
+        if self._remaining is not None:
+            self._remaining -= usable
+        if self.sample_width == 4:
+            # 32-bit → 16-bit
+            return (np.frombuffer(samples, dtype=np.int32) >> 16).astype(np.int16)
+        return np.frombuffer(samples, dtype=np.int16)
 
+    def finish(self) -> None:
+        """Check that the body ended on a sample boundary after a complete header."""
+        if not self._header_done:
+            raise RuntimeError("Fish Audio API: response ended inside the WAV header")
+        if self._pending:
+            raise RuntimeError(f"Fish Audio API: response ended mid-sample ({len(self._pending)} bytes left)")
 
-class FishTTSClient:
-    """HTTP client for Fish Audio S2 Pro TTS API."""
+    def _parse_header(self) -> bool:
+        """Consume RIFF/WAVE chunks up to ``data``; False until enough bytes arrived."""
+        buf = self._pending
+        if len(buf) < 12:
+            return False
+        if buf[:4] != b"RIFF" or buf[8:12] != b"WAVE":
+            raise RuntimeError("Fish Audio API: response is not a WAV stream")
+        position = 12
+        while len(buf) >= position + 8:
+            chunk_id = bytes(buf[position:position + 4])
+            size = struct.unpack_from("<I", buf, position + 4)[0]
+            if chunk_id == b"data":
+                # Streamed WAVs carry a placeholder size: the rest of the body is audio
+                if size not in _WAVE_STREAMING_SIZES:
+                    self._remaining = size
+                del buf[:position + 8]
+                self._header_done = True
+                return True
+            end = position + 8 + size + (size & 1)
+            if len(buf) < end:
+                return False
+            if chunk_id == b"fmt ":
+                audio_format, _, self.sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", buf, position + 8)
+                if audio_format not in (_WAVE_FORMAT_PCM, _WAVE_FORMAT_EXTENSIBLE) or bits not in (16, 32):
+                    raise RuntimeError(f"Fish Audio API: unsupported WAV format {audio_format}/{bits} bit")
+                self.sample_width = bits // 8
+            position = end
+        return False
+
+
+class _FishRequests:
+    """Request parameters, endpoint routing and response decoding shared by both clients."""
 
     def __init__(
         self,
-        base_url: str = FISH_API_BASE_URL,
-        voice: Optional[str] = None,
-        temperature: float = 0.8,
+        base_url: Union[str, Sequence[str]],
+        voice: Optional[str],
+        temperature: float,
+        response_format: str,
+        streaming: bool,
     ) -> None:
-        self.base_url: str = base_url.rstrip("/")
+        if response_format not in FISH_RESPONSE_FORMATS:
+            raise ValueError(f"Nieobsługiwany format odpowiedzi Fish Audio: {response_format}")
+        self.endpoints: EndpointPool = EndpointPool([base_url] if isinstance(base_url, str) else base_url)
+        self.base_url: str = self.endpoints.endpoints[0].url
         self.voice: Optional[str] = voice
         self.temperature: float = temperature
+        self.response_format: str = response_format
+        self.streaming: bool = streaming
+
+    def _payload(self, text: str) -> Dict:
+        payload: Dict = {
+            "text": text,
+            "format": self.response_format,
+            "temperature": self.temperature,
+        }
+        if self.voice:
+            payload["voice"] = self.voice
+        if self.streaming:
+            payload["streaming"] = True
+        return payload
+
+    def _decoder(self) -> FishPcmDecoder:
+        return FishPcmDecoder(raw=self.response_format == "pcm")
+
+    @staticmethod
+    def _limits(concurrency: int) -> httpx.Limits:
+        return httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        return httpx.Timeout(FISH_REQUEST_TIMEOUT, connect=FISH_CONNECT_TIMEOUT)
+
+    @staticmethod
+    def _api_error(exc: httpx.HTTPStatusError, body: bytes) -> RuntimeError:
+        error_body = body.decode("utf-8", errors="replace")
+        return RuntimeError(f"Fish Audio API error {exc.response.status_code}: {error_body}")
+
+    @staticmethod
+    def _is_node_failure(exc: BaseException) -> bool:
+        """Connection errors, timeouts and 5xx are the server's fault: another endpoint may succeed."""
+        if isinstance(exc, httpx.TransportError):
+            return True
+        cause = exc.__cause__
+        return isinstance(cause, httpx.HTTPStatusError) and cause.response.status_code >= 500
+
+    @staticmethod
+    def _is_healthy(data: Optional[Dict]) -> bool:
+        return data is not None and data.get("status") == "ok"
+
+    def _voices_url(self) -> str:
+        endpoint = next((endpoint for endpoint in self.endpoints.endpoints if endpoint.admitted),
+                        self.endpoints.endpoints[0])
+        return f"{endpoint.url}/voices"
+
+    def _admit_checked(self, results: List[Tuple[Optional[Dict], Optional[Exception]]]) -> None:
+        """Apply the start-up health checks: failing endpoints start ejected.
+
+        Args:
+            results: (health JSON or None, error or None) per endpoint, in pool order.
+
+        Raises:
+            ConnectionError: No endpoint is reachable.
+        """
+        errors = [error for _, error in results if error is not None]
+        if len(errors) == len(results):
+            raise self._unreachable(errors[0]) from errors[0]
+        healthy = [self._is_healthy(data) for data, _ in results]
+        if not any(healthy):
+            # Reachable but not reporting "ok": warn as before and use them anyway
+            healthy = [data is not None for data, _ in results]
+        for endpoint, (data, error), ok in zip(self.endpoints.endpoints, results, healthy):
+            if data is not None and data.get("status") != "ok":
+                console.print(
+                    f"Fish Audio API health check ({endpoint.url}): {data}",
+                    style="red_bold",
+                )
+            if not ok:
+                console.print(
+                    f"Fish Audio API {endpoint.url} pominięty do ponownego sprawdzenia: {error or data}",
+                    style="red_bold",
+                )
+                self.endpoints.probe_result(endpoint, False)
+
+    def _unreachable(self, exc: Exception) -> ConnectionError:
+        urls = ", ".join(endpoint.url for endpoint in self.endpoints.endpoints)
+        return ConnectionError(
+            f"Nie można połączyć z Fish Audio API ({urls}). "
+            f"Upewnij się, że serwer działa.\n{exc}"
+        )
+
+
+class FishTTSClient(_FishRequests):
+    """HTTP client for Fish Audio S2 Pro TTS API.
+
+    Thread-safe: ``SynthesisScheduler`` workers share one connection pool.
+    With several base URLs every request goes to the server with the fewest
+    requests in flight; a failing server is skipped until it is healthy again.
+    """
+
+    def __init__(
+        self,
+        base_url: Union[str, Sequence[str]] = FISH_API_BASE_URL,
+        voice: Optional[str] = None,
+        temperature: float = 0.8,
+        response_format: str = "wav",
+        streaming: bool = False,
+        concurrency: int = FISH_DEFAULT_CONCURRENCY,
+    ) -> None:
+        super().__init__(base_url, voice, temperature, response_format, streaming)
+        self._client: httpx.Client = httpx.Client(
+            limits=self._limits(max(1, concurrency)), timeout=self._timeout())
         self._check_server()
 
     def _check_server(self) -> None:
-        """Verify the Fish Audio server is reachable."""
+        """Verify the Fish Audio servers are reachable."""
+        endpoints = self.endpoints.endpoints
         try:
-            req = Request(f"{self.base_url}/health")
-            with urlopen(req, timeout=5) as resp:
-                data = json.loads(resp.read())
-                if data.get("status") != "ok":
-                    console.print(
-                        f"Fish Audio API health check: {data}",
-                        style="red_bold",
-                    )
-        except (URLError, OSError) as exc:
-            raise ConnectionError(
-                f"Nie można połączyć z Fish Audio API ({self.base_url}). "
-                f"Upewnij się, że serwer działa.\n{exc}"
-            ) from exc
+            with ThreadPoolExecutor(len(endpoints)) as pool:
+                self._admit_checked(list(pool.map(self._health, endpoints)))
+        except BaseException:
+            self._client.close()
+            raise
+
+    def _health(self, endpoint: Endpoint) -> Tuple[Optional[Dict], Optional[Exception]]:
+        try:
+            return self._client.get(f"{endpoint.url}/health", timeout=5).json(), None
+        except (httpx.TransportError, ValueError) as exc:
+            return None, exc
+
+    def _probe_ejected(self) -> None:
+        """Health-check ejected servers whose cooldown ran out."""
+        for endpoint in self.endpoints.claim_probes():
+            self.endpoints.probe_result(endpoint, self._is_healthy(self._health(endpoint)[0]))
 
     def get_voices(self) -> List[Dict[str, str]]:
         """Fetch available voice profiles from the server.
@@ -65,14 +292,16 @@ class FishTTSClient:
         Returns:
             List of dicts with 'name', 'audio_format', 'transcript'.
         """
-        req = Request(f"{self.base_url}/voices")
-        with urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-        return data.get("voices", [])
+        resp = self._client.get(self._voices_url(), timeout=10)
+        resp.raise_for_status()
+        return resp.json().get("voices", [])
 
     def synthesize(self, text: str) -> np.ndarray:
         """Synthesize text to int16 audio array.
 
+        A server failure (connection error, timeout, 5xx) is retried once on
+        every other server before it is raised.
+
         Args:
             text: Polish text to synthesize.
 
@@ -86,49 +315,52 @@ class FishTTSClient:
         if not text:
             return np.array([], dtype=np.int16)
 
-        payload: Dict = {
-            "text": text,
-            "format": "wav",
-            "temperature": self.temperature,
-        }
-        if self.voice:
-            payload["voice"] = self.voice
+        self._probe_ejected()
+        tried: List[Endpoint] = []
+        while True:
+            endpoint = self.endpoints.acquire(exclude=tried)
+            tried.append(endpoint)
+            try:
+                audio = self._synthesize_at(endpoint, text)
+            except BaseException as exc:
+                failed = self._is_node_failure(exc)
+                self.endpoints.release(endpoint, ok=not failed)
+                if not failed or len(tried) == len(self.endpoints):
+                    raise
+                continue
+            self.endpoints.release(endpoint, ok=True)
+            return audio
 
-        body = json.dumps(payload).encode("utf-8")
-        req = Request(
-            f"{self.base_url}/tts",
-            data=body,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
+    def _synthesize_at(self, endpoint: Endpoint, text: str) -> np.ndarray:
+        decoder = self._decoder()
+        chunks: List[np.ndarray] = []
+        with self._client.stream("POST", f"{endpoint.url}/tts", json=self._payload(text)) as resp:
+            try:
+                resp.raise_for_status()
+            except httpx.HTTPStatusError as exc:
+                raise self._api_error(exc, resp.read()) from exc
+            for data in resp.iter_bytes():
+                chunks.append(decoder.feed(data))
+        decoder.finish()
+        return np.concatenate(chunks) if chunks else np.array([], dtype=np.int16)
 
-        try:
-            with urlopen(req, timeout=FISH_REQUEST_TIMEOUT) as resp:
-                wav_bytes = resp.read()
-        except HTTPError as exc:
-            error_body = exc.read().decode("utf-8", errors="replace")
-            raise RuntimeError(
-                f"Fish Audio API error {exc.code}: {error_body}"
-            ) from exc
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._client.close()
+
+    def __enter__(self) -> "FishTTSClient":
+        return self
 
-        return self._wav_bytes_to_int16(wav_bytes)
+    def __exit__(self, *exc: object) -> None:
+        self.close()
 
     @staticmethod
     def _wav_bytes_to_int16(wav_bytes: bytes) -> np.ndarray:
         """Convert WAV bytes to int16 numpy array."""
-        buf = io.BytesIO(wav_bytes)
-        with wave.open(buf, "rb") as wf:
-            frames = wf.readframes(wf.getnframes())
-            sample_width = wf.getsampwidth()
-
-        if sample_width == 2:
-            return np.frombuffer(frames, dtype=np.int16)
-        elif sample_width == 4:
-            # 32-bit → 16-bit
-            arr = np.frombuffer(frames, dtype=np.int32)
-            return (arr >> 16).astype(np.int16)
-        else:
-            return np.frombuffer(frames, dtype=np.int16)
+        decoder = FishPcmDecoder()
+        audio = decoder.feed(wav_bytes)
+        decoder.finish()
+        return audio
 
     @staticmethod
     def get_sample_rate_from_wav(wav_bytes: bytes) -> int:
@@ -140,7 +372,162 @@ class FishTTSClient:
     @staticmethod
     def get_voices_static(base_url: str = FISH_API_BASE_URL) -> List[Dict[str, str]]:
         """Fetch voices without creating a full client instance."""
-        req = Request(f"{base_url.rstrip('/')}/voices")
-        with urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
-        return data.get("voices", [])
+        resp = httpx.get(f"{base_url.rstrip('/')}/voices", timeout=10)
+        resp.raise_for_status()
+        return resp.json().get("voices", [])
+
+
+class AsyncFishTTSClient(_FishRequests):
+    """Async HTTP client for Fish Audio S2 Pro TTS API with a keep-alive pool.
+
+    Use as ``async with``; entering checks the server health. Several base
+    URLs are load-balanced like in ``FishTTSClient``.
+
+    Attributes:
+        concurrency: Pool size and default ``synthesize_many`` parallelism.
+    """
+
+    def __init__(
+        self,
+        base_url: Union[str, Sequence[str]] = FISH_API_BASE_URL,
+        voice: Optional[str] = None,
+        temperature: float = 0.8,
+        response_format: str = "wav",
+        streaming: bool = False,
+        concurrency: int = FISH_DEFAULT_CONCURRENCY,
+    ) -> None:
+        super().__init__(base_url, voice, temperature, response_format, streaming)
+        self.concurrency: int = max(1, concurrency)
+        self._client: httpx.AsyncClient = httpx.AsyncClient(
+            limits=self._limits(self.concurrency), timeout=self._timeout())
+
+    async def check_server(self) -> None:
+        """Verify the Fish Audio servers are reachable."""
+        self._admit_checked(list(await asyncio.gather(*(
+            self._health(endpoint) for endpoint in self.endpoints.endpoints))))
+
+    async def _health(self, endpoint: Endpoint) -> Tuple[Optional[Dict], Optional[Exception]]:
+        try:
+            return (await self._client.get(f"{endpoint.url}/health", timeout=5)).json(), None
+        except (httpx.TransportError, ValueError) as exc:
+            return None, exc
+
+    async def _probe_ejected(self) -> None:
+        """Health-check ejected servers whose cooldown ran out."""
+        for endpoint in self.endpoints.claim_probes():
+            self.endpoints.probe_result(endpoint, self._is_healthy((await self._health(endpoint))[0]))
+
+    async def stream(self, text: str) -> AsyncIterator[np.ndarray]:
+        """Yield int16 chunks of *text* while the response body arrives.
+
+        A server failure before the first chunk is retried on the other
+        servers; once audio was yielded the error is raised.
+
+        Raises:
+            RuntimeError: If the API returns an error.
+        """
+        text = text.strip()
+        if not text:
+            return
+        await self._probe_ejected()
+        tried: List[Endpoint] = []
+        while True:
+            endpoint = self.endpoints.acquire(exclude=tried)
+            tried.append(endpoint)
+            yielded = False
+            try:
+                async for chunk in self._stream_at(endpoint, text):
+                    yielded = True
+                    yield chunk
+            except BaseException as exc:
+                failed = self._is_node_failure(exc)
+                self.endpoints.release(endpoint, ok=not failed)
+                if not failed or yielded or len(tried) == len(self.endpoints):
+                    raise
+                continue
+            self.endpoints.release(endpoint, ok=True)
+            return
+
+    async def _stream_at(self, endpoint: Endpoint, text: str) -> AsyncIterator[np.ndarray]:
+        decoder = self._decoder()
+        async with self._client.stream("POST", f"{endpoint.url}/tts", json=self._payload(text)) as resp:
+            try:
+                resp.raise_for_status()
+            except httpx.HTTPStatusError as exc:
+                raise self._api_error(exc, await resp.aread()) from exc
+            async for data in resp.aiter_bytes():
+                chunk = decoder.feed(data)
+                if len(chunk):
+                    yield chunk
+        decoder.finish()
+
+    async def synthesize(self, text: str) -> np.ndarray:
+        """Synthesize text to int16 audio array.
+
+        Args:
+            text: Polish text to synthesize.
+
+        Returns:
+            1-D numpy int16 array of audio samples.
+
+        Raises:
+            RuntimeError: If the API returns an error.
+        """
+        chunks = [chunk async for chunk in self.stream(text)]
+        return np.concatenate(chunks) if chunks else np.array([], dtype=np.int16)
+
+    async def synthesize_many(
+        self,
+        texts: Iterable[str],
+        concurrency: Optional[int] = None,
+        controller: Optional[ConcurrencyController] = None,
+    ) -> List[np.ndarray]:
+        """Synthesize *texts* with at most *concurrency* requests in flight.
+
+        Args:
+            texts: Texts to synthesize.
+            concurrency: Requests in flight (default: the pool size).
+            controller: Optional adaptive limit used instead of a fixed one.
+
+        Returns:
+            One int16 array per text, in input order.
+
+        Raises:
+            RuntimeError: The first failed request; the others are cancelled.
+        """
+        limit = asyncio.Semaphore(max(1, concurrency or self.concurrency))
+
+        async def one(text: str) -> np.ndarray:
+            if controller is not None:
+                async with controller.aslot(cost=len(text)):
+                    return await self.synthesize(text)
+            async with limit:
+                return await self.synthesize(text)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(one(text)) for text in texts]
+        except BaseExceptionGroup as errors:
+            raise errors.exceptions[0]
+        return [task.result() for task in tasks]
+
+    async def get_voices(self) -> List[Dict[str, str]]:
+        """Fetch available voice profiles from the server."""
+        resp = await self._client.get(self._voices_url(), timeout=10)
+        resp.raise_for_status()
+        return resp.json().get("voices", [])
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncFishTTSClient":
+        try:
+            await self.check_server()
+        except BaseException:
+            await self.aclose()
+            raise
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
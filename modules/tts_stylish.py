@@ -9,28 +9,116 @@ Usage:
 
     tts = StylishTTS()
     audio_int16 = tts.synthesize("Cześć, jak się masz?")
+    clips = tts.synthesize_batch(["Tak.", "Co się stało?", "Nic."])
+
+Phonemes are memoized on disk (``PHONEME_CACHE_PATH``) keyed by text and
+espeak settings; ``prefetch_phonemes`` phonemizes a whole subtitle file in
+one espeak call.
+
+The assembled model is exported once to a single safetensors file
+(``STYLISH_TTS_EXPORT_PATH``) that later runs load memory-mapped instead of
+reading every checkpoint shard; ``StylishTTS.shared()`` keeps one loaded
+model per process, so the next subtitle files start synthesizing at once:
+
+    tts = StylishTTS.shared()
+
+On CPU the model can also run as an exported graph without eager-mode
+Python dispatch (dynamic batch and sequence length). The graph is exported
+on first use, or explicitly with::
+
+    python -m modules.tts_stylish onnx         # needs onnxruntime
+    python -m modules.tts_stylish torchscript
+
+    tts = StylishTTS(device='cpu', backend='onnx')
+
+``quantize=True`` (eager backend, CPU) applies dynamic INT8 quantization to
+the linear and recurrent layers; the quantized weights are cached on disk
+(``STYLISH_TTS_INT8_PATH``) so later runs skip the fp32 load.
 """
 
+import contextlib
+import importlib.util
+import json
 import os
+import re
 import sys
+import threading
 import wave
 from os import path
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 import torch
 
 from constants import (
     ESPEAK_NG_FOLDER,
+    PHONEME_CACHE_PATH,
     STYLISH_TTS_FOLDER,
     STYLISH_TTS_CONFIG_PATH,
     STYLISH_TTS_CHECKPOINT_DIR,
+    STYLISH_TTS_EXPORT_PATH,
+    STYLISH_TTS_INT8_PATH,
+    STYLISH_TTS_ONNX_PATH,
+    STYLISH_TTS_TORCHSCRIPT_PATH,
     console,
 )
 
 # Sample rate of the STylish-TTS-Pl model
 STYLISH_SAMPLE_RATE: int = 24_000
 
+# Max sentence chunks per forward pass of the model
+STYLISH_BATCH_SIZE: int = 8
+
+# Subtitles handed to synthesize_batch at once (more texts -> tighter length buckets)
+STYLISH_SUBTITLE_WINDOW: int = 32
+
+# A bucket is closed when its longest sequence exceeds the shortest by this ratio
+_BUCKET_RATIO: float = 1.5
+
+# Batched outputs are padded; samples below this level at the end are cut (~-60 dBFS)
+_TRIM_THRESHOLD: float = 1e-3
+_TRIM_TAIL_SAMPLES: int = int(STYLISH_SAMPLE_RATE * 0.02)
+
+_CHUNK_SILENCE_SAMPLES: int = int(STYLISH_SAMPLE_RATE * 0.05)
+
+# espeak-ng settings; part of the phoneme cache key
+_ESPEAK_LANGUAGE: str = 'pl'
+_ESPEAK_OPTIONS: Dict[str, bool] = {'preserve_punctuation': True, 'with_stress': True}
+
+# Oldest phoneme cache entries are dropped above this count
+PHONEME_CACHE_MAX_ENTRIES: int = 200_000
+
+# A sentence: everything up to and including a run of terminators, or the tail
+_SENTENCE_RE = re.compile(r'[^.?!;]*[.?!;]+|[^.?!;]+$')
+
+# Inference backends and the graph files of the exported ones
+STYLISH_BACKENDS: Tuple[str, ...] = ('eager', 'onnx', 'torchscript')
+_GRAPH_PATHS: Dict[str, str] = {
+    'onnx': STYLISH_TTS_ONNX_PATH,
+    'torchscript': STYLISH_TTS_TORCHSCRIPT_PATH,
+}
+
+# Layer types replaced by dynamic INT8 versions in quantized mode
+_QUANTIZED_LAYERS = {torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU}
+
+# Error text of a batched call rejected by a graph fixed to batch 1
+_SHAPE_ERROR_MARKERS: Tuple[str, ...] = ('shape', 'dimension')
+
+# Text used to trace the model during export
+_EXPORT_SAMPLE_TEXT: str = 'Dzień dobry, jak się dzisiaj masz?'
+
+
+def _is_shape_error(exc: Exception) -> bool:
+    """True when a batched model call failed on tensor shapes (graph fixed to batch 1).
+
+    Torch reports these as ``RuntimeError``, onnxruntime as its own
+    ``Fail``/``InvalidArgument`` types; anything else (OOM, bad input)
+    is a real error and must not switch batching off.
+    """
+    from_backend = isinstance(exc, RuntimeError) or type(exc).__module__.startswith('onnxruntime')
+    message = str(exc).lower()
+    return from_backend and any(marker in message for marker in _SHAPE_ERROR_MARKERS)
+
 
 def _setup_paths() -> None:
     """Add STylish-TTS-Pl source directories to sys.path for model imports."""
@@ -59,42 +147,223 @@ def _setup_espeak() -> None:
 class StylishTTS:
     """Wrapper around STylish-TTS-Pl for single-call synthesis."""
 
-    def __init__(self, device: Optional[str] = None) -> None:
+    _shared: Dict[tuple, 'StylishTTS'] = {}
+    _shared_lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, device: Optional[str] = None, backend: str = 'eager', quantize: bool = False) -> 'StylishTTS':
+        """Return the process-wide instance for these settings, loading it on first use."""
+        key = (device or '', backend, quantize)
+        with cls._shared_lock:
+            instance = cls._shared.get(key)
+            if instance is None:
+                instance = cls(device=device, backend=backend, quantize=quantize)
+                cls._shared[key] = instance
+            return instance
+
+    def __init__(self, device: Optional[str] = None, backend: str = 'eager', quantize: bool = False) -> None:
         _setup_espeak()
         _setup_paths()
 
+        if backend not in STYLISH_BACKENDS:
+            raise ValueError(f"Unknown STylish backend: {backend!r} (expected one of {STYLISH_BACKENDS})")
         self.device: str = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+        # Exported graphs are traced/run on CPU
+        self.backend: str = backend if self.device == 'cpu' else 'eager'
+        # Dynamic INT8 kernels are CPU-only and apply to the eager model
+        self.quantize: bool = quantize and self.device == 'cpu' and self.backend == 'eager'
+        # Cleared when the exported model turns out not to support batch > 1
+        self._batching: bool = True
+        self._model = None
         self._load_model()
 
     def _load_model(self) -> None:
-        """Build model, load checkpoint shards, init phonemizer."""
+        """Load the symbol table, phonemizer and the model for the selected backend."""
         from config_loader import load_model_config_yaml
-        from models.models import build_model
-        from models.export_model import ExportModel
         from text_utils import TextCleaner
 
         console.print("Ładowanie STylish-TTS-Pl...", style='blue_bold')
 
-        model_config = load_model_config_yaml(STYLISH_TTS_CONFIG_PATH)
-        self._text_cleaner = TextCleaner(model_config.symbol)
+        self._model_config = load_model_config_yaml(STYLISH_TTS_CONFIG_PATH)
+        self._text_cleaner = TextCleaner(self._model_config.symbol)
+        self._phonemizer = StylishPhonemizer()
+
+        if self.backend != 'eager':
+            try:
+                self._infer = self._load_graph()
+            except Exception as exc:
+                # Missing runtime, an op the exporter can't handle or an unreadable graph file
+                console.print(
+                    f"STylish-TTS-Pl: backend {self.backend} niedostępny "
+                    f"({type(exc).__name__}: {exc}) — używam eager.",
+                    style='yellow_bold')
+                self.backend = 'eager'
+        if self.backend == 'eager':
+            if self.quantize:
+                self._load_quantized_model()
+            else:
+                self._build_eager_model()
+            self._infer = self._infer_eager
+
+        console.print("STylish-TTS-Pl załadowany.", style='green_bold')
 
-        model_dict = build_model(model_config)
+    def _build_eager_model(self, load_weights: bool = True) -> None:
+        """Build ExportModel and load weights (exported file or checkpoint shards).
 
-        for idx, key in enumerate(model_dict.keys()):
-            ckpt_name = 'pytorch_model.bin' if idx == 0 else f'pytorch_model_{idx}.bin'
-            ckpt_path = path.join(STYLISH_TTS_CHECKPOINT_DIR, ckpt_name)
-            state_dict = torch.load(ckpt_path, map_location=self.device, weights_only=True)
-            model_dict[key].load_state_dict(state_dict)
-            model_dict[key].to(self.device).eval()
+        Args:
+            load_weights: False builds only the module skeleton (weights are
+                filled in by the caller, e.g. from the INT8 cache).
+        """
+        from models.models import build_model
+        from models.export_model import ExportModel
+        from safetensors.torch import load_model, save_model
+
+        model_dict = build_model(self._model_config)
+        shard_paths = [
+            path.join(STYLISH_TTS_CHECKPOINT_DIR,
+                      'pytorch_model.bin' if idx == 0 else f'pytorch_model_{idx}.bin')
+            for idx in range(len(model_dict))
+        ]
+
+        exported = not load_weights or (
+            path.isfile(STYLISH_TTS_EXPORT_PATH)
+            and path.getmtime(STYLISH_TTS_EXPORT_PATH) >= max(path.getmtime(p) for p in shard_paths)
+        )
+        if not exported:
+            for key, ckpt_path in zip(model_dict.keys(), shard_paths):
+                state_dict = torch.load(ckpt_path, map_location=self.device, weights_only=True)
+                model_dict[key].load_state_dict(state_dict)
 
+        for module in model_dict.values():
+            module.to(self.device).eval()
         self._model = ExportModel(**model_dict, device=self.device).eval()
 
-        import phonemizer
-        self._phonemizer = phonemizer.backend.EspeakBackend(
-            language='pl', preserve_punctuation=True, with_stress=True,
-        )
+        if not load_weights:
+            return
+        if exported:
+            # safetensors maps the file and copies tensors straight into the parameters
+            load_model(self._model, STYLISH_TTS_EXPORT_PATH, device=self.device)
+        else:
+            console.print("Eksport STylish-TTS-Pl do safetensors (jednorazowo)...", style='blue_bold')
+            tmp = f'{STYLISH_TTS_EXPORT_PATH}.{os.getpid()}.tmp'
+            save_model(self._model, tmp)
+            os.replace(tmp, STYLISH_TTS_EXPORT_PATH)
+
+    def _load_quantized_model(self) -> None:
+        """Build the dynamic INT8 model, reusing cached quantized weights when fresh."""
+        from torch.ao.quantization import quantize_dynamic
+
+        fresh = (path.isfile(STYLISH_TTS_INT8_PATH)
+                 and path.isfile(STYLISH_TTS_EXPORT_PATH)
+                 and path.getmtime(STYLISH_TTS_INT8_PATH) >= path.getmtime(STYLISH_TTS_EXPORT_PATH))
+        if fresh:
+            try:
+                self._build_eager_model(load_weights=False)
+                self._model = quantize_dynamic(self._model, _QUANTIZED_LAYERS, dtype=torch.qint8)
+                self._model.load_state_dict(
+                    torch.load(STYLISH_TTS_INT8_PATH, map_location='cpu', weights_only=True))
+                return
+            except Exception as exc:
+                console.print(
+                    f"STylish-TTS-Pl: cache INT8 nieaktualny ({exc}) — kwantyzuję ponownie.",
+                    style='yellow_bold')
+
+        console.print("Kwantyzacja STylish-TTS-Pl do INT8 (jednorazowo)...", style='blue_bold')
+        self._build_eager_model()
+        self._model = quantize_dynamic(self._model, _QUANTIZED_LAYERS, dtype=torch.qint8)
+        tmp = f'{STYLISH_TTS_INT8_PATH}.{os.getpid()}.tmp'
+        torch.save(self._model.state_dict(), tmp)
+        os.replace(tmp, STYLISH_TTS_INT8_PATH)
+
+    def _load_graph(self) -> Callable[[torch.Tensor, torch.Tensor], np.ndarray]:
+        """Load the ONNX / TorchScript graph, exporting it first when missing or stale."""
+        if self.backend == 'onnx' and importlib.util.find_spec('onnxruntime') is None:
+            # Fail before a possibly long export
+            raise ImportError("No module named 'onnxruntime'")
+        graph_path = _GRAPH_PATHS[self.backend]
+        stale = (not path.isfile(graph_path)
+                 or not path.isfile(STYLISH_TTS_EXPORT_PATH)
+                 or path.getmtime(graph_path) < path.getmtime(STYLISH_TTS_EXPORT_PATH))
+        if stale:
+            self.export(self.backend)
+            self._model = None  # only needed for the export
+
+        try:
+            return self._open_graph(graph_path)
+        except Exception:
+            # Re-exported on the next run instead of failing again
+            with contextlib.suppress(OSError):
+                os.remove(graph_path)
+            raise
+
+    def _open_graph(self, graph_path: str) -> Callable[[torch.Tensor, torch.Tensor], np.ndarray]:
+        """Open an exported graph file with the runtime of the selected backend."""
+        if self.backend == 'torchscript':
+            graph = torch.jit.load(graph_path, map_location='cpu').eval()
+
+            def infer_torchscript(texts: torch.Tensor, text_lengths: torch.Tensor) -> np.ndarray:
+                with torch.no_grad():
+                    return graph(texts, text_lengths).numpy()
+            return infer_torchscript
+
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = torch.get_num_threads()
+        session = onnxruntime.InferenceSession(
+            graph_path, sess_options=options, providers=['CPUExecutionProvider'])
+
+        def infer_onnx(texts: torch.Tensor, text_lengths: torch.Tensor) -> np.ndarray:
+            return session.run(None, {'texts': texts.numpy(), 'text_lengths': text_lengths.numpy()})[0]
+        return infer_onnx
+
+    def export(self, backend: str) -> str:
+        """Export the eager model as an ONNX or TorchScript graph.
+
+        Batch size and sequence length stay dynamic. The eager model is
+        loaded first when this instance runs another backend.
 
-        console.print("STylish-TTS-Pl załadowany.", style='green_bold')
+        Args:
+            backend: 'onnx' or 'torchscript'.
+
+        Returns:
+            Path of the written graph file.
+        """
+        if self._model is None:
+            self._build_eager_model()
+        graph_path = _GRAPH_PATHS[backend]
+        texts, text_lengths = self._pad([self._phoneme_ids([_EXPORT_SAMPLE_TEXT])[0]])
+        texts, text_lengths = texts.to(self.device), text_lengths.to(self.device)
+        tmp = f'{graph_path}.{os.getpid()}.tmp'
+
+        console.print(f"Eksport STylish-TTS-Pl do {backend}...", style='blue_bold')
+        try:
+            self._export_graph(backend, texts, text_lengths, tmp)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+        os.replace(tmp, graph_path)
+        return graph_path
+
+    def _export_graph(self, backend: str, texts: torch.Tensor, text_lengths: torch.Tensor, target: str) -> None:
+        """Write the eager model as an ONNX or TorchScript graph to *target*."""
+        with torch.no_grad():
+            if backend == 'onnx':
+                sample = self._model(texts, text_lengths)
+                torch.onnx.export(
+                    self._model, (texts, text_lengths), target,
+                    input_names=['texts', 'text_lengths'],
+                    output_names=['audio'],
+                    dynamic_axes={
+                        'texts': {0: 'batch', 1: 'tokens'},
+                        'text_lengths': {0: 'batch'},
+                        'audio': {axis: f'audio_{axis}' for axis in range(sample.dim())},
+                    },
+                    opset_version=17,
+                    dynamo=False,
+                )
+            else:
+                torch.jit.script(self._model).save(target)
 
     def synthesize(self, text: str, speed: float = 1.0) -> np.ndarray:
         """Synthesize Polish text to int16 audio at 24 kHz.
@@ -110,44 +379,11 @@ class StylishTTS:
         if not text:
             return np.array([], dtype=np.int16)
 
-        phonemes_list = self._phonemizer.phonemize([text])
-        if not phonemes_list or not phonemes_list[0]:
-            return np.array([], dtype=np.int16)
-
-        phoneme_ids = self._text_cleaner(phonemes_list[0])
+        phoneme_ids = self._phoneme_ids([text])[0]
         if not phoneme_ids:
             return np.array([], dtype=np.int16)
 
-        tokens = torch.tensor(phoneme_ids).unsqueeze(0).to(self.device)
-        texts = torch.zeros([1, tokens.shape[1] + 2], dtype=torch.long, device=self.device)
-        texts[0, 1:tokens.shape[1] + 1] = tokens
-        text_lengths = torch.tensor([tokens.shape[1] + 2], device=self.device)
-
-        with torch.no_grad():
-            outputs = self._model(texts, text_lengths)
-
-        if outputs.numel() == 0:
-            return np.array([], dtype=np.int16)
-
-        audio = torch.tanh(outputs).cpu().numpy().squeeze()
-
-        if audio.ndim == 0:
-            audio = np.array([audio.item()])
-        elif audio.ndim > 1:
-            audio = audio.flatten()
-
-        if audio.size == 0:
-            return np.array([], dtype=np.int16)
-
-        audio_int16: np.ndarray = (audio * 32767).astype(np.int16)
-
-        if speed != 1.0 and 0.5 <= speed <= 2.0:
-            import librosa
-            audio_float = audio_int16.astype(np.float32) / 32768.0
-            audio_float = librosa.effects.time_stretch(audio_float, rate=speed)
-            audio_int16 = (audio_float * 32767).astype(np.int16)
-
-        return audio_int16
+        return self._finish(self._forward([phoneme_ids])[0], speed)
 
     def synthesize_long(self, text: str, speed: float = 1.0, max_chunk: int = 120) -> np.ndarray:
         """Synthesize longer text by splitting into sentence chunks.
@@ -160,57 +396,198 @@ class StylishTTS:
         Returns:
             1-D numpy int16 array of concatenated audio at 24 kHz.
         """
-        chunks = self._split_text(text, max_chunk)
+        return self.synthesize_batch([text], speed, max_chunk)[0]
+
+    def synthesize_batch(
+        self,
+        texts: Sequence[str],
+        speed: float = 1.0,
+        max_chunk: int = 120,
+        batch_size: int = STYLISH_BATCH_SIZE,
+    ) -> List[np.ndarray]:
+        """Synthesize many texts with batched forward passes.
+
+        Every text is split into sentence chunks (as in ``synthesize_long``),
+        all chunks are phonemized in one call, sorted by phoneme count and
+        grouped into length buckets of up to *batch_size* so padding stays
+        small. Outputs are split back per chunk and reassembled per text.
+
+        Args:
+            texts: Polish texts, e.g. one per subtitle.
+            speed: Playback speed multiplier (0.5–2.0).
+            max_chunk: Max characters per chunk.
+            batch_size: Max chunks per forward pass.
+
+        Returns:
+            One 1-D int16 array at 24 kHz per input text (empty if silent).
+        """
+        owners: List[int] = []
+        chunks: List[str] = []
+        for text_idx, text in enumerate(texts):
+            for chunk in self._split_text(text.replace('"', ''), max_chunk):
+                owners.append(text_idx)
+                chunks.append(chunk)
+
+        phoneme_ids = self._phoneme_ids(chunks)
+        order = sorted((i for i, ids in enumerate(phoneme_ids) if ids), key=lambda i: len(phoneme_ids[i]))
+
+        chunk_audio: Dict[int, np.ndarray] = {}
+        for bucket in self._buckets(order, phoneme_ids, batch_size):
+            for chunk_idx, audio in zip(bucket, self._forward([phoneme_ids[i] for i in bucket])):
+                chunk_audio[chunk_idx] = audio
+
+        per_text: List[List[np.ndarray]] = [[] for _ in texts]
+        for chunk_idx, text_idx in enumerate(owners):
+            audio = chunk_audio.get(chunk_idx)
+            if audio is not None and audio.size > 0:
+                per_text[text_idx].append(audio)
+
+        silence = np.zeros(_CHUNK_SILENCE_SAMPLES, dtype=np.float32)
+        results: List[np.ndarray] = []
+        for segments in per_text:
+            if not segments:
+                results.append(np.array([], dtype=np.int16))
+                continue
+            joined: List[np.ndarray] = []
+            for i, segment in enumerate(segments):
+                if i:
+                    joined.append(silence)
+                joined.append(segment)
+            results.append(self._finish(np.concatenate(joined), speed))
+        return results
+
+    def prefetch_phonemes(self, texts: Iterable[str], max_chunk: int = 120) -> None:
+        """Phonemize all chunks of *texts* up front in a single espeak call.
+
+        Call once per subtitle file; later ``synthesize*`` calls are then
+        served from the phoneme cache. New entries are saved to disk.
+
+        Args:
+            texts: Texts that will be synthesized, e.g. every subtitle.
+            max_chunk: Max characters per chunk (as passed to synthesis).
+        """
+        self._phonemizer.prefetch(texts, max_chunk)
+
+    # ------------------------------------------------------------------
+    # Internal utilities
+    # ------------------------------------------------------------------
+
+    def _phoneme_ids(self, chunks: Sequence[str]) -> List[List[int]]:
+        """Phonemize *chunks* (cached, bulk) and map them to symbol ids."""
         if not chunks:
-            return np.array([], dtype=np.int16)
+            return []
+        return [self._text_cleaner(phonemes) if phonemes else []
+                for phonemes in self._phonemizer.phonemize(chunks)]
+
+    @staticmethod
+    def _buckets(order: List[int], phoneme_ids: List[List[int]], batch_size: int) -> List[List[int]]:
+        """Group length-sorted chunk indices into batches of similar length."""
+        buckets: List[List[int]] = []
+        current: List[int] = []
+        for idx in order:
+            if current and (len(current) >= batch_size
+                            or len(phoneme_ids[idx]) > _BUCKET_RATIO * len(phoneme_ids[current[0]])):
+                buckets.append(current)
+                current = []
+            current.append(idx)
+        if current:
+            buckets.append(current)
+        return buckets
+
+    def _forward(self, batch: List[List[int]]) -> List[np.ndarray]:
+        """Run the model on a padded batch; returns float audio per item.
+
+        Falls back to one call per item when the exported model does not
+        return one output row per input (remembered for later batches).
+        Every path is trimmed the same way, so a text gives the same clip
+        whatever batch it lands in.
+        """
+        if len(batch) > 1 and self._batching:
+            try:
+                outputs = self._run_model(batch)
+            except Exception as exc:
+                if not _is_shape_error(exc):
+                    raise
+                reason = f"{type(exc).__name__}: {exc}"
+            else:
+                if outputs.shape[0] == len(batch):
+                    return [self._trim(row) for row in outputs.reshape(len(batch), -1)]
+                reason = f"{outputs.shape[0]} wyników dla {len(batch)} tekstów"
+            console.print(
+                f"STylish-TTS-Pl: model nie obsługuje batchy ({reason}) — synteza pojedyncza.",
+                style='yellow_bold')
+            self._batching = False
+        return [self._trim(self._run_model([ids]).reshape(-1)) for ids in batch]
+
+    @staticmethod
+    def _pad(batch: List[List[int]]) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Pad phoneme ids into the ``texts``/``text_lengths`` model inputs."""
+        lengths: List[int] = [len(ids) + 2 for ids in batch]
+        texts = torch.zeros([len(batch), max(lengths)], dtype=torch.long)
+        for row, ids in enumerate(batch):
+            texts[row, 1:len(ids) + 1] = torch.tensor(ids)
+        return texts, torch.tensor(lengths)
+
+    def _infer_eager(self, texts: torch.Tensor, text_lengths: torch.Tensor) -> np.ndarray:
+        """Run the eager ExportModel; returns raw outputs on the CPU."""
+        with torch.no_grad():
+            return self._model(texts.to(self.device), text_lengths.to(self.device)).cpu().numpy()
+
+    def _run_model(self, batch: List[List[int]]) -> np.ndarray:
+        """Run the selected backend on a padded batch; returns tanh-limited audio."""
+        texts, text_lengths = self._pad(batch)
+        outputs = self._infer(texts, text_lengths)
 
-        segments: List[np.ndarray] = []
-        silence = np.zeros(int(STYLISH_SAMPLE_RATE * 0.05), dtype=np.int16)
+        if outputs.size == 0:
+            return np.zeros((len(batch), 0), dtype=np.float32)
+        return np.tanh(outputs)
 
-        for i, chunk in enumerate(chunks):
-            audio = self.synthesize(chunk, speed)
-            if len(audio) > 0:
-                segments.append(audio)
-                if i < len(chunks) - 1:
-                    segments.append(silence)
+    @staticmethod
+    def _trim(audio: np.ndarray) -> np.ndarray:
+        """Cut the batch padding (or trailing silence) after the last audible sample."""
+        loud = np.flatnonzero(np.abs(audio) > _TRIM_THRESHOLD)
+        if loud.size == 0:
+            return audio[:0]
+        return audio[:min(audio.size, int(loud[-1]) + 1 + _TRIM_TAIL_SAMPLES)]
 
-        if not segments:
+    @staticmethod
+    def _finish(audio: np.ndarray, speed: float) -> np.ndarray:
+        """Convert float audio to int16 and apply the model speed setting."""
+        if audio.size == 0:
             return np.array([], dtype=np.int16)
 
-        return np.concatenate(segments)
+        audio_int16: np.ndarray = (audio * 32767).astype(np.int16)
+
+        if speed != 1.0 and 0.5 <= speed <= 2.0:
+            import librosa
+            audio_float = audio_int16.astype(np.float32) / 32768.0
+            audio_float = librosa.effects.time_stretch(audio_float, rate=speed)
+            audio_int16 = (audio_float * 32767).astype(np.int16)
+
+        return audio_int16
 
     @staticmethod
     def _split_text(text: str, max_length: int = 120) -> List[str]:
-        """Split text on sentence boundaries."""
-        sentences: List[str] = []
-        current = ''
-        for char in text:
-            current += char
-            if char in '.?!;':
-                if current.strip():
-                    sentences.append(current.strip())
-                current = ''
-        if current.strip():
-            sentences.append(current.strip())
-
+        """Split text on sentence boundaries, then long sentences on words (linear time)."""
         result: List[str] = []
-        for sentence in sentences:
+        for match in _SENTENCE_RE.finditer(text):
+            sentence = match.group().strip()
+            if not sentence:
+                continue
             if len(sentence) <= max_length:
                 result.append(sentence)
-            else:
-                words = sentence.split()
-                chunk = ''
-                for word in words:
-                    if len(chunk + ' ' + word) <= max_length:
-                        chunk += ' ' + word if chunk else word
-                    else:
-                        if chunk:
-                            result.append(chunk)
-                        chunk = word
-                if chunk:
-                    result.append(chunk)
-
-        return [s for s in result if s.strip()]
+                continue
+            words: List[str] = []
+            length = 0
+            for word in sentence.split():
+                if words and length + 1 + len(word) > max_length:
+                    result.append(' '.join(words))
+                    words, length = [], 0
+                length += len(word) + (1 if words else 0)
+                words.append(word)
+            if words:
+                result.append(' '.join(words))
+        return result
 
     def save_wav(self, audio: np.ndarray, output_path: str) -> None:
         """Save int16 audio array to a mono WAV file at 24 kHz."""
@@ -219,3 +596,141 @@ class StylishTTS:
             wf.setsampwidth(2)
             wf.setframerate(STYLISH_SAMPLE_RATE)
             wf.writeframes(audio.tobytes())
+
+
+class StylishPhonemizer:
+    """espeak-ng phonemizer with bulk calls and the on-disk phoneme cache.
+
+    Usable without the model, e.g. to prefetch a subtitle file in the
+    parent process before worker processes start.
+
+    Attributes:
+        cache: Phoneme cache for the espeak settings in use.
+    """
+
+    def __init__(self) -> None:
+        _setup_espeak()
+        import phonemizer
+
+        self._backend = phonemizer.backend.EspeakBackend(
+            language=_ESPEAK_LANGUAGE, **_ESPEAK_OPTIONS,
+        )
+        # espeak-ng keeps global state — serialize phonemizer calls across threads
+        self._lock: threading.Lock = threading.Lock()
+        try:
+            espeak_version = '.'.join(map(str, phonemizer.backend.EspeakBackend.version()))
+        except Exception:
+            espeak_version = 'unknown'
+        self.cache: PhonemeCache = PhonemeCache(
+            settings_key=json.dumps(
+                {'language': _ESPEAK_LANGUAGE, 'espeak': espeak_version, **_ESPEAK_OPTIONS},
+                sort_keys=True),
+        )
+
+    def phonemize(self, chunks: Sequence[str]) -> List[str]:
+        """Return phonemes of *chunks*; cache misses go to espeak in one call."""
+        # Answer from a local copy: the size bound may evict this call's hits on update
+        known = self.cache.lookup(chunks)
+        missing = [chunk for chunk in dict.fromkeys(chunks) if chunk not in known]
+        if missing:
+            with self._lock:
+                phonemes_list = self._backend.phonemize(missing)
+            fresh = dict(zip(missing, phonemes_list))
+            known.update(fresh)
+            self.cache.update(fresh.items())
+        return [known[chunk] for chunk in chunks]
+
+    def prefetch(self, texts: Iterable[str], max_chunk: int = 120) -> None:
+        """Phonemize all sentence chunks of *texts* at once and save the cache."""
+        chunks = [chunk for text in texts
+                  for chunk in StylishTTS._split_text(text.replace('"', ''), max_chunk)]
+        self.phonemize(chunks)
+        self.cache.save()
+
+
+class PhonemeCache:
+    """On-disk JSON memo of espeak-ng phonemizations.
+
+    Entries are grouped by *settings_key* (language, espeak version and
+    options), so changing any of them never serves stale phonemes.
+    Thread-safe; the file is rewritten atomically by ``save``.
+
+    Attributes:
+        cache_path: JSON file holding ``{settings_key: {text: phonemes}}``.
+        settings_key: Key of the espeak settings in use.
+    """
+
+    def __init__(self, settings_key: str, cache_path: str = PHONEME_CACHE_PATH) -> None:
+        self.cache_path: str = cache_path
+        self.settings_key: str = settings_key
+        self._lock: threading.Lock = threading.Lock()
+        self._dirty: bool = False
+        self._mtime: float = 0.0
+        self._all: Dict[str, Dict[str, str]] = self._read()
+        self._entries: Dict[str, str] = self._all.setdefault(settings_key, {})
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._entries
+
+    def get(self, text: str) -> str:
+        """Return cached phonemes of *text* ('' on a miss)."""
+        return self._entries.get(text, '')
+
+    def lookup(self, texts: Iterable[str]) -> Dict[str, str]:
+        """Return ``{text: phonemes}`` for the cached subset of *texts*."""
+        with self._lock:
+            return {text: self._entries[text] for text in texts if text in self._entries}
+
+    def update(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Add ``(text, phonemes)`` pairs, dropping the oldest above the size bound."""
+        with self._lock:
+            self._entries.update(items)
+            overflow = len(self._entries) - PHONEME_CACHE_MAX_ENTRIES
+            if overflow > 0:
+                for text in list(self._entries)[:overflow]:
+                    del self._entries[text]
+            self._dirty = True
+
+    def reload_if_changed(self) -> None:
+        """Merge in entries saved by another process since the last read."""
+        try:
+            mtime = path.getmtime(self.cache_path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        fresh = self._read().get(self.settings_key, {})
+        with self._lock:
+            for text, phonemes in fresh.items():
+                self._entries.setdefault(text, phonemes)
+
+    def save(self) -> None:
+        """Write the cache to disk if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(path.dirname(self.cache_path), exist_ok=True)
+            tmp = f'{self.cache_path}.{os.getpid()}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as file:
+                json.dump(self._all, file, ensure_ascii=False)
+            os.replace(tmp, self.cache_path)
+            self._mtime = path.getmtime(self.cache_path)
+            self._dirty = False
+
+    def _read(self) -> Dict[str, Dict[str, str]]:
+        """Load the JSON file (empty on a missing or corrupt file)."""
+        try:
+            self._mtime = path.getmtime(self.cache_path)
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+
+if __name__ == '__main__':
+    # python -m modules.tts_stylish onnx|torchscript
+    if len(sys.argv) != 2 or sys.argv[1] not in _GRAPH_PATHS:
+        console.print('Użycie: python -m modules.tts_stylish onnx|torchscript', style='red_bold')
+        sys.exit(1)
+    exported_path = StylishTTS(device='cpu').export(sys.argv[1])
+    console.print(f'Zapisano: {exported_path}', style='green_bold')
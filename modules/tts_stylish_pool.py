@@ -0,0 +1,141 @@
+"""Multi-process CPU inference pool for STylish-TTS-Pl.
+
+One ``StylishTTS`` instance with default torch threading leaves most cores
+of a big CPU box idle during phonemization, stretching and the Python
+glue between forward passes. The pool starts K worker processes, each
+holding its own model replica limited to a slice of the cores
+(``torch.set_num_threads`` plus CPU affinity where the OS supports it).
+
+The pool exposes the same ``synthesize_batch`` call as ``StylishTTS``;
+driven by ``SynthesisScheduler`` with ``concurrency=K`` the subtitle
+windows are spread across the workers and come back in order.
+
+Usage::
+
+    from modules.tts_stylish_pool import StylishWorkerPool
+
+    pool = StylishWorkerPool.shared(workers=4)
+    clips = pool.synthesize_batch(["Tak.", "Co się stało?"], speed=1.0)
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from constants import console
+
+# ---------------------------------------------------------------------------
+# Worker process state
+# ---------------------------------------------------------------------------
+
+_worker_tts = None  # StylishTTS replica of the current worker process
+
+
+def _init_worker(threads: int, device: str, backend: str, quantize: bool,
+                 counter: 'multiprocessing.sharedctypes.Synchronized') -> None:
+    """Pin the worker to its slice of cores and load the model replica."""
+    global _worker_tts
+    import torch
+
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+
+    if hasattr(os, 'sched_setaffinity'):
+        cpus = sorted(os.sched_getaffinity(0))
+        cores = set(cpus[index * threads:(index + 1) * threads])
+        if cores:
+            os.sched_setaffinity(0, cores)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already set by an earlier parallel region
+
+    from modules.tts_stylish import StylishTTS
+    _worker_tts = StylishTTS(device=device, backend=backend, quantize=quantize)
+
+
+def _worker_synthesize_batch(texts: List[str], speed: float) -> List[np.ndarray]:
+    """Synthesize one window of texts in the worker process."""
+    _worker_tts._phonemizer.cache.reload_if_changed()
+    return _worker_tts.synthesize_batch(texts, speed)
+
+
+class StylishWorkerPool:
+    """K processes, each with a STylish-TTS-Pl replica on a slice of the cores.
+
+    Thread-safe: several scheduler threads may call ``synthesize_batch`` at
+    once; each call occupies one worker.
+
+    Attributes:
+        workers: Number of worker processes.
+        threads_per_worker: Torch intra-op threads of every worker.
+        device: Torch device of the replicas (normally 'cpu').
+        backend: Inference backend of the replicas ('eager', 'onnx', 'torchscript').
+        quantize: Dynamic INT8 replicas (eager backend on CPU).
+    """
+
+    _shared: Dict[tuple, 'StylishWorkerPool'] = {}
+    _shared_lock: threading.Lock = threading.Lock()
+
+    def __init__(
+        self,
+        workers: int,
+        device: str = 'cpu',
+        backend: str = 'eager',
+        quantize: bool = False,
+        threads_per_worker: Optional[int] = None,
+    ) -> None:
+        self.workers: int = max(1, int(workers))
+        self.device: str = device
+        self.backend: str = backend
+        self.quantize: bool = quantize
+        self.threads_per_worker: int = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+
+        console.print(
+            f"STylish-TTS-Pl: uruchamiam {self.workers} procesów "
+            f"po {self.threads_per_worker} wątków...",
+            style='blue_bold',
+        )
+        context = multiprocessing.get_context('spawn')
+        self._executor: ProcessPoolExecutor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker, device, backend, quantize, context.Value('i', 0)),
+        )
+
+    @classmethod
+    def shared(cls, workers: int, device: str = 'cpu', backend: str = 'eager',
+               quantize: bool = False) -> 'StylishWorkerPool':
+        """Return the process-wide pool for these settings, starting it on first use."""
+        key = (int(workers), device, backend, quantize)
+        with cls._shared_lock:
+            pool = cls._shared.get(key)
+            if pool is None:
+                pool = cls(workers, device, backend, quantize)
+                cls._shared[key] = pool
+            return pool
+
+    def synthesize_batch(self, texts: Sequence[str], speed: float = 1.0) -> List[np.ndarray]:
+        """Synthesize *texts* on one worker; see ``StylishTTS.synthesize_batch``."""
+        return self._executor.submit(_worker_synthesize_batch, list(texts), speed).result()
+
+    def synthesize(self, text: str, speed: float = 1.0) -> np.ndarray:
+        """Synthesize a single text on one worker."""
+        return self.synthesize_batch([text], speed)[0]
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> 'StylishWorkerPool':
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,298 @@
+"""
+Resident local inference server for STylish-TTS-Pl with dynamic batching.
+
+Every ``SubtitleToSpeech`` run otherwise loads its own model, and parallel
+episode jobs cannot share a forward pass. The server loads ``StylishTTS``
+once and serves any number of client processes over local HTTP. Requests
+that arrive within a short batching window (``BATCH_WINDOW_S``) are merged
+into one ``synthesize_batch`` call, which sorts the chunks of all files by
+phoneme length and runs them in length buckets — one warm model stays
+saturated instead of paying the load cost per file.
+
+Endpoints:
+    GET  /health    -> {"status": "ok", "backend": ..., "quantize": ...}
+    POST /prefetch  {"texts": [...]} -> phonemize up front, save the cache
+    POST /tts_batch {"texts": [...], "speed": 1.0} -> packed int16 clips
+
+Usage:
+    python -m modules.tts_stylish_server [port] [eager|onnx|torchscript] [int8]
+
+    from modules.tts_stylish_server import StylishServerClient
+
+    client = StylishServerClient()
+    clips = client.synthesize_batch(["Tak.", "Co się stało?"], speed=1.0)
+"""
+
+import json
+import queue
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+import numpy as np
+
+from constants import console
+
+# Server defaults
+STYLISH_SERVER_HOST: str = "127.0.0.1"
+STYLISH_SERVER_PORT: int = 8856
+STYLISH_SERVER_URL: str = f"http://{STYLISH_SERVER_HOST}:{STYLISH_SERVER_PORT}"
+STYLISH_REQUEST_TIMEOUT: int = 600  # 10 min — a window may wait behind other files
+
+# How long the batcher waits for more requests after the first one arrives
+BATCH_WINDOW_S: float = 0.02
+
+# Max texts merged into one synthesize_batch call (several subtitle windows)
+MAX_BATCH_TEXTS: int = 128
+
+# Response layout: uint32 count, count x uint32 clip lengths, int16 samples
+_HEADER = struct.Struct("<I")
+
+
+class _Pending(NamedTuple):
+    """One text waiting for the next batch."""
+    text: str
+    speed: float
+    future: Future
+
+
+# ---------------------------------------------------------------------------
+# Server side
+# ---------------------------------------------------------------------------
+
+class DynamicBatcher:
+    """Merges concurrent synthesis requests into batched model calls.
+
+    A single thread owns the model: it takes the first waiting text, keeps
+    collecting for ``window`` seconds (or until ``max_texts``), then runs
+    one ``synthesize_batch`` per distinct speed. Identical texts in a batch
+    are synthesized once.
+    """
+
+    def __init__(self, tts, window: float = BATCH_WINDOW_S, max_texts: int = MAX_BATCH_TEXTS) -> None:
+        self.tts = tts
+        self.window: float = window
+        self.max_texts: int = max_texts
+        self._queue: 'queue.Queue[_Pending]' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="stylish-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: Sequence[str], speed: float) -> List[Future]:
+        """Queue *texts*; each future resolves to one int16 clip."""
+        futures: List[Future] = []
+        for text in texts:
+            future: Future = Future()
+            self._queue.put(_Pending(text, speed, future))
+            futures.append(future)
+        return futures
+
+    def _collect(self) -> List[_Pending]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_texts:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            by_speed: Dict[float, List[_Pending]] = {}
+            for item in self._collect():
+                by_speed.setdefault(item.speed, []).append(item)
+            for speed, items in by_speed.items():
+                texts = list(dict.fromkeys(item.text for item in items))
+                try:
+                    clips = dict(zip(texts, self.tts.synthesize_batch(texts, speed=speed)))
+                except Exception as exc:
+                    for item in items:
+                        item.future.set_exception(exc)
+                    continue
+                for item in items:
+                    item.future.set_result(clips[item.text])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP front of the batcher; ``server.batcher`` is set by ``serve``."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        tts = self.server.batcher.tts
+        self._send_json(200, {"status": "ok", "backend": tts.backend, "quantize": tts.quantize})
+
+    def do_POST(self) -> None:
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            texts = [str(text) for text in payload.get("texts", [])]
+            if self.path == "/prefetch":
+                self.server.batcher.tts.prefetch_phonemes(texts)
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/tts_batch":
+                futures = self.server.batcher.submit(texts, float(payload.get("speed", 1.0)))
+                self._send_bytes(_pack_clips([future.result() for future in futures]))
+            else:
+                self._send_json(404, {"error": "not found"})
+        except Exception as exc:
+            self._send_json(500, {"error": str(exc)})
+
+    def _send_json(self, status: int, data: Dict) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_bytes(self, body: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass  # one line per request would drown the console
+
+
+def _pack_clips(clips: Sequence[np.ndarray]) -> bytes:
+    lengths = np.array([len(clip) for clip in clips], dtype="<u4")
+    samples = np.concatenate(clips).astype("<i2") if clips else np.array([], dtype="<i2")
+    return _HEADER.pack(len(clips)) + lengths.tobytes() + samples.tobytes()
+
+
+def _unpack_clips(body: bytes) -> List[np.ndarray]:
+    (count,) = _HEADER.unpack_from(body)
+    lengths = np.frombuffer(body, dtype="<u4", count=count, offset=_HEADER.size)
+    if not count:
+        return []
+    samples = np.frombuffer(body, dtype="<i2", offset=_HEADER.size + 4 * count)
+    return [clip.astype(np.int16) for clip in np.split(samples, np.cumsum(lengths)[:-1])]
+
+
+def serve(
+    host: str = STYLISH_SERVER_HOST,
+    port: int = STYLISH_SERVER_PORT,
+    backend: str = "eager",
+    quantize: bool = False,
+) -> None:
+    """Load the model once and serve requests until interrupted."""
+    from modules.tts_stylish import StylishTTS
+
+    tts = StylishTTS(device="cpu", backend=backend, quantize=quantize)
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.batcher = DynamicBatcher(tts)
+    console.print(f"Serwer STylish-TTS-Pl nasłuchuje na http://{host}:{port}", style="green_bold")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        tts._phonemizer.cache.save()
+
+
+# ---------------------------------------------------------------------------
+# Client side
+# ---------------------------------------------------------------------------
+
+class StylishServerClient:
+    """HTTP client for the resident STylish-TTS-Pl server.
+
+    Exposes the same ``synthesize_batch`` / ``synthesize`` /
+    ``prefetch_phonemes`` calls as ``StylishTTS``, so it can be handed to
+    ``SynthesisScheduler`` in its place.
+
+    Attributes:
+        base_url: Server address.
+        backend: Inference backend reported by the server.
+        quantize: Whether the server runs the INT8 model.
+    """
+
+    def __init__(self, base_url: str = STYLISH_SERVER_URL) -> None:
+        self.base_url: str = base_url.rstrip("/")
+        self.backend: str = "eager"
+        self.quantize: bool = False
+        self._check_server()
+
+    def _check_server(self) -> None:
+        """Verify the STylish server is reachable."""
+        try:
+            with urlopen(Request(f"{self.base_url}/health"), timeout=5) as resp:
+                data = json.loads(resp.read())
+            if data.get("status") != "ok":
+                console.print(f"STylish server health check: {data}", style="red_bold")
+            self.backend = data.get("backend", self.backend)
+            self.quantize = bool(data.get("quantize", False))
+        except (URLError, OSError) as exc:
+            raise ConnectionError(
+                f"Nie można połączyć z serwerem STylish-TTS-Pl ({self.base_url}). "
+                f"Uruchom: python -m modules.tts_stylish_server\n{exc}"
+            ) from exc
+
+    def _post(self, endpoint: str, payload: Dict) -> bytes:
+        req = Request(
+            f"{self.base_url}{endpoint}",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urlopen(req, timeout=STYLISH_REQUEST_TIMEOUT) as resp:
+                return resp.read()
+        except HTTPError as exc:
+            error_body = exc.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"STylish server error {exc.code}: {error_body}") from exc
+
+    def synthesize_batch(self, texts: Sequence[str], speed: float = 1.0) -> List[np.ndarray]:
+        """Synthesize *texts* on the server; one int16 clip at 24 kHz per text."""
+        if not texts:
+            return []
+        return _unpack_clips(self._post("/tts_batch", {"texts": list(texts), "speed": speed}))
+
+    def synthesize(self, text: str, speed: float = 1.0) -> np.ndarray:
+        """Synthesize a single text on the server."""
+        return self.synthesize_batch([text], speed)[0]
+
+    def prefetch_phonemes(self, texts: Iterable[str]) -> None:
+        """Let the server phonemize a whole subtitle file in one espeak call."""
+        self._post("/prefetch", {"texts": list(texts)})
+
+
+def _parse_args(argv: List[str]) -> Tuple[int, str, bool]:
+    port, backend, quantize = STYLISH_SERVER_PORT, "eager", False
+    for arg in argv:
+        if arg.isdigit():
+            port = int(arg)
+        elif arg == "int8":
+            quantize = True
+        else:
+            backend = arg
+    return port, backend, quantize
+
+
+if __name__ == "__main__":
+    # python -m modules.tts_stylish_server [port] [eager|onnx|torchscript] [int8]
+    from modules.tts_stylish import STYLISH_BACKENDS
+
+    server_port, server_backend, server_quantize = _parse_args(sys.argv[1:])
+    if server_backend not in STYLISH_BACKENDS:
+        console.print(
+            "Użycie: python -m modules.tts_stylish_server [port] [eager|onnx|torchscript] [int8]",
+            style="red_bold")
+        sys.exit(1)
+    serve(port=server_port, backend=server_backend, quantize=server_quantize)
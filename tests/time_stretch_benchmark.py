@@ -0,0 +1,105 @@
+# Benchmark: atempo przez FFmpeg (temp WAV + proces na klip) vs WSOLA w NumPy
+# Uruchom z katalogu głównego projektu: python tests/time_stretch_benchmark.py
+
+# pip install numpy
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.time_stretch import time_stretch, time_stretch_batch  # noqa: E402
+
+SAMPLE_RATE = 44_100
+SPEED = 1.25
+CLIPS = 200
+
+
+def atempo_chain(speed):
+    # Kopia SubtitleToSpeech._build_atempo_chain
+    filters = []
+    remaining = max(0.5, min(speed, 100.0))
+    while remaining > 2.0:
+        filters.append("atempo=2.0")
+        remaining /= 2.0
+    while remaining < 0.5:
+        filters.append("atempo=0.5")
+        remaining /= 0.5
+    filters.append(f"atempo={remaining:.4f}")
+    return filters
+
+
+def ffmpeg_stretch(ffmpeg, audio, speed, tmp_dir):
+    # Ta sama ścieżka co stare _pp_speed_audio: zapis WAV -> ffmpeg -> odczyt
+    tmp_in = os.path.join(tmp_dir, "pp_speed_in.wav")
+    tmp_out = os.path.join(tmp_dir, "pp_speed_out.wav")
+    with wave.open(tmp_in, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(audio.tobytes())
+    subprocess.call([
+        ffmpeg, "-y", "-loglevel", "quiet",
+        "-i", tmp_in, "-af", ",".join(atempo_chain(speed)),
+        "-c:a", "pcm_s16le", tmp_out,
+    ])
+    with wave.open(tmp_out, 'rb') as rf:
+        return np.frombuffer(rf.readframes(rf.getnframes()), dtype=np.int16)
+
+
+def make_clips(count):
+    # Sztuczna "mowa": harmoniczne + obwiednia sylab, długości 0.5-4 s
+    rng = np.random.default_rng(0)
+    clips = []
+    for _ in range(count):
+        n = int(SAMPLE_RATE * rng.uniform(0.5, 4.0))
+        t = np.arange(n) / SAMPLE_RATE
+        f0 = rng.uniform(90, 220)
+        voice = sum(np.sin(2 * np.pi * f0 * h * t) / h for h in range(1, 6))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+        clips.append((voice * envelope * 6000).astype(np.int16))
+    return clips
+
+
+def main():
+    clips = make_clips(CLIPS)
+    audio_seconds = sum(len(c) for c in clips) / SAMPLE_RATE
+    print(f"{CLIPS} klipów, {audio_seconds:.0f} s audio, speed={SPEED}\n")
+
+    t0 = time.perf_counter()
+    single = [time_stretch(c, SPEED, SAMPLE_RATE) for c in clips]
+    t_single = time.perf_counter() - t0
+    print(f"WSOLA (klip po klipie): {t_single:.2f} s")
+
+    t0 = time.perf_counter()
+    batch = time_stretch_batch(clips, SPEED, SAMPLE_RATE)
+    t_batch = time.perf_counter() - t0
+    print(f"WSOLA (batch):          {t_batch:.2f} s")
+
+    assert all(len(a) == len(b) for a, b in zip(single, batch))
+
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        print("\nBrak ffmpeg w PATH — pomijam porównanie z atempo.")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        t0 = time.perf_counter()
+        reference = [ffmpeg_stretch(ffmpeg, c, SPEED, tmp_dir) for c in clips]
+        t_ffmpeg = time.perf_counter() - t0
+    print(f"FFmpeg atempo:          {t_ffmpeg:.2f} s")
+    print(f"\nPrzyspieszenie: x{t_ffmpeg / t_batch:.1f} (batch), x{t_ffmpeg / t_single:.1f} (klip po klipie)")
+
+    drift = max(abs(len(a) - len(b)) for a, b in zip(batch, reference))
+    print(f"Maks. różnica długości vs atempo: {drift} próbek")
+
+
+if __name__ == '__main__':
+    main()
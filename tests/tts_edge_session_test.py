@@ -0,0 +1,213 @@
+# Test puli połączeń Edge TTS (EdgeSession) na lokalnym serwerze udającym protokół Edge
+# Uruchom z katalogu głównego projektu: python tests/tts_edge_session_test.py
+# Nie łączy się z Microsoftem: serwer aiohttp odtwarza ramki speech.config / ssml /
+# turn.start / audio.metadata / audio / turn.end, a "MP3" to po prostu bajty tekstu.
+
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from xml.sax.saxutils import unescape
+
+from aiohttp import WSMsgType, web
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.tts_edge_session import EdgeSession  # noqa: E402
+
+VOICE = "pl-PL-ZofiaNeural"
+LINES = [f"Linia numer {i}, krótka kwestia dialogowa." for i in range(40)]
+HANDSHAKE_DELAY = 0.05   # sztuczne opóźnienie handshake'u serwera (udaje TLS przez ocean)
+WORD_TICKS = 3_000_000   # 0,3 s na słowo w 100-ns tickach, jak w ramkach Edge
+
+
+class StandInEdge:
+    # Minimalny serwer Edge: liczy połączenia i tury, opcjonalnie zrywa połączenie po N turach
+
+    def __init__(self, turns_per_connection=None):
+        self.turns_per_connection = turns_per_connection
+        self.connections = 0
+        self.turns = 0
+
+    async def handler(self, request):
+        await asyncio.sleep(HANDSHAKE_DELAY)
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.connections += 1
+        word_boundary = False
+        turns = 0
+        async for message in websocket:
+            if message.type != WSMsgType.TEXT:
+                continue
+            headers, _, body = message.data.partition('\r\n\r\n')
+            if 'Path:speech.config' in headers:
+                word_boundary = '"wordBoundaryEnabled":"true"' in body
+                continue
+            request_id = re.search(r'X-RequestId:(\w+)', headers).group(1)
+            text = unescape(re.search(r"<prosody[^>]*>(.*)</prosody>", body, re.S).group(1))
+            await self.turn(websocket, request_id, text, word_boundary)
+            self.turns += 1
+            turns += 1
+            if self.turns_per_connection and turns >= self.turns_per_connection:
+                await websocket.close()
+        return websocket
+
+    @staticmethod
+    async def turn(websocket, request_id, text, word_boundary):
+        def text_frame(path, payload):
+            return (f"X-RequestId:{request_id}\r\nContent-Type:application/json; charset=utf-8\r\n"
+                    f"Path:{path}\r\n\r\n{json.dumps(payload)}")
+
+        def audio_frame(data, content_type=True):
+            headers = f"X-RequestId:{request_id}\r\n"
+            headers += "Content-Type:audio/mpeg\r\n" if content_type else ""
+            headers += "Path:audio\r\n"
+            encoded = headers.encode()
+            return len(encoded).to_bytes(2, 'big') + encoded + data
+
+        await websocket.send_str(text_frame('turn.start', {"context": {"serviceTag": "test"}}))
+        await websocket.send_str(text_frame('response', {"context": {"serviceTag": "test"}}))
+        if word_boundary:
+            for n, word in enumerate(text.split()):
+                await websocket.send_str(text_frame('audio.metadata', {"Metadata": [{
+                    "Type": "WordBoundary",
+                    "Data": {"Offset": n * WORD_TICKS, "Duration": WORD_TICKS // 2,
+                             "text": {"Text": word, "Length": len(word), "BoundaryType": "WordBoundary"}}}]}))
+        data = text.encode()
+        for start in range(0, len(data), 1024):
+            await websocket.send_bytes(audio_frame(data[start:start + 1024]))
+        await websocket.send_bytes(audio_frame(b'', content_type=False))
+        await websocket.send_str(text_frame('turn.end', {}))
+
+
+async def start_server(edge):
+    app = web.Application()
+    app.router.add_get('/edge/v1', edge.handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"ws://127.0.0.1:{port}/edge/v1?TrustedClientToken=test"
+
+
+def check(condition, label):
+    print(f"  [{'OK' if condition else 'BŁĄD'}] {label}")
+    return condition
+
+
+async def synthesize_all(session, lines):
+    return await asyncio.gather(*(session.synthesize(line, VOICE) for line in lines))
+
+
+async def test_reuse():
+    print("Ponowne użycie połączeń:")
+    edge = StandInEdge()
+    runner, url = await start_server(edge)
+    try:
+        async with EdgeSession(pool_size=4, url=url) as session:
+            clips = await synthesize_all(session, LINES)
+        ok = check(clips == [line.encode() for line in LINES], "audio każdej linii wraca w całości")
+        ok &= check(edge.connections <= 4, f"{edge.turns} tur przez {edge.connections} połączeń (pula 4)")
+        return ok
+    finally:
+        await runner.cleanup()
+
+
+async def test_word_boundaries_and_long_text():
+    print("Granice słów i długi tekst (kilka tur na jednym połączeniu):")
+    edge = StandInEdge()
+    runner, url = await start_server(edge)
+    long_text = " ".join(f"słowo{i}" for i in range(800))  # > 4096 bajtów: kilka zapytań ssml
+    try:
+        async with EdgeSession(pool_size=1, url=url) as session:
+            words = []
+            audio = await session.synthesize("Ala ma kota.", VOICE, word_boundaries=words)
+            long_words = []
+            turns_before = edge.turns
+            long_audio = await session.synthesize(long_text, VOICE, word_boundaries=long_words)
+            long_turns = edge.turns - turns_before
+            plain = await session.synthesize("Bez granic.", VOICE)
+        ok = check(audio == b"Ala ma kota." and [w[2] for w in words] == ["Ala", "ma", "kota."],
+                   "słowa i ich kolejność")
+        ok &= check(words[1][0] == WORD_TICKS, "offset drugiego słowa")
+        ok &= check(len(long_words) == 800 and long_turns > 1, f"długi tekst podzielony na {long_turns} tury")
+        offsets = [w[0] for w in long_words]
+        ok &= check(offsets == sorted(offsets), "offsety rosnące między turami")
+        ok &= check(long_audio.replace(b" ", b"") == long_text.encode().replace(b" ", b""), "audio długiego tekstu")
+        ok &= check(plain == b"Bez granic." and edge.connections == 1, "jedno połączenie na wszystko")
+        return ok
+    finally:
+        await runner.cleanup()
+
+
+async def test_reconnect():
+    print("Serwer zrywa połączenie po każdych 3 turach:")
+    edge = StandInEdge(turns_per_connection=3)
+    runner, url = await start_server(edge)
+    try:
+        async with EdgeSession(pool_size=2, url=url) as session:
+            clips = []
+            for line in LINES[:12]:
+                clips.append(await session.synthesize(line, VOICE))
+            counters = dict(session.counters)
+        ok = check(clips == [line.encode() for line in LINES[:12]], "wszystkie linie mimo zerwań")
+        ok &= check(edge.connections >= 4, f"{edge.connections} połączeń, {counters}")
+        return ok
+    finally:
+        await runner.cleanup()
+
+
+async def test_idle_timeout():
+    print("Połączenie bezczynne dłużej niż idle_timeout nie jest używane ponownie:")
+    edge = StandInEdge()
+    runner, url = await start_server(edge)
+    try:
+        async with EdgeSession(pool_size=1, url=url, idle_timeout=0.1) as session:
+            await session.synthesize(LINES[0], VOICE)
+            await asyncio.sleep(0.2)
+            await session.synthesize(LINES[1], VOICE)
+            stale = session.counters['stale']
+        return check(edge.connections == 2 and stale == 1, f"{edge.connections} połączenia, stale={stale}")
+    finally:
+        await runner.cleanup()
+
+
+async def bench():
+    print(f"Benchmark (handshake {HANDSHAKE_DELAY * 1000:.0f} ms, {len(LINES)} linii, 4 naraz):")
+    edge = StandInEdge()
+    runner, url = await start_server(edge)
+    try:
+        semaphore = asyncio.Semaphore(4)
+
+        async def one_off(line):
+            async with semaphore, EdgeSession(pool_size=1, url=url) as session:
+                return await session.synthesize(line, VOICE)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one_off(line) for line in LINES))
+        fresh = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        async with EdgeSession(pool_size=4, url=url) as session:
+            await synthesize_all(session, LINES)
+        pooled = time.perf_counter() - t0
+        print(f"  nowe połączenie na linię {fresh:6.2f} s | pula {pooled:6.2f} s | x{fresh / pooled:.1f}")
+    finally:
+        await runner.cleanup()
+
+
+async def main():
+    ok = await test_reuse()
+    ok &= await test_word_boundaries_and_long_text()
+    ok &= await test_reconnect()
+    ok &= await test_idle_timeout()
+    await bench()
+    print("Wynik:", "OK" if ok else "BŁĄD")
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if asyncio.run(main()) else 1)
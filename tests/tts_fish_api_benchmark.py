@@ -0,0 +1,192 @@
+# Benchmark klienta Fish Audio: urlopen na każde zdanie vs pula keep-alive (sync i async),
+# WAV vs surowe PCM vs odpowiedź strumieniowana — na lokalnym serwerze udającym API Fish
+# Uruchom z katalogu głównego projektu: python tests/tts_fish_api_benchmark.py
+# Serwer nie syntezuje mowy: zwraca deterministyczny szum o długości zależnej od tekstu,
+# a każde nowe połączenie TCP kosztuje CONNECT_DELAY (udaje handshake w sieci LAN/VPN).
+
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+import time
+import wave
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.tts_fish_api import AsyncFishTTSClient, FishTTSClient, FISH_SAMPLE_RATE  # noqa: E402
+
+LINES = [f"Zdanie numer {i}: {'bardzo ' * (i % 7)}krótka kwestia lektora." for i in range(120)]
+CONCURRENCY = 4
+CONNECT_DELAY = 0.03    # koszt nowego połączenia (s)
+SYNTH_DELAY = 0.005     # "inferencja" na zapytanie (s)
+SAMPLES_PER_CHAR = 600  # ~14 ms audio na znak przy 44,1 kHz
+STREAM_CHUNK = 16_384
+
+
+def expected_audio(text):
+    # Te same próbki, które serwer wysyła (int16; WAV 32-bit to te same próbki << 16)
+    rng = np.random.default_rng(zlib.crc32(text.encode()))
+    return rng.integers(-20_000, 20_000, len(text) * SAMPLES_PER_CHAR, dtype=np.int16)
+
+
+class StandInFish:
+    # Serwer HTTP/1.1 z keep-alive: /health, /voices, /tts (format wav/pcm, streaming)
+
+    def __init__(self, wav_bits=32, healthy=True, synth_delay=SYNTH_DELAY, connect_delay=CONNECT_DELAY):
+        self.wav_bits = wav_bits
+        self.healthy = healthy
+        self.synth_delay = synth_delay
+        self.connect_delay = connect_delay
+        self.fail_tts = False
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    def start(self):
+        fish = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                time.sleep(fish.connect_delay)
+                with fish.lock:
+                    fish.connections += 1
+                super().setup()
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self.send_json(200 if fish.healthy else 503, {"status": "ok" if fish.healthy else "down"})
+                elif self.path == "/voices":
+                    self.send_json(200, {"voices": [{"name": "Test", "audio_format": "wav", "transcript": ""}]})
+                else:
+                    self.send_json(404, {"detail": "not found"})
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with fish.lock:
+                    fish.requests += 1
+                time.sleep(fish.synth_delay)
+                if fish.fail_tts:
+                    self.send_json(500, {"detail": "inference failed"})
+                    return
+                body = fish.encode(expected_audio(request["text"]), request["format"], request.get("streaming"))
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/wav" if request["format"] == "wav" else "audio/pcm")
+                if request.get("streaming"):
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for start in range(0, len(body), STREAM_CHUNK):
+                        part = body[start:start + STREAM_CHUNK]
+                        self.wfile.write(f"{len(part):X}\r\n".encode() + part + b"\r\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def encode(self, audio, fmt, streaming):
+        if fmt == "pcm":
+            return audio.tobytes()
+        samples = (audio.astype(np.int32) << 16).tobytes() if self.wav_bits == 32 else audio.tobytes()
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(self.wav_bits // 8)
+            wf.setframerate(FISH_SAMPLE_RATE)
+            wf.writeframes(samples)
+        data = bytearray(buf.getvalue())
+        if streaming:
+            # Jak serwery strumieniujące: nagłówek z rozmiarem-zaślepką
+            data[40:44] = b"\xff\xff\xff\xff"
+        return bytes(data)
+
+
+def legacy_synthesize(base_url, text):
+    # Stary FishTTSClient.synthesize: nowe połączenie urlopen i pełny WAV przez moduł wave
+    body = json.dumps({"text": text, "format": "wav", "temperature": 0.8}).encode()
+    req = Request(f"{base_url}/tts", data=body, headers={"Content-Type": "application/json"}, method="POST")
+    with urlopen(req, timeout=300) as resp:
+        with wave.open(io.BytesIO(resp.read()), "rb") as wf:
+            frames = wf.readframes(wf.getnframes())
+            width = wf.getsampwidth()
+    if width == 4:
+        return (np.frombuffer(frames, dtype=np.int32) >> 16).astype(np.int16)
+    return np.frombuffer(frames, dtype=np.int16)
+
+
+def run_threads(function):
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        return list(pool.map(function, LINES))
+
+
+def run_async(url, **options):
+    async def main():
+        async with AsyncFishTTSClient(url, concurrency=CONCURRENCY, **options) as client:
+            return await client.synthesize_many(LINES)
+    return asyncio.run(main())
+
+
+def measure(label, fish, function):
+    connections = fish.connections
+    t0 = time.perf_counter()
+    clips = function()
+    elapsed = time.perf_counter() - t0
+    ok = all(np.array_equal(clip, expected_audio(line)) for clip, line in zip(clips, LINES))
+    audio_seconds = sum(len(clip) for clip in clips) / FISH_SAMPLE_RATE
+    print(f"  [{'OK' if ok else 'BŁĄD'}] {label:<34} {elapsed:6.2f} s | {len(LINES) / elapsed:6.1f} zdań/s | "
+          f"{audio_seconds / elapsed:7.1f} s audio/s | połączeń: {fish.connections - connections}")
+    return ok
+
+
+def main():
+    fish = StandInFish()
+    url = fish.start()
+    print(f"{len(LINES)} zdań, {CONCURRENCY} naraz, nowe połączenie {CONNECT_DELAY * 1000:.0f} ms, WAV 32-bit:")
+    ok = True
+    try:
+        ok &= measure("urlopen na zdanie (stary klient)", fish, lambda: run_threads(lambda t: legacy_synthesize(url, t)))
+        with FishTTSClient(url, concurrency=CONCURRENCY) as client:
+            ok &= measure("FishTTSClient, pula keep-alive", fish, lambda: run_threads(client.synthesize))
+        ok &= measure("async synthesize_many, WAV", fish, lambda: run_async(url))
+        ok &= measure("async synthesize_many, PCM", fish, lambda: run_async(url, response_format="pcm"))
+        ok &= measure("async synthesize_many, WAV stream", fish, lambda: run_async(url, streaming=True))
+        ok &= measure("async synthesize_many, PCM stream", fish,
+                      lambda: run_async(url, response_format="pcm", streaming=True))
+    finally:
+        fish.stop()
+    print("Wynik:", "OK" if ok else "BŁĄD")
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
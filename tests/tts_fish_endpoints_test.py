@@ -0,0 +1,127 @@
+# Test rozkładania syntezy Fish Audio na kilka serwerów (EndpointPool w FishTTSClient)
+# Uruchom z katalogu głównego projektu: python tests/tts_fish_endpoints_test.py
+# Serwery to lokalne atrapy z tests/tts_fish_api_benchmark.py: szybki, wolny, martwy
+# i taki, który w połowie pliku zaczyna zwracać 500, a potem wraca do zdrowia.
+
+import asyncio
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tts_fish_api_benchmark import LINES, StandInFish, expected_audio  # noqa: E402
+from modules.tts_fish_api import AsyncFishTTSClient, FishTTSClient  # noqa: E402
+
+CONCURRENCY = 8
+COOLDOWN = 0.3
+
+
+def dead_url():
+    # Port, na którym nikt nie słucha
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def check(condition, label):
+    print(f"  [{'OK' if condition else 'BŁĄD'}] {label}")
+    return condition
+
+
+def correct(clips, lines):
+    return all(np.array_equal(clip, expected_audio(line)) for clip, line in zip(clips, lines))
+
+
+def test_least_outstanding():
+    print("Najmniej zajęty serwer dostaje zapytanie (szybki vs wolny):")
+    fast, slow = StandInFish(synth_delay=0.005), StandInFish(synth_delay=0.05)
+    urls = [fast.start(), slow.start()]
+    try:
+        with FishTTSClient(urls, concurrency=CONCURRENCY) as client:
+            with ThreadPoolExecutor(CONCURRENCY) as pool:
+                clips = list(pool.map(client.synthesize, LINES))
+            print(f"  {client.endpoints}")
+        ok = check(correct(clips, LINES), "audio każdej linii")
+        ok &= check(fast.requests > 2 * slow.requests > 0, f"szybki {fast.requests}, wolny {slow.requests}")
+        return ok
+    finally:
+        fast.stop()
+        slow.stop()
+
+
+def test_dead_and_failing():
+    print("Martwy serwer na starcie, drugi psuje się w trakcie i wraca po cooldownie:")
+    good, flaky = StandInFish(), StandInFish()
+    urls = [good.start(), flaky.start(), dead_url()]
+    try:
+        with FishTTSClient(urls, concurrency=CONCURRENCY) as client:
+            client.endpoints.cooldown = COOLDOWN
+            dead = client.endpoints.endpoints[2]
+            ok = check(not dead.admitted, "martwy serwer odrzucony po /health")
+            with ThreadPoolExecutor(CONCURRENCY) as pool:
+                first = list(pool.map(client.synthesize, LINES[:40]))
+                flaky.fail_tts = True
+                failing = list(pool.map(client.synthesize, LINES[40:80]))
+                flaky_endpoint = client.endpoints.endpoints[1]
+                ok &= check(not flaky_endpoint.admitted, f"psujący się serwer wyrzucony ({flaky_endpoint.errors} błędy)")
+                flaky.fail_tts = False
+                time.sleep(COOLDOWN * 1.5)
+                before = flaky.requests
+                last = list(pool.map(client.synthesize, LINES[80:]))
+            ok &= check(flaky_endpoint.admitted and flaky.requests > before,
+                        f"wrócił po cooldownie i /health ({flaky.requests - before} zapytań)")
+            ok &= check(not dead.admitted, "martwy nadal pominięty")
+            print(f"  {client.endpoints}")
+        ok &= check(correct(first + failing + last, LINES), "żadna linia nie przepadła")
+        return ok
+    finally:
+        good.stop()
+        flaky.stop()
+
+
+def test_async_spread():
+    print("Async synthesize_many na trzech serwerach:")
+    servers = [StandInFish() for _ in range(3)]
+    urls = [server.start() for server in servers]
+
+    async def main():
+        async with AsyncFishTTSClient(urls, concurrency=CONCURRENCY) as client:
+            return await client.synthesize_many(LINES)
+
+    try:
+        clips = asyncio.run(main())
+        counts = [server.requests for server in servers]
+        ok = check(correct(clips, LINES), "audio każdej linii")
+        ok &= check(min(counts) >= len(LINES) // 6, f"zapytania na serwer: {counts}")
+        return ok
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def test_all_down():
+    print("Wszystkie serwery martwe:")
+    try:
+        FishTTSClient([dead_url(), dead_url()])
+    except ConnectionError as exc:
+        return check("Nie można połączyć" in str(exc), "ConnectionError jak przy jednym serwerze")
+    return check(False, "brak błędu")
+
+
+def main():
+    ok = test_least_outstanding()
+    ok &= test_dead_and_failing()
+    ok &= test_async_spread()
+    ok &= test_all_down()
+    print("Wynik:", "OK" if ok else "BŁĄD")
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
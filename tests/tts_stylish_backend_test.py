@@ -0,0 +1,83 @@
+# Test zgodności i benchmark backendów STylish-TTS-Pl na CPU: eager vs onnx vs torchscript
+# Uruchom z katalogu głównego projektu: python tests/tts_stylish_backend_test.py [onnx] [torchscript]
+# Wymaga modelu w bin/stylish_tts/ (onnx dodatkowo: pip install onnxruntime)
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.tts_stylish import StylishTTS, STYLISH_SAMPLE_RATE  # noqa: E402
+
+# Różne długości — graf musi mieć dynamiczną długość sekwencji i batch
+LINES = [
+    "Tak.",
+    "Nie wiem, o czym mówisz.",
+    "Dobrze, spotkajmy się jutro o ósmej przy starym moście.",
+    "To była najdłuższa noc w moim życiu, ale w końcu się udało, choć nikt w to nie wierzył.",
+]
+BENCH_LINES = LINES * 10
+
+MAX_ABS_DIFF = 1e-3   # tolerancja próbek (float, przed int16)
+MAX_LENGTH_DIFF = 0   # długość musi się zgadzać co do próbki
+
+
+def raw_outputs(tts, lines):
+    # Surowe wyjście modelu (float, po tanh) — jedno zdanie na wywołanie
+    return [tts._forward(tts._phoneme_ids([line]))[0] for line in lines]
+
+
+def check_parity(reference, candidate, backend):
+    ok = True
+    for line, ref, out in zip(LINES, reference, candidate):
+        length_diff = abs(len(ref) - len(out))
+        n = min(len(ref), len(out))
+        abs_diff = float(np.max(np.abs(ref[:n] - out[:n]))) if n else 0.0
+        status = "OK" if length_diff <= MAX_LENGTH_DIFF and abs_diff <= MAX_ABS_DIFF else "BŁĄD"
+        ok &= status == "OK"
+        print(f"  [{status}] {backend}: Δdługość={length_diff}, max|Δ|={abs_diff:.2e}  {line[:40]}")
+    return ok
+
+
+def bench(tts, label):
+    # Latencja: pojedyncze krótkie zdanie; przepustowość: cały zestaw w batchach
+    tts.synthesize(LINES[1])
+    t0 = time.perf_counter()
+    for _ in range(10):
+        tts.synthesize(LINES[1])
+    latency = (time.perf_counter() - t0) / 10
+
+    t0 = time.perf_counter()
+    clips = tts.synthesize_batch(BENCH_LINES)
+    elapsed = time.perf_counter() - t0
+    audio_seconds = sum(len(c) for c in clips) / STYLISH_SAMPLE_RATE
+    print(f"  {label:<12} latencja {latency * 1000:7.1f} ms | {audio_seconds / elapsed:6.1f} s audio / s (RTF {elapsed / audio_seconds:.3f})")
+
+
+def main():
+    backends = sys.argv[1:] or ['onnx', 'torchscript']
+
+    eager = StylishTTS(device='cpu', backend='eager')
+    reference = raw_outputs(eager, LINES)
+
+    print("\nZgodność z eager:")
+    results = {}
+    for backend in backends:
+        tts = StylishTTS(device='cpu', backend=backend)
+        if tts.backend != backend:
+            print(f"  [POMINIĘTO] {backend}: backend niedostępny")
+            continue
+        results[backend] = tts
+        check_parity(reference, raw_outputs(tts, LINES), backend)
+
+    print("\nBenchmark CPU:")
+    bench(eager, 'eager')
+    for backend, tts in results.items():
+        bench(tts, backend)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Benchmark: STylish-TTS-Pl — synteza zdanie po zdaniu vs synthesize_batch (różne batch size, CPU)
+# Uruchom z katalogu głównego projektu: python tests/tts_stylish_benchmark.py
+# Wymaga modelu w bin/stylish_tts/ i espeak-ng w bin/espeak-ng/
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.tts_stylish import StylishTTS, STYLISH_SAMPLE_RATE  # noqa: E402
+
+BATCH_SIZES = [1, 2, 4, 8, 16]
+
+# Typowe linie z napisów: krótkie okrzyki, średnie i dłuższe kwestie
+LINES = [
+    "Tak.",
+    "Co?",
+    "Nie wiem, o czym mówisz.",
+    "Musimy stąd wyjść, zanim ktoś nas zobaczy.",
+    "Dobrze, spotkajmy się jutro o ósmej przy starym moście.",
+    "Myślisz, że on naprawdę wróci? Po tym wszystkim, co się wydarzyło?",
+    "Nigdy wcześniej nie widziałem czegoś takiego.",
+    "Uważaj!",
+    "Przepraszam, czy mógłby pan powtórzyć?",
+    "To była najdłuższa noc w moim życiu, ale w końcu się udało.",
+] * 6
+
+
+def main():
+    tts = StylishTTS(device='cpu')
+    chars = sum(len(line) for line in LINES)
+    print(f"{len(LINES)} linii, {chars} znaków\n")
+
+    # Rozgrzewka (pierwsze wywołanie ładuje kernele)
+    tts.synthesize_batch(LINES[:4])
+
+    t0 = time.perf_counter()
+    reference = [tts.synthesize_long(line) for line in LINES]
+    t_single = time.perf_counter() - t0
+    audio_seconds = sum(len(a) for a in reference) / STYLISH_SAMPLE_RATE
+    print(f"Zdanie po zdaniu:  {t_single:6.2f} s  (RTF {t_single / audio_seconds:.3f}, {chars / t_single:.0f} znaków/s)")
+
+    for batch_size in BATCH_SIZES:
+        t0 = time.perf_counter()
+        clips = tts.synthesize_batch(LINES, batch_size=batch_size)
+        elapsed = time.perf_counter() - t0
+        drift = max(abs(len(a) - len(b)) for a, b in zip(clips, reference)) / STYLISH_SAMPLE_RATE
+        print(
+            f"batch_size={batch_size:<3}      {elapsed:6.2f} s  (RTF {elapsed / audio_seconds:.3f}, "
+            f"x{t_single / elapsed:.2f}, maks. różnica długości {drift * 1000:.0f} ms)")
+
+    assert all(isinstance(c, np.ndarray) and c.dtype == np.int16 for c in clips)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# Test jakości i benchmark STylish-TTS-Pl INT8 (kwantyzacja dynamiczna) vs fp32 na CPU
+# Uruchom z katalogu głównego projektu: python tests/tts_stylish_int8_test.py
+# Wymaga modelu w bin/stylish_tts/ (wagi INT8 zapisywane przy pierwszym uruchomieniu)
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from constants import STYLISH_TTS_EXPORT_PATH, STYLISH_TTS_INT8_PATH  # noqa: E402
+from modules.tts_stylish import StylishTTS, STYLISH_SAMPLE_RATE  # noqa: E402
+
+LINES = [
+    "Tak.",
+    "Nie wiem, o czym mówisz.",
+    "Dobrze, spotkajmy się jutro o ósmej przy starym moście.",
+    "To była najdłuższa noc w moim życiu, ale w końcu się udało, choć nikt w to nie wierzył.",
+]
+BENCH_LINES = LINES * 10
+
+N_FFT = 1024
+HOP = 256
+MAX_LSD_DB = 2.0        # log-spectral distance — powyżej różnica zwykle słyszalna
+MAX_LENGTH_DIFF = 0.05  # względna różnica długości klipu
+
+
+def log_spectrum(audio):
+    frames = np.lib.stride_tricks.sliding_window_view(audio, N_FFT)[::HOP]
+    power = np.abs(np.fft.rfft(frames * np.hanning(N_FFT), axis=-1)) ** 2
+    return 10 * np.log10(power + 1e-10)
+
+
+def spectral_distance(reference, candidate):
+    # LSD w dB na wspólnej długości (długości mogą się różnić o kilka ramek)
+    n = min(len(reference), len(candidate))
+    if n < N_FFT:
+        return 0.0
+    ref = log_spectrum(reference[:n].astype(np.float32) / 32768)
+    out = log_spectrum(candidate[:n].astype(np.float32) / 32768)
+    return float(np.mean(np.sqrt(np.mean((ref - out) ** 2, axis=-1))))
+
+
+def bench(tts, label):
+    tts.synthesize(LINES[1])
+    t0 = time.perf_counter()
+    for _ in range(10):
+        tts.synthesize(LINES[1])
+    latency = (time.perf_counter() - t0) / 10
+
+    t0 = time.perf_counter()
+    clips = tts.synthesize_batch(BENCH_LINES)
+    elapsed = time.perf_counter() - t0
+    audio_seconds = sum(len(c) for c in clips) / STYLISH_SAMPLE_RATE
+    print(f"  {label:<6} latencja {latency * 1000:7.1f} ms | {audio_seconds / elapsed:6.1f} s audio / s (RTF {elapsed / audio_seconds:.3f})")
+
+
+def main():
+    fp32 = StylishTTS(device='cpu')
+    int8 = StylishTTS(device='cpu', quantize=True)
+
+    print("\nJakość INT8 vs fp32:")
+    for line in LINES:
+        ref, out = fp32.synthesize(line), int8.synthesize(line)
+        lsd = spectral_distance(ref, out)
+        length_diff = abs(len(ref) - len(out)) / max(len(ref), 1)
+        status = "OK" if lsd <= MAX_LSD_DB and length_diff <= MAX_LENGTH_DIFF else "BŁĄD"
+        print(f"  [{status}] LSD={lsd:5.2f} dB, Δdługość={length_diff * 100:4.1f}%  {line[:40]}")
+
+    print("\nPamięć (wagi na dysku):")
+    for label, file in (('fp32', STYLISH_TTS_EXPORT_PATH), ('int8', STYLISH_TTS_INT8_PATH)):
+        print(f"  {label:<6} {os.path.getsize(file) / 2 ** 20:8.1f} MB  {os.path.basename(file)}")
+
+    print("\nBenchmark CPU:")
+    bench(fp32, 'fp32')
+    bench(int8, 'int8')
+
+
+if __name__ == '__main__':
+    main()